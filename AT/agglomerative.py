@@ -0,0 +1,321 @@
+"""
+Agglomerative clustering with cached nearest neighbours
+
+hierarchical_clustering used to sort the clusters and run
+fast_closest_pair after every merge, O(n log^2 n) per merge.  Here every
+live row of a ClusterTable keeps a pointer to its nearest live row and
+the distance to it, and a heap holds an entry for every pointer, ordered
+by (distance, smaller row, larger row).  The top valid entry is always
+the closest pair, the one with the smallest rows among pairs at the
+same distance.  Entries are never removed: an entry whose row died or
+whose pointer or distance has since changed is skipped when it reaches
+the top.
+
+After merging rows a and b into a, only three things can change:
+
+  * the neighbour of a, found by one vectorized scan;
+  * the rows whose neighbour was a or b, rescanned one by one, or
+    looked up in a spatial_index.GridIndex for large tables;
+  * any row now closer to the new center of a than to its neighbour,
+    or as close with a the smaller row, found by comparing all rows
+    against a in one vectorized pass.
+
+Centroids move when clusters merge, so centroid linkage is not reducible
+and the nearest-neighbour chain algorithm does not apply; the last check
+is what keeps the pointers exact without that property.  Each merge
+costs O(n) vectorized work plus one scan per invalidated pointer, O(n^2)
+time in total and O(n) memory.
+"""
+import heapq
+import math
+import time
+
+import numpy as np
+
+import cluster_table
+import spatial_index
+
+INDEX_MIN_ROWS = 4096
+
+
+def _square_dists(horiz, vert, row):
+    """
+    Array of squared distances from row to every row, infinite to row
+    itself and to dead rows, whose centers are infinite
+    """
+    dists = (vert - vert[row]) ** 2 + (horiz - horiz[row]) ** 2
+    dists[row] = np.inf
+    return dists
+
+
+def _initial_neighbours(horiz, vert, rows):
+    """
+    Nearest other row, and squared distance to it, of each of rows
+
+    Rows are swept in order of horizontal center, comparing every row
+    with the row offset places further along for offset 1, 2, ... while
+    the horizontal gap alone does not rule the pair out for both rows.
+    Returns arrays indexed like rows.  Ties go to the smaller row.
+    """
+    order = np.argsort(horiz[rows], kind="stable")
+    rows = np.asarray(rows)[order]
+    xs = horiz[rows]
+    ys = vert[rows]
+    best = np.full(len(rows), np.inf)
+    nearest = np.full(len(rows), len(horiz), dtype=np.intp)
+    for offset in range(1, len(rows)):
+        gaps = (xs[offset:] - xs[:-offset]) ** 2
+        active = np.flatnonzero(
+            gaps <= np.maximum(best[:-offset], best[offset:]))
+        if not len(active):
+            break
+        other = active + offset
+        dists = (ys[other] - ys[active]) ** 2 + gaps[active]
+        for this, that in ((active, other), (other, active)):
+            better = (dists < best[this]) | ((dists == best[this]) &
+                                             (rows[that] < nearest[this]))
+            best[this[better]] = dists[better]
+            nearest[this[better]] = rows[that[better]]
+    res_best = np.empty_like(best)
+    res_nearest = np.empty_like(nearest)
+    res_best[order] = best
+    res_nearest[order] = nearest
+    return res_best, res_nearest
+
+
+def iter_merges(table, num_clusters=1):
+    """
+    Merges the closest pair of live rows of table until num_clusters
+    rows are left, yielding (row1, row2, distance) after each merge
+
+    Row row2 is merged into row1, the smaller of the two.  Pairs at the
+    same distance are taken in order of (row1, row2).  Without such ties
+    these are the pairs the slow loop of sorting and fast_closest_pair
+    merges; with them the slow loop's choice depends on its sort order.
+    """
+    if len(table) <= max(num_clusters, 1):
+        return
+    # working arrays are indexed by position in rows, the live rows in
+    # order, and squared distances order pairs as distances do
+    rows = table.live_rows()
+    horiz = table.horiz_centers()[rows]
+    vert = table.vert_centers()[rows]
+    dead = np.zeros(len(rows), dtype=bool)
+    neighbour_dists, neighbours = _initial_neighbours(
+        horiz, vert, np.arange(len(rows)))
+    heap = []
+
+    while len(table) > num_clusters:
+        if 2 * len(table) <= len(rows) or not heap:
+            # drop dead positions, so every scan costs O(live rows)
+            keep = ~dead
+            positions = np.cumsum(keep) - 1
+            rows = rows[keep]
+            horiz = horiz[keep]
+            vert = vert[keep]
+            dead = dead[keep]
+            neighbour_dists = neighbour_dists[keep]
+            neighbours = positions[neighbours[keep]]
+            heap = [(dist, min(pos, nearest), max(pos, nearest), pos)
+                    for pos, (dist, nearest) in enumerate(
+                        zip(neighbour_dists.tolist(), neighbours.tolist()))]
+            heapq.heapify(heap)
+            index = None
+            if len(rows) >= INDEX_MIN_ROWS:
+                index = spatial_index.GridIndex(horiz, vert)
+
+        # entries are (distance, pair, row holding the pointer)
+        dist, pos1, pos2, pos = heapq.heappop(heap)
+        nearest = pos1 + pos2 - pos
+        if (dead[pos] or neighbours[pos] != nearest or
+                neighbour_dists[pos] != dist):
+            continue
+        table.merge_clusters(rows[pos1], rows[pos2])
+        yield int(rows[pos1]), int(rows[pos2]), math.sqrt(dist)
+        if len(table) < 2:
+            return
+
+        dead[pos2] = True
+        horiz[pos2] = vert[pos2] = np.inf
+        horiz[pos1] = table.horiz_centers()[rows[pos1]]
+        vert[pos1] = table.vert_centers()[rows[pos1]]
+        neighbours[pos2] = pos2
+        neighbour_dists[pos2] = np.inf
+        if index is not None:
+            index.delete(pos2)
+            index.move(pos1, horiz[pos1], vert[pos1])
+
+        dists = _square_dists(horiz, vert, pos1)
+        closer = (dists < neighbour_dists) | ((dists == neighbour_dists) &
+                                              (pos1 < neighbours) & ~dead)
+        stale = (neighbours == pos1) | (neighbours == pos2)
+        stale[pos1] = stale[pos2] = False
+        nearest = int(np.argmin(dists))
+        neighbours[pos1] = nearest
+        neighbour_dists[pos1] = dists[nearest]
+        heapq.heappush(heap, (dists[nearest], min(pos1, nearest),
+                              max(pos1, nearest), pos1))
+
+        neighbours[closer] = pos1
+        neighbour_dists[closer] = dists[closer]
+        for other in np.flatnonzero(closer).tolist():
+            heapq.heappush(heap, (dists[other], min(other, pos1),
+                                  max(other, pos1), other))
+        for other in np.flatnonzero(stale & ~closer).tolist():
+            if index is not None:
+                dist, nearest = index.nearest(horiz[other], vert[other], other)
+            else:
+                other_dists = _square_dists(horiz, vert, other)
+                nearest = int(np.argmin(other_dists))
+                dist = other_dists[nearest]
+            neighbours[other] = nearest
+            neighbour_dists[other] = dist
+            heapq.heappush(heap, (dist, min(other, nearest),
+                                  max(other, nearest), other))
+
+
+def hierarchical_table(table, num_clusters):
+    """
+    Merges closest pairs of table in place until num_clusters rows are
+    left, returns table
+    """
+    for _ in iter_merges(table, num_clusters):
+        pass
+    return table
+
+
+class Dendrogram(object):
+    """
+    Complete merge history of a hierarchical clustering
+
+    Nodes 0..n-1 are the rows of the leaf table, merge i creates node
+    n + i.  The linkage matrix has one row per merge, in order, of
+    (child node, child node, distance, number of leaves), the layout
+    SciPy uses.  The centers, populations and risks of all 2n - 1 nodes
+    are kept too, so any level of the tree is materialized exactly as a
+    run stopped at that number of clusters would leave it.
+    """
+
+    def __init__(self, leaves, linkage, horiz, vert, population, risk):
+        """
+        leaves  -- ClusterTable of the n leaf clusters, all rows live
+        linkage -- (n - 1) x 4 float array of merges
+        horiz, vert, population, risk -- arrays indexed by node
+        """
+        self._leaves = leaves
+        self._linkage = linkage
+        self._horiz = horiz
+        self._vert = vert
+        self._population = population
+        self._risk = risk
+
+    def __repr__(self):
+        return "Dendrogram(%d leaves)" % self.num_leaves()
+
+    def __len__(self):
+        return len(self._linkage)
+
+    def num_leaves(self):
+        """
+        Number of leaf clusters
+        """
+        return self._leaves.num_rows()
+
+    def leaves(self):
+        """
+        Get the ClusterTable of the leaf clusters
+        """
+        return self._leaves
+
+    def linkage(self):
+        """
+        Get the linkage matrix, one (child, child, distance, size) row
+        per merge
+        """
+        return self._linkage
+
+    def node_labels(self, num_clusters):
+        """
+        Array with the node containing every leaf after all but the
+        last num_clusters - 1 merges
+        """
+        num_leaves = self.num_leaves()
+        num_merges = num_leaves - max(min(num_clusters, num_leaves), 1)
+        parents = list(range(2 * num_leaves - 1))
+        children = self._linkage[:num_merges, :2].astype(np.intp).tolist()
+        for merge, (child1, child2) in enumerate(children):
+            parents[child1] = parents[child2] = num_leaves + merge
+        # parents have larger ids, so one pass from the top finds roots
+        for node in range(num_leaves + num_merges - 1, -1, -1):
+            parents[node] = parents[parents[node]]
+        return np.array(parents[:num_leaves], dtype=np.intp)
+
+    def cut(self, num_clusters):
+        """
+        ClusterTable of the clustering into num_clusters clusters, rows
+        in order of node id, in O(n)
+        """
+        labels = self.node_labels(num_clusters)
+        nodes = np.unique(labels)
+        rows = np.searchsorted(nodes, labels)
+        return cluster_table.ClusterTable(
+            self._horiz[nodes], self._vert[nodes], self._population[nodes],
+            self._risk[nodes], self._leaves.fips(),
+            rows[self._leaves.labels()], self._leaves.points())
+
+    def distortion(self, num_clusters, data_table=None):
+        """
+        Distortion of the clustering into num_clusters clusters
+
+        data_table -- the county data, not needed for trees built from
+                      tables made by ClusterTable.from_data_table
+        """
+        return self.cut(num_clusters).total_error(data_table)
+
+
+def build_dendrogram(table):
+    """
+    Dendrogram of the merges of all live rows of table down to a single
+    cluster; table itself is not changed
+    """
+    leaves = table.compact()
+    work = leaves.compact()
+    num_leaves = leaves.num_rows()
+    num_nodes = max(2 * num_leaves - 1, 0)
+    linkage = np.zeros((max(num_leaves - 1, 0), 4))
+    horiz = np.empty(num_nodes)
+    vert = np.empty(num_nodes)
+    population = np.empty(num_nodes, dtype=leaves.populations().dtype)
+    risk = np.empty(num_nodes)
+    horiz[:num_leaves] = leaves.horiz_centers()
+    vert[:num_leaves] = leaves.vert_centers()
+    population[:num_leaves] = leaves.populations()
+    risk[:num_leaves] = leaves.risks()
+    node_of_row = np.arange(num_leaves)
+    leaf_counts = np.ones(num_leaves, dtype=np.intp)
+    for merge, (row1, row2, dist) in enumerate(iter_merges(work, 1)):
+        node = num_leaves + merge
+        leaf_counts[row1] += leaf_counts[row2]
+        linkage[merge] = (node_of_row[row1], node_of_row[row2], dist,
+                          leaf_counts[row1])
+        node_of_row[row1] = node
+        horiz[node] = work.horiz_centers()[row1]
+        vert[node] = work.vert_centers()[row1]
+        population[node] = work.populations()[row1]
+        risk[node] = work.risks()[row1]
+    return Dendrogram(leaves, linkage, horiz, vert, population, risk)
+
+
+def benchmark_hierarchical(sizes=(3108, 50000), num_clusters=15, seed=0):
+    """
+    Seconds to cluster random county tables of each size down to
+    num_clusters clusters, as a dictionary from size to seconds
+    """
+    res = {}
+    for size in sizes:
+        table = cluster_table.ClusterTable.from_data_table(
+            cluster_table.random_data_table(size, seed))
+        start = time.time()
+        hierarchical_table(table, num_clusters)
+        res[size] = time.time() - start
+    return res
@@ -7,20 +7,22 @@ http://www.codeskulptor.org/#alg_clusters_matplotlib.py
 to use the matplotlib version of this code
 """
 
+from __future__ import print_function
+
 # Flavor of Python - desktop or CodeSkulptor
 DESKTOP = True
 
 import math
 import random
-import urllib2
 import alg_cluster
+import agglomerative
+import cluster_table
 import clustering_alaysis as ca
-import matplotlib.pyplot as plt
+import kmeans
 
-# conditional imports
+# conditional imports, alg_clusters_matplotlib is imported where it draws
 if DESKTOP:
     import clustering as alg_project3_solution      # desktop project solution
-    import alg_clusters_matplotlib
 else:
     # import userXX_XXXXXXXX as alg_project3_solution   # CodeSkulptor project solution
     import alg_clusters_simplegui
@@ -46,10 +48,15 @@ def load_data_table(data_url):
     Import a table of county-based cancer risk data
     from a csv format file
     """
-    data_file = urllib2.urlopen(data_url)
-    data = data_file.read()
+    # the network stack is imported on demand, it dominates import time
+    try:
+        from urllib2 import urlopen
+    except ImportError:
+        from urllib.request import urlopen
+    data_file = urlopen(data_url)
+    data = data_file.read().decode("utf-8")
     data_lines = data.split('\n')
-    print "Loaded", len(data_lines), "data points"
+    print("Loaded", len(data_lines), "data points")
     data_tokens = [line.split(',') for line in data_lines]
     return [[tokens[0], float(tokens[1]), float(tokens[2]), int(tokens[3]), float(tokens[4])]
             for tokens in data_tokens]
@@ -103,20 +110,21 @@ def run_example():
             set([line[0]]), line[1], line[2], line[3], line[4]))
 
     # cluster_list = sequential_clustering(singleton_list, 15)
-    # print "Displaying", len(cluster_list), "sequential clusters"
+    # print("Displaying", len(cluster_list), "sequential clusters")
 
     cluster_list = \
         alg_project3_solution.hierarchical_clustering(singleton_list, 9)
-    print "Displaying", len(cluster_list), "hierarchical clusters"
+    print("Displaying", len(cluster_list), "hierarchical clusters")
 
     # cluster_list = alg_project3_solution.kmeans_clustering(
     #     singleton_list, 9, 5)
-    # print "Displaying", len(cluster_list), "k-means clusters"
+    # print("Displaying", len(cluster_list), "k-means clusters")
 
-    print ca.compute_distortion(cluster_list, data_table)
+    print(ca.compute_distortion(cluster_list, data_table))
 
     # draw the clusters using matplotlib or simplegui
     # if DESKTOP:
+    #     import alg_clusters_matplotlib
     #     alg_clusters_matplotlib.plot_clusters(data_table, cluster_list, True)
     #     # alg_clusters_matplotlib.plot_clusters(data_table, cluster_list, True)  #add cluster centers
     # else:
@@ -140,55 +148,64 @@ because of initalisation of clusters in highli populated countries
 # hier
 
 
+def kmeans_distortions(data_table, cluster_range=range(6, 21),
+                       num_iterations=5):
+    """
+    Distortion of k-means clustering of data_table with num_iterations
+    iterations for every number of clusters in cluster_range
+    """
+    table = cluster_table.ClusterTable.from_data_table(data_table)
+    return dict((num_clust, kmeans.kmeans_table(
+        table, num_clust, num_iterations).clusters.total_error())
+                for num_clust in cluster_range)
+
+
 def kmeans_dist(data_url):
     """
     Calculates distirtion of k_means for 6-20 clusters
     """
-    res = {}
-    data_table = load_data_table(data_url)
+    return kmeans_distortions(load_data_table(data_url))
 
-    for num_clust in range(6, 21):
-        singleton_list = []
-        for line in data_table:
-            singleton_list.append(alg_cluster.Cluster(
-                set([line[0]]), line[1], line[2], line[3], line[4]))
-        cluster_list = alg_project3_solution.kmeans_clustering(
-            singleton_list, num_clust, 5)
-        res[num_clust] = ca.compute_distortion(cluster_list, data_table)
-    return res
+
+def hierarchical_distortions(data_table, cluster_range=range(6, 21)):
+    """
+    Distortion of hierarchical clustering of data_table
+    for every number of clusters in cluster_range
+    Clusters once down to one cluster and cuts the dendrogram at each k
+    """
+    dendrogram = agglomerative.build_dendrogram(
+        cluster_table.ClusterTable.from_data_table(data_table))
+    return dict((num_clust, dendrogram.distortion(num_clust))
+                for num_clust in cluster_range)
 
 
 def hier_dist(data_url):
     """
     Calculates distirtion of hierarchical alg for 6-20 clusters
     """
-    res = {}
-    data_table = load_data_table(data_url)
-    singleton_list = []
-    for line in data_table:
-        singleton_list.append(alg_cluster.Cluster(
-            set([line[0]]), line[1], line[2], line[3], line[4]))
-    cluster_list = \
-        alg_project3_solution.hierarchical_clustering(singleton_list, 20)
-    res[20] = ca.compute_distortion(cluster_list, data_table)
+    return hierarchical_distortions(load_data_table(data_url))
+
+
+def plot_distortion(data_url=DATA_896_URL):
+    """
+    Plots distortion of hierarchical and k-means clustering of the
+    data at data_url against the number of clusters
+    """
+    import matplotlib.pyplot as plt
+    h1 = hier_dist(data_url)
+    k1 = kmeans_dist(data_url)
 
-    for num_clust in range(19, 5, -1):
-        cluster_list = \
-            alg_project3_solution.hierarchical_clustering(
-                cluster_list, num_clust)
-        res[num_clust] = ca.compute_distortion(cluster_list, data_table)
-    return res
+    plt.plot(sorted(h1), [h1[num] for num in sorted(h1)], '-r',
+             label="hierarchical_clustering")
+    plt.plot(sorted(k1), [k1[num] for num in sorted(k1)], '-g',
+             label="kmeans_clustering")
+    plt.xlabel("Number of clusters")
+    plt.ylabel("Distortion")
+    plt.title("Comparion of distortion")
+    plt.legend()
+    plt.show()
 
 
 # run_example()
-data_url = DATA_896_URL
-h1 = hier_dist(data_url)
-k1 = kmeans_dist(data_url)
-
-plt.plot(h1.keys(), h1.values(), '-r', label="hierarchical_clustering")
-plt.plot(k1.keys(), k1.values(), '-g', label="kmeans_clustering")
-plt.xlabel("Number of clusters")
-plt.ylabel("Distortion")
-plt.title("Comparion of distortion")
-plt.legend()
-plt.show()
+if __name__ == "__main__":
+    plot_distortion()
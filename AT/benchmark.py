@@ -0,0 +1,248 @@
+"""
+Benchmark harness for the graph code in AT/
+
+A benchmark is a function timed on inputs of increasing size.  Inputs
+are built by a separate setup function that is never timed, every size
+is run a few times after warmup runs, and the best and median times
+are kept.  The growth of the best times is summarised by the exponent
+of a least-squares fit of log(time) against log(size).
+
+Results are plain dictionaries that can be saved as JSON and compared
+against a stored baseline to flag regressions:
+
+    python graph_experiments.py benchmark --save results.json
+    python graph_experiments.py benchmark --baseline results.json
+"""
+from __future__ import print_function
+import collections
+import json
+import math
+import random
+import timeit
+
+DEFAULT_REPEATS = 5
+DEFAULT_WARMUP = 1
+REGRESSION_THRESHOLD = 1.5
+
+Benchmark = collections.namedtuple("Benchmark",
+                                   ["name", "func", "setup", "sizes"])
+
+
+def time_call(func, setup, repeats=DEFAULT_REPEATS, warmup=DEFAULT_WARMUP):
+    """
+    Times func(*setup()) repeats times after warmup untimed calls
+
+    setup runs before every call and is not timed, so destructive
+    functions always get a fresh input.  Returns the list of times in
+    seconds.
+    """
+    times = []
+    for run in range(warmup + repeats):
+        args = setup()
+        start = timeit.default_timer()
+        func(*args)
+        elapsed = timeit.default_timer() - start
+        if run >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def _median(values):
+    """
+    Median of a non-empty list
+    """
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def fit_exponent(sizes, times):
+    """
+    Exponent k of the least-squares fit times ~ c * sizes ** k
+
+    Returns None with fewer than two usable points.
+    """
+    points = [(math.log(size), math.log(elapsed))
+              for size, elapsed in zip(sizes, times) if size > 0 and elapsed > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def run_benchmark(bench, repeats=DEFAULT_REPEATS, warmup=DEFAULT_WARMUP):
+    """
+    Runs one Benchmark over all its sizes
+
+    Returns a dictionary with the sizes, best and median times per size
+    and the fitted exponent of the best times
+    """
+    best = []
+    median = []
+    for size in bench.sizes:
+        times = time_call(bench.func, lambda: bench.setup(size), repeats, warmup)
+        best.append(min(times))
+        median.append(_median(times))
+    return {"name": bench.name, "sizes": list(bench.sizes), "best": best,
+            "median": median, "exponent": fit_exponent(bench.sizes, best)}
+
+
+def time_run(func, setup, sizes, repeats=DEFAULT_REPEATS, warmup=DEFAULT_WARMUP):
+    """
+    Best times of func on the inputs setup(size) for every size
+
+    Returns (sizes, times) lists, ready for plotting
+    """
+    res = run_benchmark(Benchmark(getattr(func, "__name__", "func"), func,
+                                  setup, sizes), repeats, warmup)
+    return res["sizes"], res["best"]
+
+
+######################################################
+# The graph benchmark suite
+
+
+def _upa_graph(size):
+    """
+    Seeded UPA graph as a dict-of-sets, the input of the attack orders
+    """
+    import graph_csr
+    import graph_generators
+    return graph_csr.to_dict_graph(graph_generators.upa_graph(size, 5, seed=size))
+
+
+def _dpa_graph(size):
+    """
+    Seeded DPA digraph as a dict-of-sets
+    """
+    import graph_csr
+    import graph_generators
+    return graph_csr.to_dict_graph(graph_generators.dpa_graph(size, 5, seed=size))
+
+
+def _attack_setup(size):
+    """
+    A UPA graph and a seeded random attack order of all its nodes
+    """
+    graph = _upa_graph(size)
+    order = list(graph)
+    random.Random(size).shuffle(order)
+    return graph, order
+
+
+def _graph_benchmarks():
+    """
+    The Benchmark list covering attack orders, resilience, BFS, degrees
+    and the generators
+    """
+    import graph_degees_calc
+    import graph_generators
+    import graph_search
+    import order_of_attack
+    import resilience
+    return [
+        Benchmark("targeted_order", order_of_attack.targeted_order,
+                  lambda size: (_upa_graph(size),), (250, 500, 1000, 2000)),
+        Benchmark("fast_target_order", order_of_attack.fast_target_order,
+                  lambda size: (_upa_graph(size),), (1000, 4000, 16000, 64000)),
+        Benchmark("compute_resilience", resilience.compute_resilience,
+                  _attack_setup, (1000, 4000, 16000, 64000)),
+        Benchmark("bfs_visited", graph_search.bfs_visited,
+                  lambda size: (_upa_graph(size), 0), (1000, 4000, 16000, 64000)),
+        Benchmark("compute_in_degrees", graph_degees_calc.compute_in_degrees,
+                  lambda size: (_dpa_graph(size),), (1000, 4000, 16000, 64000)),
+        Benchmark("er_graph", graph_generators.er_graph,
+                  lambda size: (size, 10.0 / size, False, size),
+                  (10 ** 4, 10 ** 5, 10 ** 6)),
+        Benchmark("upa_graph", graph_generators.upa_graph,
+                  lambda size: (size, 5, size), (10 ** 4, 10 ** 5, 10 ** 6)),
+        Benchmark("make_upa_graph", graph_degees_calc.make_upa_graph,
+                  lambda size: (size, 5), (1000, 4000, 16000)),
+    ]
+
+
+def run_suite(names=None, repeats=DEFAULT_REPEATS, warmup=DEFAULT_WARMUP,
+              report=None):
+    """
+    Runs the graph benchmarks, all of them or those named in names
+
+    report -- optional function called with every result as it is done
+
+    Returns a dictionary from benchmark name to result
+    """
+    results = {}
+    for bench in _graph_benchmarks():
+        if names and bench.name not in names:
+            continue
+        results[bench.name] = run_benchmark(bench, repeats, warmup)
+        if report is not None:
+            report(results[bench.name])
+    return results
+
+
+def format_result(result):
+    """
+    One line summary of a benchmark result
+    """
+    exponent = result["exponent"]
+    return "%-20s n=%-9d best %9.4f s  exponent %s" % (
+        result["name"], result["sizes"][-1], result["best"][-1],
+        "%.2f" % exponent if exponent is not None else "-")
+
+
+def save_results(results, path):
+    """
+    Writes results to path as JSON
+    """
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+    Reads results saved by save_results
+    """
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def compare_results(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Regressions of results against baseline
+
+    A regression is a size, measured in both, where the best time grew
+    by more than threshold times.  Returns a list of (name, size, ratio)
+    tuples, worst first.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old_times = dict(zip(baseline[name]["sizes"], baseline[name]["best"]))
+        for size, elapsed in zip(result["sizes"], result["best"]):
+            old = old_times.get(size)
+            if old and elapsed > threshold * old:
+                regressions.append((name, size, elapsed / old))
+    regressions.sort(key=lambda regression: -regression[2])
+    return regressions
+
+
+def plot_results(results):
+    """
+    Log-log plot of the best times of every benchmark against size
+    """
+    import matplotlib.pyplot as plt
+    for name in sorted(results):
+        result = results[name]
+        plt.loglog(result["sizes"], result["best"], "-o", label=name)
+    plt.xlabel("Input size")
+    plt.ylabel("Best running time, seconds")
+    plt.title("Scaling of the graph functions")
+    plt.legend()
+    plt.show()
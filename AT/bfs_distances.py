@@ -0,0 +1,166 @@
+"""
+Breadth-first distance engine on compact graphs
+
+bfs_distances runs one BFS from any number of sources at once and
+returns a distance array indexed by row.  bit_parallel_bfs runs up to
+64 independent BFSs in the same sweep over the graph: every row keeps
+a 64-bit word with one bit per source, and a level of all searches is
+one pass of bitwise ORs over the edges.  Average path length,
+eccentricity and diameter estimates are built on top of them.
+"""
+import random
+from array import array
+from collections import deque
+
+import graph_csr
+
+WORD_BITS = 64
+
+
+def bfs_distances(ugraph, sources):
+    """
+    Multi-source BFS
+
+    Returns an array where entry row is the number of edges from the
+    nearest source to row, -1 where no source reaches it
+    """
+    csr = graph_csr.as_csr(ugraph)
+    offsets = csr.offsets()
+    targets = csr.targets()
+    distances = (array(graph_csr.int_typecode(csr.num_nodes()), [-1]) *
+                 csr.num_nodes())
+    queue = deque()
+    for node in sources:
+        row = csr.row(node)
+        if distances[row] == -1:
+            distances[row] = 0
+            queue.append(row)
+    while queue:
+        row = queue.popleft()
+        next_distance = distances[row] + 1
+        for idx in range(offsets[row], offsets[row + 1]):
+            neighbor = targets[idx]
+            if distances[neighbor] == -1:
+                distances[neighbor] = next_distance
+                queue.append(neighbor)
+    return distances
+
+
+def bit_parallel_bfs(ugraph, sources):
+    """
+    Independent BFS from every source, WORD_BITS sources per sweep
+
+    Returns a list with one distance array per source, in the order of
+    sources, with -1 for unreachable rows
+    """
+    csr = graph_csr.as_csr(ugraph)
+    sources = list(sources)
+    res = []
+    for begin in range(0, len(sources), WORD_BITS):
+        res.extend(_bit_parallel_batch(
+            csr, [csr.row(node) for node in sources[begin:begin + WORD_BITS]]))
+    return res
+
+
+def _bit_parallel_batch(csr, source_rows):
+    """
+    Distance arrays of at most WORD_BITS sources, sharing every sweep
+    """
+    offsets = csr.offsets()
+    targets = csr.targets()
+    num_nodes = csr.num_nodes()
+    typecode = graph_csr.int_typecode(num_nodes)
+    distances = [array(typecode, [-1]) * num_nodes for _ in source_rows]
+    visited = array('Q', [0]) * num_nodes
+    frontier = array('Q', [0]) * num_nodes
+    for bit, row in enumerate(source_rows):
+        visited[row] |= 1 << bit
+        frontier[row] |= 1 << bit
+        distances[bit][row] = 0
+
+    level = 0
+    active = bool(source_rows)
+    while active:
+        level += 1
+        reached = array('Q', [0]) * num_nodes
+        for row in range(num_nodes):
+            word = frontier[row]
+            if word:
+                for idx in range(offsets[row], offsets[row + 1]):
+                    reached[targets[idx]] |= word
+        active = False
+        for row in range(num_nodes):
+            new = reached[row] & ~visited[row]
+            reached[row] = new
+            if new:
+                active = True
+                visited[row] |= new
+                while new:
+                    lowest = new & -new
+                    distances[lowest.bit_length() - 1][row] = level
+                    new ^= lowest
+        frontier = reached
+    return distances
+
+
+def _sample_rows(csr, num_samples, rnd):
+    """
+    Up to num_samples distinct rows picked uniformly
+    """
+    num_nodes = csr.num_nodes()
+    return rnd.sample(range(num_nodes), min(num_samples, num_nodes))
+
+
+def average_path_length(ugraph, num_samples=WORD_BITS, seed=None):
+    """
+    Estimates the mean distance between connected pairs of distinct
+    nodes from BFSs out of num_samples random sources
+    """
+    csr = graph_csr.as_csr(ugraph)
+    rows = _sample_rows(csr, num_samples, random.Random(seed))
+    total = 0
+    pairs = 0
+    for distances in bit_parallel_bfs(csr, [csr.label(row) for row in rows]):
+        for distance in distances:
+            if distance > 0:
+                total += distance
+                pairs += 1
+    return float(total) / pairs if pairs else 0.0
+
+
+def eccentricity(ugraph, node):
+    """
+    Largest distance from node to any node it reaches
+    """
+    return max(bfs_distances(ugraph, [node]))
+
+
+def sample_eccentricities(ugraph, num_samples=WORD_BITS, seed=None):
+    """
+    Dictionary of eccentricities of num_samples random nodes
+    """
+    csr = graph_csr.as_csr(ugraph)
+    nodes = [csr.label(row) for row in
+             _sample_rows(csr, num_samples, random.Random(seed))]
+    return dict((node, max(distances)) for node, distances in
+                zip(nodes, bit_parallel_bfs(csr, nodes)))
+
+
+def estimate_diameter(ugraph, num_sweeps=4, seed=None):
+    """
+    Lower bound on the diameter from repeated double sweeps
+
+    Each sweep runs a BFS from a random node, then a BFS from the
+    farthest node found; the largest distance seen is returned.
+    """
+    csr = graph_csr.as_csr(ugraph)
+    if not csr.num_nodes():
+        return 0
+    rnd = random.Random(seed)
+    best = 0
+    for _ in range(num_sweeps):
+        distances = bfs_distances(csr, [csr.label(rnd.randrange(csr.num_nodes()))])
+        far_row = max(range(len(distances)), key=distances.__getitem__)
+        best = max(best, distances[far_row],
+                   eccentricity(csr, csr.label(far_row)))
+    return best
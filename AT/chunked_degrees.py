@@ -0,0 +1,225 @@
+"""
+Out-of-core in-degree counting for adjacency lists larger than memory
+
+compute_in_degrees needs the whole dict graph in memory.  Here the
+adjacency list text (an edge list is the special case of one neighbour
+per line) is read in fixed-size blocks, every block is parsed by NumPy
+into one array of node ids, and only the counts are kept:
+
+  * while ids are below max_dense_id they index a NumPy counts array
+    and a presence mask directly;
+  * larger, sparse ids are spilled to disk instead: every block is
+    aggregated into (id, count) pairs which are appended to one of
+    num_partitions files by id hash, and the partitions are summed one
+    at a time at the end.
+
+Memory is bounded by the block size plus either the dense arrays or the
+largest partition, never by the size of the input.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import graph_io
+
+BLOCK_BYTES = 1 << 24
+MAX_DENSE_ID = 1 << 27
+NUM_PARTITIONS = 64
+
+
+def parse_block(block):
+    """
+    Parses whole lines of whitespace or comma separated node ids
+
+    Returns (ids, first): an int64 array of every id in the block, in
+    order, and a bool array that is True for ids starting a line
+    """
+    # line breaks become -1 markers; ids themselves are never negative
+    values = np.fromstring(block.replace(b",", b" ").replace(b"\n", b" -1 "),
+                           dtype=np.int64, sep=" ")
+    marker = values < 0
+    first = np.empty(len(values), dtype=bool)
+    first[:1] = True
+    first[1:] = marker[:-1]
+    keep = ~marker
+    return values[keep], first[keep]
+
+
+class InDegreeCounter(object):
+    """
+    Accumulates in-degrees of blocks of adjacency lines
+
+    Every id seen is a node; ids that start a line are sources and all
+    others are targets of one edge each, as in load_graph.
+    """
+
+    def __init__(self, max_dense_id=MAX_DENSE_ID, spill_dir=None,
+                 num_partitions=NUM_PARTITIONS):
+        """
+        max_dense_id   -- ids from here on switch counting to disk
+        spill_dir      -- directory for the partition files, a temporary
+                          directory removed by close() by default
+        num_partitions -- number of partition files
+        """
+        self._max_dense_id = max_dense_id
+        self._spill_dir = spill_dir
+        self._own_dir = spill_dir is None
+        self._num_partitions = num_partitions
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._present = np.zeros(0, dtype=bool)
+        self._partitions = None
+        self.bytes_read = 0
+        self.num_ids = 0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_spilling(self):
+        """
+        True once counts are kept in partition files
+        """
+        return self._partitions is not None
+
+    def add_block(self, block):
+        """
+        Counts a block of whole adjacency lines
+        """
+        self.bytes_read += len(block)
+        ids, first = parse_block(block)
+        self.add_ids(ids, first)
+
+    def add_ids(self, ids, first):
+        """
+        Counts parsed ids, first marking the sources
+        """
+        if not len(ids):
+            return
+        self.num_ids += len(ids)
+        if not self.is_spilling() and ids.max() >= self._max_dense_id:
+            self._start_spilling()
+        if self.is_spilling():
+            nodes, inverse = np.unique(ids, return_inverse=True)
+            counts = np.bincount(inverse, weights=~first,
+                                 minlength=len(nodes)).astype(np.int64)
+            self._spill(nodes, counts)
+            return
+
+        size = int(ids.max()) + 1
+        if size > len(self._counts):
+            size = min(max(size, 2 * len(self._counts)), self._max_dense_id)
+            self._counts = np.concatenate(
+                (self._counts, np.zeros(size - len(self._counts), np.int64)))
+            self._present = np.concatenate(
+                (self._present, np.zeros(size - len(self._present), bool)))
+        self._present[ids] = True
+        targets, counts = np.unique(ids[~first], return_counts=True)
+        self._counts[targets] += counts
+
+    def _start_spilling(self):
+        """
+        Opens the partition files and moves the dense counts into them
+        """
+        if self._own_dir:
+            self._spill_dir = tempfile.mkdtemp(prefix="in_degrees_")
+        self._partitions = [
+            open(os.path.join(self._spill_dir, "part%03d.bin" % part), "wb")
+            for part in range(self._num_partitions)]
+        nodes = np.flatnonzero(self._present)
+        self._spill(nodes, self._counts[nodes])
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._present = np.zeros(0, dtype=bool)
+
+    def _spill(self, nodes, counts):
+        """
+        Appends (node, count) pairs to the partition of each node
+        """
+        parts = nodes % self._num_partitions
+        order = np.argsort(parts, kind="stable")
+        pairs = np.column_stack((nodes[order], counts[order]))
+        bounds = np.searchsorted(parts[order], np.arange(self._num_partitions + 1))
+        for part in range(self._num_partitions):
+            if bounds[part] < bounds[part + 1]:
+                pairs[bounds[part]:bounds[part + 1]].tofile(
+                    self._partitions[part])
+
+    def _iter_degrees(self):
+        """
+        Yields arrays of in-degrees of all nodes, one partition at a time
+        """
+        if not self.is_spilling():
+            yield self._counts[self._present]
+            return
+        for part_file in self._partitions:
+            part_file.flush()
+            pairs = np.fromfile(part_file.name, dtype=np.int64).reshape(-1, 2)
+            nodes, inverse = np.unique(pairs[:, 0], return_inverse=True)
+            yield np.bincount(inverse, weights=pairs[:, 1],
+                              minlength=len(nodes)).astype(np.int64)
+
+    def distribution(self):
+        """
+        Dictionary where keys are in-degrees and values are number of
+        nodes with that in-degree, as in_degree_distribution
+        """
+        total = np.zeros(0, dtype=np.int64)
+        for degrees in self._iter_degrees():
+            hist = np.bincount(degrees)
+            if len(hist) > len(total):
+                hist[:len(total)] += total
+                total = hist
+            else:
+                total[:len(hist)] += hist
+        return dict((int(degree), int(total[degree]))
+                    for degree in np.flatnonzero(total))
+
+    def throughput(self):
+        """
+        Dictionary of bytes and ids counted per second of counting
+        """
+        seconds = self.seconds or float("inf")
+        return {"bytes/s": self.bytes_read / seconds,
+                "ids/s": self.num_ids / seconds}
+
+    def close(self):
+        """
+        Closes the partition files, removing a temporary spill directory
+        """
+        if self._partitions is not None:
+            for part_file in self._partitions:
+                part_file.close()
+                if not self._own_dir:
+                    os.remove(part_file.name)
+            self._partitions = None
+            if self._own_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+
+def count_in_degrees(source, block_bytes=BLOCK_BYTES, **options):
+    """
+    Streams an adjacency list file or URL through an InDegreeCounter
+
+    options are passed to InDegreeCounter.  Returns the counter, whose
+    seconds include reading the source; close it when done.
+    """
+    counter = InDegreeCounter(**options)
+    start = time.time()
+    for block in graph_io.iter_blocks(source, block_bytes):
+        counter.add_block(block)
+    counter.seconds = time.time() - start
+    return counter
+
+
+def in_degree_distribution(source, block_bytes=BLOCK_BYTES, **options):
+    """
+    In-degree distribution of an adjacency list file or URL, computed
+    out of core; equal to in_degree_distribution of the loaded graph
+    """
+    with count_in_degrees(source, block_bytes, **options) as counter:
+        return counter.distribution()
@@ -5,9 +5,9 @@ Imports physics citation graph
 """
 
 # general imports
-import urllib2
+import graph_io
 import graph_degees_calc
-import matplotlib.pyplot as plt
+import degree_stats
 # Set timeout for CodeSkulptor if necessary
 #import codeskulptor
 # codeskulptor.set_timeout(20)
@@ -24,40 +24,26 @@ def load_graph(graph_url):
     Function that loads a graph given the URL
     for a text representation of the graph
 
-    Returns a dictionary that models a graph
+    Returns a compact CSR graph
     """
-    graph_file = urllib2.urlopen(graph_url)
-    graph_text = graph_file.read()
-    graph_lines = graph_text.split('\n')
-    graph_lines = graph_lines[: -1]
-
-    print "Loaded graph with", len(graph_lines), "nodes"
-
-    answer_graph = {}
-    for line in graph_lines:
-        neighbors = line.split(' ')
-        node = int(neighbors[0])
-        answer_graph[node] = set([])
-        for neighbor in neighbors[1: -1]:
-            answer_graph[node].add(int(neighbor))
-
-    return answer_graph
+    return graph_io.load_graph(graph_url)
 
 
 def plot_in_degree_dist():
     """
     Plotting log in degree to log amount of nodes of loaded grapth
     """
-    citation_graph = load_graph(CITATION_URL)
+    import matplotlib.pyplot as plt
+    stats = degree_stats.file_degree_stats(CITATION_URL)
 
-    in_degrees = graph_degees_calc.in_degree_distribution(citation_graph)
+    in_degrees = stats.distribution("in")
 
     total = float(sum(in_degrees.keys()))
-    in_degrees_norm = {key: val / total for key, val in in_degrees.iteritems()}
+    in_degrees_norm = {key: val / total for key, val in in_degrees.items()}
 
     plt.xscale('log')
     plt.yscale('log')
-    plt.plot(in_degrees_norm.keys(), in_degrees_norm.values(), "bo")
+    plt.plot(list(in_degrees_norm.keys()), list(in_degrees_norm.values()), "bo")
     plt.xlabel("log(In degree)")
     plt.ylabel("log(Amount of nodes)")
     plt.title("Distribution of in degree of nodes")
@@ -68,14 +54,18 @@ def plot_in_degree_dist():
 
 
 def plot_graph(graph):
+    """
+    Plotting log in degree to log amount of nodes of graph
+    """
+    import matplotlib.pyplot as plt
     in_degrees = graph_degees_calc.in_degree_distribution(graph)
 
     total = float(sum(in_degrees.keys()))
-    in_degrees_norm = {key: val / total for key, val in in_degrees.iteritems()}
+    in_degrees_norm = {key: val / total for key, val in in_degrees.items()}
 
     plt.xscale('log')
     plt.yscale('log')
-    plt.plot(in_degrees_norm.keys(), in_degrees_norm.values(), "bo")
+    plt.plot(list(in_degrees_norm.keys()), list(in_degrees_norm.values()), "bo")
     plt.xlabel("log(In degree)")
     plt.ylabel("log(Amount of nodes)")
     plt.title("Distribution of in degree of nodes")
@@ -83,10 +73,13 @@ def plot_graph(graph):
 
 
 def calc_average_out_degree(digraph):
+    """
+    Average out degree of digraph, rounded down
+    """
     out_degree = graph_degees_calc.compute_out_degree(digraph)
     num = graph_degees_calc.node_count(digraph)
     total_out = sum(out_degree.values())
-    return total_out / num
+    return total_out // num
 
 # plot_rnd_graph()
 
@@ -96,4 +89,9 @@ def calc_average_out_degree(digraph):
 # print calc_average_out_degree(load_graph(CITATION_URL))
 
 
-plot_graph(graph_degees_calc.make_dpa_graph(27000, 13))
+def plot_dpa_graph(num_nodes=27000, avg_degree=13):
+    """
+    Plotting the in degree distribution of a DPA graph
+    of the same size as the citation graph
+    """
+    plot_graph(graph_degees_calc.make_dpa_graph(num_nodes, avg_degree))
@@ -0,0 +1,299 @@
+"""
+Structure-of-arrays store for clusters of counties
+
+alg_cluster.Cluster keeps one object, with its own set of FIPS codes,
+per cluster, and every distance costs two method calls.  A ClusterTable
+holds the clusters of one clustering as parallel NumPy arrays indexed
+by row: horizontal and vertical centers, total populations and averaged
+risks.  Membership is a row label per county rather than a set per
+cluster, kept as a union-find parent array so merging two rows is O(1)
+and labels are resolved for all counties at once when needed.
+
+Merging row idx2 into row idx1 kills idx2; rows are never renumbered,
+so indices stay valid through a whole hierarchical run.  compact()
+drops dead rows.  Merges use the same arithmetic, in the same order, as
+Cluster.merge_clusters, so both give bit-identical centers and risks.
+"""
+import random
+
+import numpy as np
+
+import alg_cluster
+
+
+class ClusterTable(object):
+    """
+    Clusters of counties as parallel arrays, indexed by row
+    """
+
+    def __init__(self, horiz, vert, population, risk, fips=None, labels=None,
+                 points=None):
+        """
+        horiz, vert, population, risk -- sequences with one entry per row
+        fips   -- optional sequence of county FIPS codes
+        labels -- row of every county in fips, by default county i is
+                  in row i
+        points -- optional (horiz, vert, population) arrays of the
+                  counties in fips, used by cluster_error
+        """
+        self._horiz = np.array(horiz, dtype=np.float64)
+        self._vert = np.array(vert, dtype=np.float64)
+        self._population = np.array(population)
+        if self._population.dtype.kind not in "iuf":
+            self._population = self._population.astype(np.float64)
+        self._risk = np.array(risk, dtype=np.float64)
+        num_rows = len(self._horiz)
+        self._fips = list(fips) if fips is not None else []
+        if labels is None:
+            labels = np.arange(len(self._fips))
+        self._parent = np.arange(num_rows)
+        self._labels = np.array(labels, dtype=np.intp)
+        self._sizes = np.bincount(self._labels, minlength=num_rows)
+        self._alive = np.ones(num_rows, dtype=bool)
+        self._num_live = num_rows
+        self._points = points
+
+    @classmethod
+    def from_data_table(cls, data_table):
+        """
+        Table of singleton clusters, one per line of data_table
+
+        Lines are [fips, horiz, vert, population, risk].  The county
+        positions and populations are kept for cluster_error.
+        """
+        columns = list(zip(*data_table)) or [()] * 5
+        return cls(columns[1], columns[2], columns[3], columns[4],
+                   fips=columns[0],
+                   points=(np.array(columns[1], dtype=np.float64),
+                           np.array(columns[2], dtype=np.float64),
+                           np.array(columns[3], dtype=np.float64)))
+
+    @classmethod
+    def from_clusters(cls, cluster_list):
+        """
+        Table with one row per Cluster, counties labelled by their cluster
+        """
+        fips = []
+        labels = []
+        for row, cluster in enumerate(cluster_list):
+            codes = cluster.fips_codes()
+            fips.extend(codes)
+            labels.extend([row] * len(codes))
+        return cls([cluster.horiz_center() for cluster in cluster_list],
+                   [cluster.vert_center() for cluster in cluster_list],
+                   [cluster.total_population() for cluster in cluster_list],
+                   [cluster.averaged_risk() for cluster in cluster_list],
+                   fips, labels)
+
+    def __repr__(self):
+        return "ClusterTable(%d clusters, %d counties)" % (self._num_live,
+                                                           len(self._fips))
+
+    def __len__(self):
+        return self._num_live
+
+    def num_rows(self):
+        """
+        Number of rows, live and dead
+        """
+        return len(self._horiz)
+
+    def live_rows(self):
+        """
+        Array of the rows not merged into another row
+        """
+        return np.flatnonzero(self._alive)
+
+    def is_live(self, row):
+        """
+        True if row has not been merged into another row
+        """
+        return bool(self._alive[row])
+
+    def horiz_centers(self):
+        """
+        Get the array of horizontal centers, indexed by row
+        """
+        return self._horiz
+
+    def vert_centers(self):
+        """
+        Get the array of vertical centers, indexed by row
+        """
+        return self._vert
+
+    def populations(self):
+        """
+        Get the array of total populations, indexed by row
+        """
+        return self._population
+
+    def risks(self):
+        """
+        Get the array of averaged risks, indexed by row
+        """
+        return self._risk
+
+    def sizes(self):
+        """
+        Get the array of numbers of counties, indexed by row
+        """
+        return self._sizes
+
+    def fips(self):
+        """
+        Get the list of county FIPS codes
+        """
+        return self._fips
+
+    def labels(self):
+        """
+        Array with the live row of every county, in fips order
+        """
+        roots = self._parent
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+        self._parent = roots
+        return roots[self._labels]
+
+    def fips_codes(self, row):
+        """
+        Set of FIPS codes of the counties in row
+        """
+        labels = self.labels()
+        return set(self._fips[idx] for idx in np.flatnonzero(labels == row))
+
+    def distance(self, idx1, idx2):
+        """
+        Euclidean distance between the centers of rows idx1 and idx2,
+        which may be equal-length arrays of rows
+        """
+        return np.sqrt((self._vert[idx1] - self._vert[idx2]) ** 2 +
+                       (self._horiz[idx1] - self._horiz[idx2]) ** 2)
+
+    def distances(self, row, rows=None):
+        """
+        Array of distances from row to rows, all rows by default
+        """
+        if rows is None:
+            return np.sqrt((self._vert - self._vert[row]) ** 2 +
+                           (self._horiz - self._horiz[row]) ** 2)
+        return self.distance(row, rows)
+
+    def merge_clusters(self, idx1, idx2):
+        """
+        Merges row idx2 into row idx1, as Cluster.merge_clusters
+
+        idx1 and idx2 may be equal-length arrays of rows, no row
+        appearing twice, to do many independent merges at once.
+        Merging a row without counties leaves idx1 unchanged.  Row idx2
+        is dead afterwards.
+        """
+        idx1 = np.atleast_1d(np.asarray(idx1, dtype=np.intp))
+        idx2 = np.atleast_1d(np.asarray(idx2, dtype=np.intp))
+        if not (self._alive[idx1].all() and self._alive[idx2].all()):
+            raise KeyError("merging a dead row")
+        merge = self._sizes[idx2] > 0
+        rows, others = idx1[merge], idx2[merge]
+        if len(rows):
+            total = self._population[rows] + self._population[others]
+            if not total.all():
+                raise ZeroDivisionError("merging clusters with no population")
+            self_weight = self._population[rows].astype(np.float64) / total
+            other_weight = self._population[others].astype(np.float64) / total
+            self._population[rows] = total
+            self._vert[rows] = (self_weight * self._vert[rows] +
+                                other_weight * self._vert[others])
+            self._horiz[rows] = (self_weight * self._horiz[rows] +
+                                 other_weight * self._horiz[others])
+            self._risk[rows] = (self_weight * self._risk[rows] +
+                                other_weight * self._risk[others])
+            self._sizes[rows] += self._sizes[others]
+            self._sizes[others] = 0
+        self._parent[idx2] = idx1
+        self._alive[idx2] = False
+        self._num_live -= len(idx2)
+
+    def points(self):
+        """
+        Get the (horiz, vert, population) arrays of the counties, or
+        None for tables without county data
+        """
+        return self._points
+
+    def _point_arrays(self, data_table):
+        """
+        County positions and populations in fips order
+        """
+        if data_table is None:
+            if self._points is None:
+                raise ValueError("table has no county data, pass data_table")
+            return self._points
+        lines = dict((line[0], line) for line in data_table)
+        rows = [lines[code] for code in self._fips]
+        return (np.array([line[1] for line in rows], dtype=np.float64),
+                np.array([line[2] for line in rows], dtype=np.float64),
+                np.array([line[3] for line in rows], dtype=np.float64))
+
+    def cluster_error(self, data_table=None):
+        """
+        Array of the errors of all rows, as Cluster.cluster_error: the
+        population weighted sum of squared distances from each county
+        to its cluster center.  Dead rows have error 0.
+
+        data_table -- the original county data, not needed for tables
+                      made by from_data_table
+        """
+        horiz, vert, population = self._point_arrays(data_table)
+        labels = self.labels()
+        errors = population * ((horiz - self._horiz[labels]) ** 2 +
+                               (vert - self._vert[labels]) ** 2)
+        return np.bincount(labels, weights=errors, minlength=self.num_rows())
+
+    def total_error(self, data_table=None):
+        """
+        Distortion of the clustering: the sum of all cluster errors
+        """
+        return float(self.cluster_error(data_table).sum())
+
+    def compact(self):
+        """
+        Table of the live rows only, renumbered in row order
+        """
+        live = self.live_rows()
+        new_rows = np.full(self.num_rows(), -1, dtype=np.intp)
+        new_rows[live] = np.arange(len(live))
+        return ClusterTable(self._horiz[live], self._vert[live],
+                            self._population[live], self._risk[live],
+                            self._fips, new_rows[self.labels()], self._points)
+
+    def to_clusters(self):
+        """
+        List of Cluster objects of the live rows, in row order
+        """
+        live = self.live_rows()
+        codes = dict((row, set()) for row in live.tolist())
+        for code, row in zip(self._fips, self.labels().tolist()):
+            codes[row].add(code)
+        horiz = self._horiz.tolist()
+        vert = self._vert.tolist()
+        population = self._population.tolist()
+        risk = self._risk.tolist()
+        return [alg_cluster.Cluster(codes[row], horiz[row], vert[row],
+                                    population[row], risk[row])
+                for row in live.tolist()]
+
+
+def random_data_table(num_counties, seed=None):
+    """
+    Random county data table for benchmarks, lines of [fips, horiz,
+    vert, population, risk] with positions on the 1000 x 630 map of
+    the cancer data and populations of 1 to 10^6
+    """
+    rnd = random.Random(seed)
+    return [["%05d" % idx, rnd.uniform(0, 1000), rnd.uniform(0, 630),
+             rnd.randint(1, 10 ** 6), rnd.uniform(1e-5, 1e-4)]
+            for idx in range(num_counties)]
@@ -10,6 +10,10 @@ where cluster_list is a 2D list of clusters in the plane
 """
 
 import alg_cluster
+import agglomerative
+import cluster_table
+import kmeans
+import spatial_index
 
 ######################################################
 # Code for closest pairs of clusters
@@ -76,6 +80,23 @@ def fast_closest_pair(cluster_list):
     return result
 
 
+def grid_closest_pair(cluster_list):
+    """
+    Compute the distance between the closest pair of clusters in a list
+    with a spatial_index.GridIndex of their centers
+    Input: cluster_list is list of clusters, in any order
+    Output: tuple of the form (dist, idx1, idx2), idx1 < idx2,
+    as fast_closest_pair
+    """
+    index = spatial_index.GridIndex(
+        [cluster.horiz_center() for cluster in cluster_list],
+        [cluster.vert_center() for cluster in cluster_list])
+    dist, idx1, idx2 = index.closest_pair()
+    if idx1 is None:
+        return (dist, -1, -1)
+    return (dist, idx1, idx2)
+
+
 def closest_pair_strip(cluster_list, horiz_center, half_width):
     """
     Helper function to compute the closest pair of clusters in a vertical strip
@@ -112,7 +133,27 @@ def closest_pair_strip(cluster_list, horiz_center, half_width):
 def hierarchical_clustering(cluster_list, num_clusters):
     """
     Compute a hierarchical clustering of a set of clusters
-    Note: the function may mutate cluster_list
+    Note: the function does not mutate cluster_list
+    Input: List of clusters, integer number of clusters
+    Output: List of clusters whose length is num_clusters,
+    sorted by horizontal center
+
+    Uses cached nearest neighbours in agglomerative.iter_merges, which
+    merges the same closest pairs as slow_hierarchical_clustering unless
+    pairs tie for closest.  Ties go to the pair of clusters that came
+    first in cluster_list.
+    """
+    table = cluster_table.ClusterTable.from_clusters(cluster_list)
+    agglomerative.hierarchical_table(table, num_clusters)
+    clusters = table.to_clusters()
+    clusters.sort(key=lambda cluster: cluster.horiz_center())
+    return clusters
+
+
+def slow_hierarchical_clustering(cluster_list, num_clusters):
+    """
+    Compute a hierarchical clustering of a set of clusters (slow)
+    Re-sorts the clusters and runs fast_closest_pair after every merge
     Input: List of clusters, integer number of clusters
     Output: List of clusters whose length is num_clusters
     """
@@ -122,7 +163,6 @@ def hierarchical_clustering(cluster_list, num_clusters):
         closest = fast_closest_pair(clusters)
         clusters[closest[1]].merge_clusters(clusters[closest[2]])
         clusters.pop(closest[2])
-        print len(clusters)
     return clusters
 
 
@@ -137,6 +177,22 @@ def kmeans_clustering(cluster_list, num_clusters, num_iterations):
     Input: List of clusters, integers number of clusters
     and number of iterations
     Output: List of clusters whose length is num_clusters
+
+    Gives the same clusters as slow_kmeans_clustering, computed by
+    kmeans.kmeans_table, which stops early only at a fixed point.
+    """
+    table = cluster_table.ClusterTable.from_clusters(cluster_list)
+    return kmeans.kmeans_table(table, num_clusters,
+                               num_iterations).clusters.to_clusters()
+
+
+def slow_kmeans_clustering(cluster_list, num_clusters, num_iterations):
+    """
+    Compute the k-means clustering of a set of clusters (slow)
+    Note: the function may not mutate cluster_list
+    Input: List of clusters, integers number of clusters
+    and number of iterations
+    Output: List of clusters whose length is num_clusters
     """
     cluster_list_copy = [cluster.copy() for cluster in cluster_list]
     cluster_list_copy.sort(key=lambda x: x.total_population())
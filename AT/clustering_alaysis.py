@@ -3,9 +3,10 @@
 import clustering
 import alg_cluster
 import random
-import time
-import matplotlib.pyplot as plt
 import math
+import numpy as np
+import benchmark
+import cluster_table
 
 
 
@@ -23,40 +24,45 @@ def gen_random_clusters(num_clusters):
     return result
 
 
-def time_run_brute(runs):
-    """Times fnk on upa graph"""
-    xval = []
-    yval = []
-    for n in range(2, runs):
-        xval.append(n)
-        test_list = gen_random_clusters(n)
-        c_time = time.time()
-        clustering.slow_closest_pair(test_list)
-        time_passed = time.time() - c_time
-        yval.append(time_passed)
-    return [xval, yval]
-
-def time_run_divide(runs):
-    """Times fnk on upa graph"""
-    xval = []
-    yval = []
-    for n in range(2, runs):
-        xval.append(n)
-        test_list = gen_random_clusters(n)
-        #test_list.sort(key=lambda x: x.horiz_center())
-        c_time = time.time()
-        clustering.fast_closest_pair(test_list)
-        time_passed = time.time() - c_time
-        yval.append(time_passed)
-    return [xval, yval]
+def time_run_brute(runs, repeats=3):
+    """
+    Times slow_closest_pair on 2 to runs - 1 random clusters
+    """
+    sizes, times = benchmark.time_run(
+        clustering.slow_closest_pair,
+        lambda n: (gen_random_clusters(n),), range(2, runs), repeats)
+    return [list(sizes), times]
+
+
+def time_run_divide(runs, repeats=3):
+    """
+    Times fast_closest_pair on 2 to runs - 1 random clusters
+    """
+    sizes, times = benchmark.time_run(
+        clustering.fast_closest_pair,
+        lambda n: (gen_random_clusters(n),), range(2, runs), repeats)
+    return [list(sizes), times]
+
+
+def time_run_grid(runs, repeats=3):
+    """
+    Times grid_closest_pair on 2 to runs - 1 random clusters
+    """
+    sizes, times = benchmark.time_run(
+        clustering.grid_closest_pair,
+        lambda n: (gen_random_clusters(n),), range(2, runs), repeats)
+    return [list(sizes), times]
 
 
 def plot():
+    import matplotlib.pyplot as plt
     runs = 200
     time_brute = time_run_brute(runs)
     time_divide = time_run_divide(runs)
+    time_grid = time_run_grid(runs)
     plt.plot(time_brute[0], time_brute[1], '-r', label="slow_closest_pair")
     plt.plot(time_divide[0], time_divide[1], '-g', label="fast_closest_pair")
+    plt.plot(time_grid[0], time_grid[1], '-b', label="grid_closest_pair")
     plt.xlabel("Number of clusters in set")
     plt.ylabel("Runtime")
     plt.title("Runtimes of fast and slow algorythms")
@@ -68,9 +74,12 @@ def compute_distortion(cluster_list, data_table):
     """
     Given list of cluster, computes distortion of all clusters
     Returns a number of distortion
+
+    Errors of all clusters are computed in one pass over a ClusterTable
+    instead of one data_table lookup per cluster.
     """
-    return sum((abs(cluster.cluster_error(data_table))
-                for cluster in cluster_list))
+    table = cluster_table.ClusterTable.from_clusters(cluster_list)
+    return float(np.abs(table.cluster_error(data_table)).sum())
 
 # if __name__ == "__main__":
 #     plot()
\ No newline at end of file
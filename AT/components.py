@@ -0,0 +1,70 @@
+"""
+Connected components labelling in one linear pass
+
+Every node gets a component id in a single sweep over the rows of the
+graph, with the label array doubling as the visited bitmap, so graphs
+with many small components cost O(n + m) instead of rebuilding the
+list of remaining nodes after every component.
+"""
+from array import array
+from collections import deque
+
+import graph_csr
+
+
+def connected_components(ugraph, present=None):
+    """
+    Labels the connected components of an undirected graph
+
+    present -- optional bytearray over rows; rows set to 0 are treated
+               as deleted from the graph and get the label -1
+
+    Returns a tuple (labels, sizes) where labels[row] is the component
+    id of row and sizes[component_id] is the number of nodes in it
+    """
+    csr = graph_csr.as_csr(ugraph)
+    num_nodes = csr.num_nodes()
+    offsets = csr.offsets()
+    targets = csr.targets()
+    typecode = graph_csr.int_typecode(num_nodes)
+    labels = array(typecode, [-1]) * num_nodes
+    sizes = array(typecode)
+    queue = deque()
+    for start in range(num_nodes):
+        if labels[start] != -1 or (present is not None and not present[start]):
+            continue
+        component = len(sizes)
+        labels[start] = component
+        queue.append(start)
+        size = 0
+        while queue:
+            row = queue.popleft()
+            size += 1
+            for idx in range(offsets[row], offsets[row + 1]):
+                neighbor = targets[idx]
+                if labels[neighbor] == -1 and (present is None or
+                                               present[neighbor]):
+                    labels[neighbor] = component
+                    queue.append(neighbor)
+        sizes.append(size)
+    return labels, sizes
+
+
+def component_sets(ugraph):
+    """
+    Returns list of sets of nodes, one set per connected component
+    """
+    csr = graph_csr.as_csr(ugraph)
+    labels, sizes = connected_components(csr)
+    res = [set() for _ in range(len(sizes))]
+    for row, component in enumerate(labels):
+        res[component].add(csr.label(row))
+    return res
+
+
+def largest_component_size(ugraph, present=None):
+    """
+    Returns size of the largest connected component, 0 for empty graphs
+    """
+    sizes = connected_components(ugraph, present)[1]
+    return max(sizes) if sizes else 0
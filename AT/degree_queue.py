@@ -0,0 +1,142 @@
+"""
+Degree bucket queue for targeted attack orders
+
+Nodes are kept in one doubly-linked list per degree, with the links
+stored in flat arrays indexed by row.  Moving a node to the bucket
+below when a neighbour is removed and popping a node of maximal degree
+are O(1), amortised over the falling maximum degree.
+"""
+from array import array
+
+import graph_csr
+import removal_view
+
+TIE_POLICIES = ("lifo", "fifo")
+
+
+class DegreeBucketQueue(object):
+    """
+    Max-degree priority queue over rows 0..n-1 with O(1) updates
+
+    Ties among nodes of maximal degree are broken by policy:
+    "lifo" pops the node that entered its bucket last,
+    "fifo" pops the node that entered its bucket first.
+    Initially rows enter their buckets in ascending order.
+    """
+
+    def __init__(self, degrees, policy="lifo", exclude=None):
+        """
+        degrees -- sequence with the starting degree of every row
+        exclude -- optional sequence, rows where it is true are left out
+        """
+        if policy not in TIE_POLICIES:
+            raise ValueError("unknown tie policy %r" % (policy,))
+        num_rows = len(degrees)
+        max_degree = max(degrees) if num_rows else 0
+        typecode = graph_csr.int_typecode(max(num_rows, max_degree + 1))
+        self._pop_head = policy == "fifo"
+        self._degree = array(typecode, degrees)
+        self._next = array(typecode, [-1]) * num_rows
+        self._prev = array(typecode, [-1]) * num_rows
+        self._head = array(typecode, [-1]) * (max_degree + 1)
+        self._tail = array(typecode, [-1]) * (max_degree + 1)
+        self._max_degree = max_degree
+        self._size = 0
+        for row in range(num_rows):
+            if exclude is None or not exclude[row]:
+                self._link(row)
+
+    def __len__(self):
+        return self._size
+
+    def degree(self, row):
+        """
+        Current degree of row
+        """
+        return self._degree[row]
+
+    def _link(self, row):
+        """
+        Appends row to the back of its degree bucket
+        """
+        degree = self._degree[row]
+        tail = self._tail[degree]
+        self._prev[row] = tail
+        self._next[row] = -1
+        if tail == -1:
+            self._head[degree] = row
+        else:
+            self._next[tail] = row
+        self._tail[degree] = row
+        self._size += 1
+
+    def _unlink(self, row):
+        """
+        Removes row from its degree bucket
+        """
+        degree = self._degree[row]
+        prev_row = self._prev[row]
+        next_row = self._next[row]
+        if prev_row == -1:
+            self._head[degree] = next_row
+        else:
+            self._next[prev_row] = next_row
+        if next_row == -1:
+            self._tail[degree] = prev_row
+        else:
+            self._prev[next_row] = prev_row
+        self._size -= 1
+
+    def decrement(self, row):
+        """
+        Lowers the degree of a queued row by one
+        """
+        self._unlink(row)
+        self._degree[row] -= 1
+        self._link(row)
+
+    def pop_max(self):
+        """
+        Removes and returns a row of maximal degree
+        """
+        if not self._size:
+            raise IndexError("pop from empty DegreeBucketQueue")
+        while self._head[self._max_degree] == -1:
+            self._max_degree -= 1
+        if self._pop_head:
+            row = self._head[self._max_degree]
+        else:
+            row = self._tail[self._max_degree]
+        self._unlink(row)
+        return row
+
+
+def iter_target_order(ugraph, policy="lifo"):
+    """
+    Yields the nodes of ugraph in targeted attack order
+
+    Each node yielded has maximal degree in the graph left after
+    removing the nodes yielded before it.  ugraph may be a RemovalView,
+    in which case only its live nodes are ordered.  ugraph is not
+    modified or copied beyond its compact CSR form.
+    """
+    view = removal_view.RemovalView(ugraph)
+    csr = view.base()
+    offsets = csr.offsets()
+    targets = csr.targets()
+    removed = view.removed()
+    queue = DegreeBucketQueue(view.live_degrees(), policy, exclude=removed)
+    while len(queue):
+        row = queue.pop_max()
+        removed[row] = 1
+        for idx in range(offsets[row], offsets[row + 1]):
+            if not removed[targets[idx]]:
+                queue.decrement(targets[idx])
+        yield csr.label(row)
+
+
+def target_order(ugraph, policy="lifo"):
+    """
+    Compute attack order, return nodes in order
+    """
+    return list(iter_target_order(ugraph, policy))
@@ -0,0 +1,188 @@
+"""
+Single pass degree statistics
+
+One sweep over a graph, or over an adjacency list file without
+building the graph at all, counts in- and out-degrees into flat
+arrays.  Histograms, mean, variance, maximum and log-binned CCDFs are
+all derived from those arrays without touching the graph again, and
+snapshots saved with degrees skip the sweep altogether.
+"""
+from array import array
+
+import graph_csr
+import graph_io
+import graph_snapshot
+from node_interner import NodeInterner
+
+
+class DegreeStats:
+    """
+    In- and out-degree of every node plus summaries derived from them
+
+    Degrees are stored by row, rows numbered in order of first appearance.
+    """
+
+    def __init__(self, in_degree, out_degree, interner=None):
+        """
+        in_degree, out_degree -- arrays of degrees indexed by row
+        interner              -- NodeInterner of the node ids, None if
+                                 nodes are their own rows
+        """
+        self._degrees = {"in": in_degree, "out": out_degree}
+        self._interner = interner
+        self._histograms = {}
+
+    def num_nodes(self):
+        """
+        Number of nodes counted
+        """
+        return len(self._degrees["in"])
+
+    def num_edges(self):
+        """
+        Number of directed edges counted
+        """
+        return sum(self._degrees["out"])
+
+    def degrees(self, kind="in"):
+        """
+        Array of "in" or "out" degrees indexed by row
+        """
+        return self._degrees[kind]
+
+    def node_degree(self, node, kind="in"):
+        """
+        Degree of one node, looked up by its id
+        """
+        row = node if self._interner is None else self._interner.row(node)
+        return self._degrees[kind][row]
+
+    def histogram(self, kind="in"):
+        """
+        Array where entry d is the number of nodes with degree d
+        """
+        if kind not in self._histograms:
+            degrees = self._degrees[kind]
+            hist = array(graph_csr.int_typecode(len(degrees)), [0]) * (max(degrees) + 1 if degrees else 0)
+            for degree in degrees:
+                hist[degree] += 1
+            self._histograms[kind] = hist
+        return self._histograms[kind]
+
+    def distribution(self, kind="in"):
+        """
+        Dictionary where keys are degrees
+        and values are number of occurences
+        """
+        return dict((degree, count)
+                    for degree, count in enumerate(self.histogram(kind))
+                    if count)
+
+    def max_degree(self, kind="in"):
+        """
+        Largest degree, 0 for empty graphs
+        """
+        return max(len(self.histogram(kind)) - 1, 0)
+
+    def mean(self, kind="in"):
+        """
+        Average degree
+        """
+        if not self.num_nodes():
+            return 0.0
+        total = sum(degree * count
+                    for degree, count in enumerate(self.histogram(kind)))
+        return float(total) / self.num_nodes()
+
+    def variance(self, kind="in"):
+        """
+        Population variance of the degrees
+        """
+        if not self.num_nodes():
+            return 0.0
+        mean = self.mean(kind)
+        second = sum(degree * degree * count
+                     for degree, count in enumerate(self.histogram(kind)))
+        return float(second) / self.num_nodes() - mean * mean
+
+    def ccdf(self, kind="in", bins_per_decade=10):
+        """
+        Log-binned complementary cumulative distribution
+
+        Returns a list of (degree, fraction of nodes with at least
+        that degree) at logarithmically spaced degrees from 1 upwards
+        """
+        hist = self.histogram(kind)
+        if not self.num_nodes():
+            return []
+        at_least = array(hist.typecode, [0]) * (len(hist) + 1)
+        for degree in range(len(hist) - 1, -1, -1):
+            at_least[degree] = at_least[degree + 1] + hist[degree]
+        res = []
+        ratio = 10.0 ** (1.0 / bins_per_decade)
+        edge = 1.0
+        degree = 1
+        while degree < len(hist):
+            res.append((degree, float(at_least[degree]) / self.num_nodes()))
+            while int(edge) <= degree:
+                edge *= ratio
+            degree = int(edge)
+        return res
+
+
+def graph_degree_stats(digraph):
+    """
+    Computes DegreeStats of a dict-of-sets or CSR graph in one pass
+    """
+    csr = graph_csr.as_csr(digraph)
+    in_degree, out_degree = graph_csr.degree_arrays(csr)
+    return DegreeStats(in_degree, out_degree, csr.interner())
+
+
+def stream_degree_stats(lines):
+    """
+    Computes DegreeStats from adjacency list lines without building a graph
+
+    Nodes that only appear as neighbours are counted with out-degree 0.
+    Only the NodeInterner of the node ids and the counters are kept in
+    memory.
+    """
+    interner = NodeInterner()
+    in_degree = array('q')
+    out_degree = array('q')
+    for line in lines:
+        tokens = line.split()
+        if not tokens:
+            continue
+        for pos, token in enumerate(tokens):
+            row = interner.intern(int(token))
+            if row == len(in_degree):
+                in_degree.append(0)
+                out_degree.append(0)
+            if pos:
+                in_degree[row] += 1
+            else:
+                source = row
+        out_degree[source] += len(tokens) - 1
+    return DegreeStats(in_degree, out_degree, interner)
+
+
+def file_degree_stats(source):
+    """
+    Computes DegreeStats of an adjacency list file or URL, streamed
+    """
+    return stream_degree_stats(graph_io.iter_lines(source))
+
+
+def snapshot_degree_stats(path):
+    """
+    Computes DegreeStats of a graph_snapshot file
+
+    Degree arrays saved in the snapshot are used as mapped, without a
+    pass over the edges; otherwise they are counted from the graph.
+    """
+    snapshot = graph_snapshot.map_snapshot(path)
+    if snapshot.in_degree is None:
+        return graph_degree_stats(snapshot.graph)
+    return DegreeStats(snapshot.in_degree, snapshot.out_degree,
+                       snapshot.graph.interner())
@@ -0,0 +1,21 @@
+"""
+Fixtures shared by the unit_ test modules
+"""
+import alg_cluster
+
+
+def singletons(data_table):
+    """Cluster objects of every line"""
+    return [alg_cluster.Cluster(set([line[0]]), line[1], line[2], line[3],
+                                line[4]) for line in data_table]
+
+
+def random_graph(num_nodes, prob, rnd):
+    """Undirected ER graph"""
+    graph = dict((node, set()) for node in range(num_nodes))
+    for node1 in range(num_nodes):
+        for node2 in range(node1 + 1, num_nodes):
+            if rnd.random() < prob:
+                graph[node1].add(node2)
+                graph[node2].add(node1)
+    return graph
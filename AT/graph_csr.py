@@ -0,0 +1,374 @@
+"""
+Compressed sparse row (CSR) representation of graphs
+
+A CSRGraph keeps the whole adjacency structure in two flat arrays:
+offsets[row]..offsets[row + 1] is the slice of targets holding the
+neighbours of row.  It exposes the same read API as the dict-of-sets
+graphs used in the rest of AT/ (graph[node], iteration, len, keys,
+values, items) so read-only routines such as bfs_visited,
+compute_in_degrees and edge_count work on it unchanged.
+"""
+import operator
+import random
+import sys
+import time
+from array import array
+from collections import deque
+
+from node_interner import NodeInterner
+
+
+def int_typecode(max_value):
+    """
+    Returns the smallest signed array typecode that can hold max_value
+
+    'q' rather than 'l' for wide values: 'l' is only 32 bits on
+    platforms such as Windows.
+    """
+    if max_value < 2 ** 31:
+        return 'i'
+    return 'q'
+
+
+class CSRGraph(object):
+    """
+    Immutable graph stored as offsets + neighbour arrays
+
+    Rows are numbered 0..n-1.  When labels is None the node names are
+    the row numbers themselves, otherwise a NodeInterner maps node names
+    to rows and back.
+    """
+
+    def __init__(self, offsets, targets, labels=None):
+        """
+        offsets -- n + 1 row offsets into targets
+        targets -- row numbers of neighbours, grouped by source row
+        labels  -- optional NodeInterner, or sequence of node names with
+                   one per row
+        """
+        self._offsets = offsets
+        self._targets = targets
+        self._interner = None
+        if labels is not None:
+            if not isinstance(labels, NodeInterner):
+                labels = NodeInterner(labels)
+            self._interner = labels
+
+    def __repr__(self):
+        return "CSRGraph(%d nodes, %d adjacency entries)" % (
+            self.num_nodes(), self.num_entries())
+
+    def offsets(self):
+        """
+        Get the row offsets array
+        """
+        return self._offsets
+
+    def targets(self):
+        """
+        Get the neighbour rows array
+        """
+        return self._targets
+
+    def labels(self):
+        """
+        Get the node names, None if nodes are named by their rows
+        """
+        if self._interner is None:
+            return None
+        return self._interner.labels()
+
+    def interner(self):
+        """
+        Get the NodeInterner of the node names, None if nodes are named
+        by their rows
+        """
+        return self._interner
+
+    def num_nodes(self):
+        """
+        Number of nodes in the graph
+        """
+        return len(self._offsets) - 1
+
+    def num_entries(self):
+        """
+        Number of adjacency entries, twice the edge count if undirected
+        """
+        return len(self._targets)
+
+    def row(self, node):
+        """
+        Returns the row of node, raises KeyError for unknown nodes
+        """
+        if self._interner is not None:
+            return self._interner.row(node)
+        try:
+            row = operator.index(node)
+        except TypeError:
+            raise KeyError(node)
+        if not 0 <= row < self.num_nodes():
+            raise KeyError(node)
+        return row
+
+    def label(self, row):
+        """
+        Returns the node name stored at row
+        """
+        if self._interner is None:
+            return row
+        return self._interner.label(row)
+
+    def neighbor_rows(self, row):
+        """
+        Returns the neighbour rows of row as an array slice
+        """
+        return self._targets[self._offsets[row]:self._offsets[row + 1]]
+
+    def row_degree(self, row):
+        """
+        Returns the out degree of row
+        """
+        return self._offsets[row + 1] - self._offsets[row]
+
+    def degree(self, node):
+        """
+        Returns the out degree of node
+        """
+        return self.row_degree(self.row(node))
+
+    def nbytes(self):
+        """
+        Number of bytes held by the offsets, targets and labels buffers
+        """
+        total = 0
+        for buf in (self._offsets, self._targets):
+            if isinstance(buf, array):
+                total += buf.buffer_info()[1] * buf.itemsize
+            else:
+                total += sys.getsizeof(buf)
+        if self._interner is not None:
+            total += self._interner.nbytes()
+        return total
+
+    def __len__(self):
+        return self.num_nodes()
+
+    def __iter__(self):
+        if self._interner is None:
+            return iter(range(self.num_nodes()))
+        return iter(self._interner)
+
+    def __contains__(self, node):
+        try:
+            self.row(node)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __getitem__(self, node):
+        rows = self.neighbor_rows(self.row(node))
+        if self._interner is None:
+            return rows
+        labels = self._interner.labels()
+        return [labels[row] for row in rows]
+
+    def __deepcopy__(self, memo):
+        """
+        Callers deep copy a graph in order to mutate it, so the copy
+        is handed back as a mutable dict-of-sets graph
+        """
+        return to_dict_graph(self)
+
+    def keys(self):
+        """
+        List of nodes, in row order
+        """
+        return list(self)
+
+    def values(self):
+        """
+        List of neighbour sequences, in row order
+        """
+        return [self[node] for node in self]
+
+    def items(self):
+        """
+        List of (node, neighbours) pairs, in row order
+        """
+        return [(node, self[node]) for node in self]
+
+
+def _is_dense(graph):
+    """
+    True if the nodes of graph are exactly the integers 0..n-1
+    """
+    num_nodes = len(graph)
+    for node in graph:
+        if not isinstance(node, int) or not 0 <= node < num_nodes:
+            return False
+    return True
+
+
+def degree_arrays(csr):
+    """
+    In- and out-degree arrays of csr, indexed by row, in one pass
+    """
+    offsets = csr.offsets()
+    num_nodes = csr.num_nodes()
+    typecode = int_typecode(csr.num_entries())
+    in_degree = array(typecode, [0]) * num_nodes
+    out_degree = array(typecode, [0]) * num_nodes
+    for row in range(num_nodes):
+        out_degree[row] = offsets[row + 1] - offsets[row]
+    for target in csr.targets():
+        in_degree[target] += 1
+    return in_degree, out_degree
+
+
+def from_dict_graph(graph, keep_order=False):
+    """
+    Converts a dict-of-sets graph into a CSRGraph
+
+    Every neighbour must itself be a node of the graph.
+    Neighbours are stored in ascending row order.
+
+    keep_order -- rows follow the iteration order of graph; otherwise
+                  the nodes of a dense graph are their own rows
+    """
+    num_nodes = len(graph)
+    dense = _is_dense(graph)
+    if dense and keep_order:
+        dense = all(node == row for row, node in enumerate(graph))
+    if dense:
+        interner = None
+        nodes = range(num_nodes)
+    else:
+        interner = NodeInterner()
+        for node in graph:
+            interner.intern(node)
+        nodes = interner
+    offsets = array(int_typecode(sum(len(graph[node]) for node in nodes)), [0])
+    targets = array(int_typecode(num_nodes))
+    for node in nodes:
+        neighbors = graph[node]
+        if interner is not None:
+            neighbors = [interner.row(neighbor) for neighbor in neighbors]
+        else:
+            for neighbor in neighbors:
+                if neighbor not in graph:
+                    raise KeyError(neighbor)
+        targets.extend(sorted(neighbors))
+        offsets.append(len(targets))
+    return CSRGraph(offsets, targets, interner)
+
+
+def to_dict_graph(csr):
+    """
+    Converts a CSRGraph back into a dict-of-sets graph
+    """
+    res = {}
+    for node in csr:
+        res[node] = set(csr[node])
+    return res
+
+
+def as_csr(graph):
+    """
+    Returns graph itself if it is a CSRGraph, its CSR conversion otherwise
+    """
+    if isinstance(graph, CSRGraph):
+        return graph
+    return from_dict_graph(graph)
+
+
+######################################################
+# Memory and time comparison with the dict representation
+
+
+def dict_graph_nbytes(graph):
+    """
+    Approximate bytes held by a dict-of-sets graph,
+    counting the dict, every set and every node object once per reference
+    """
+    total = sys.getsizeof(graph)
+    for node, neighbors in graph.items():
+        total += sys.getsizeof(node) + sys.getsizeof(neighbors)
+        for neighbor in neighbors:
+            total += sys.getsizeof(neighbor)
+    return total
+
+
+def _bfs_count(graph, start_node):
+    """
+    Number of nodes reachable from start_node, using only graph[node]
+    """
+    visited = set([start_node])
+    queue = deque([start_node])
+    while queue:
+        for neighbor in graph[queue.popleft()]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(neighbor)
+    return len(visited)
+
+
+def _best_time(fnk, repeats):
+    """
+    Best wall clock time of repeats calls of fnk
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        c_time = time.time()
+        fnk()
+        best = min(best, time.time() - c_time)
+    return best
+
+
+def compare_representations(graph, repeats=3):
+    """
+    Compares a dict-of-sets graph with its CSR conversion
+
+    Returns a dictionary with memory in bytes, bytes per adjacency entry,
+    and best times of a full BFS and a full adjacency scan for both forms
+    """
+    csr = from_dict_graph(graph)
+    start_node = next(iter(graph))
+    entries = max(csr.num_entries(), 1)
+
+    def scan(target):
+        """Touch every adjacency entry"""
+        return sum(len(target[node]) for node in target)
+
+    res = {"nodes": csr.num_nodes(), "entries": csr.num_entries(),
+           "dict_bytes": dict_graph_nbytes(graph), "csr_bytes": csr.nbytes()}
+    res["dict_bytes_per_entry"] = res["dict_bytes"] / float(entries)
+    res["csr_bytes_per_entry"] = res["csr_bytes"] / float(entries)
+    for name, target in (("dict", graph), ("csr", csr)):
+        res[name + "_bfs_time"] = _best_time(
+            lambda: _bfs_count(target, start_node), repeats)
+        res[name + "_scan_time"] = _best_time(lambda: scan(target), repeats)
+    res["convert_time"] = _best_time(lambda: from_dict_graph(graph), repeats)
+    return res
+
+
+def _random_undirected_graph(num_nodes, avg_degree, seed=0):
+    """
+    Random undirected dict graph used by the benchmark
+    """
+    rnd = random.Random(seed)
+    graph = dict((node, set()) for node in range(num_nodes))
+    for _ in range(num_nodes * avg_degree // 2):
+        node1 = rnd.randrange(num_nodes)
+        node2 = rnd.randrange(num_nodes)
+        if node1 != node2:
+            graph[node1].add(node2)
+            graph[node2].add(node1)
+    return graph
+
+
+if __name__ == "__main__":
+    for size in (10000, 100000):
+        stats = compare_representations(_random_undirected_graph(size, 10))
+        for key in sorted(stats):
+            print("%d %s: %s" % (size, key, stats[key]))
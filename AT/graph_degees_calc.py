@@ -1,9 +1,12 @@
 """
 Simple graph distionary representation and calculation
 """
+from __future__ import print_function
 import random
 import dpa_trial
 import upa_trial
+import graph_io
+import graph_csr
 EX_GRAPH0 = {0: set([1, 2]), 1: set([]), 2: set([])}
 EX_GRAPH1 = {0: set([1, 4, 5]), 1: set([2, 6]), 2: set([3]),
              3: set([0]), 4: set([1]), 5: set([2]), 6: set([])}
@@ -123,13 +126,6 @@ def node_count(graph):
     return len(graph.keys())
 
 
-print node_count(EX_GRAPH0)
-print node_count(EX_GRAPH1)
-print node_count(EX_GRAPH2)
-print node_count({})
-print "----------------"
-
-
 def edge_count(graph):
     """
     Returns the number of edges in a graph.
@@ -143,17 +139,7 @@ def edge_count(graph):
     res = 0
     for edges in graph.values():
         res += len(edges)
-    return res / 2
-
-
-graph1 = {"0": set(["1", "2"]),
-          "1": set(["0", "2"]),
-          "2": set(["1", "0"])}
-print edge_count(graph1)
-print edge_count(EX_GRAPH0)
-print edge_count(EX_GRAPH1)
-print edge_count(EX_GRAPH2)
-print edge_count({})
+    return res // 2
 
 
 def make_graph1(num_nodes):
@@ -182,10 +168,6 @@ def make_graph2(num_nodes):
     return res
 
 
-print make_graph1(5)
-print make_graph2(5)
-
-
 def is_undirected_graph_valid(graph):
     """
     Tests whether the given graph is logically valid.
@@ -202,36 +184,12 @@ def is_undirected_graph_valid(graph):
     Returns:
     True if the graph is logically valid.  False otherwise.
     """
-    for node in graph:
-        for edge in graph[node]:
-            if (edge not in graph) or (edge == node) or (node not in graph[edge]):
-                return False
-    return True
-
-
-graph1 = {"0": set(["1", "2"]),
-          "1": set(["0", "2"]),
-          "2": set(["1", "0"])}
-print is_undirected_graph_valid(graph1)
-
-graph2 = {"0": set(["1", "2"]),
-          "1": set(["0", "2"]),
-          "2": set(["1"])}
-print is_undirected_graph_valid(graph2)
-
-graph3 = make_complete_graph(100)
-print is_undirected_graph_valid(graph3)
-
-graph4 = {"0": set(["1", "2"]),
-          "1": set(["0", "2"]),
-          "2": set(["1", "3"])}
-print is_undirected_graph_valid(graph4)
-
-graph5 = {"0": set(["0"])}
+    import graph_validation
+    return graph_validation.validate_graph(graph).is_valid()
 
 
 def find_popular_nodes(graph):
-    avg_degree = (edge_count(graph) * 2) / node_count(graph)
+    avg_degree = (edge_count(graph) * 2) // node_count(graph)
     count = 0
     res = set([])
     for node in graph:
@@ -241,7 +199,6 @@ def find_popular_nodes(graph):
     return count, res
 
 
-import urllib2
 CITATION_URL = "http://storage.googleapis.com/codeskulptor-alg/random10000.txt"
 
 
@@ -252,82 +209,97 @@ def load_graph(graph_url):
 
     Returns a dictionary that models a graph
     """
-    graph_file = urllib2.urlopen(graph_url)
-    graph_text = graph_file.read()
-    graph_lines = graph_text.split('\n')
-    graph_lines = graph_lines[: -1]
-
-    print "Loaded graph with", len(graph_lines), "nodes"
+    return graph_io.load_graph(graph_url, as_dict=True)
 
-    answer_graph = {}
-    for line in graph_lines:
-        neighbors = line.split(' ')
-        node = int(neighbors[0])
-        answer_graph[node] = set([])
-        for neighbor in neighbors[1: -1]:
-            answer_graph[node].add(int(neighbor))
-
-    return answer_graph
 
+def make_random_graph(num_nodes, probablitiy, seed=None):
+    """
+    Creates a directed random graph with num_nodes nodes
 
-def make_random_graph(num_nodes, probablitiy):
-    res = {}
+    Every ordered pair of nodes, a node with itself included, gets two
+    chances at an edge, each taken when a random number exceeds
+    probablitiy.  So an edge is missing with probablitiy ** 2.
+    """
+    import graph_generators
+    edge_prob = 1 - probablitiy * probablitiy
+    res = graph_csr.to_dict_graph(graph_generators.er_graph(
+        num_nodes, edge_prob, directed=True, seed=seed))
+    rnd = random.Random(seed)
     for node in range(num_nodes):
-        res[node] = set([])
-    for node_from in range(num_nodes):
-        for node_to in range(num_nodes):
-            prob1 = random.random()
-            if probablitiy < prob1:
-                res[node_from].add(node_to)
-            prob2 = random.random()
-            if probablitiy < prob2:
-                res[node_to].add(node_from)
+        if rnd.random() < edge_prob:
+            res[node].add(node)
     return res
 
 
-rnd_graph = make_random_graph(1000, 0.9)
-print in_degree_distribution(rnd_graph)
-
-
-def make_dpa_graph(num_nodes, avg_degree):
+def make_dpa_graph(num_nodes, avg_degree, trial_class=dpa_trial.DPATrial):
     """
     Creates a graph with num_nodes amout of nodes
     and average in degree of avg_degree.
     Prefers popular nodes
+
+    trial_class -- weighted_trial.FenwickDPATrial keeps O(n) memory
+                   instead of O(edges), at several times the run time
     """
     full_graph = make_complete_graph(avg_degree)
-    trial = dpa_trial.DPATrial(avg_degree)
+    trial = trial_class(avg_degree)
     for node in range(avg_degree, num_nodes):
         full_graph[node] = trial.run_trial(avg_degree)
     return full_graph
 
 
-def make_random_graph_undir(num_nodes, probablitiy):
-    res = {}
-    for node in range(num_nodes):
-        res[node] = set([])
-    nodes_to = range(num_nodes)
-    for node_from in range(num_nodes):
-        for node_to in nodes_to:
-            prob1 = random.random()
-            if probablitiy > prob1 and node_from != node_to:
-                res[node_from].add(node_to)
-                res[node_to].add(node_from)
-        nodes_to.remove(node_from)
-    return res
+def make_random_graph_undir(num_nodes, probablitiy, seed=None):
+    """
+    Creates an undirected ER graph with num_nodes nodes,
+    every pair of nodes is connected with probablitiy
+    """
+    import graph_generators
+    return graph_csr.to_dict_graph(
+        graph_generators.er_graph(num_nodes, probablitiy, seed=seed))
 
 
-def make_upa_graph(num_nodes, avg_degree):
+def make_upa_graph(num_nodes, avg_degree, trial_class=upa_trial.UPATrial):
     """
     Creates a graph with num_nodes amout of nodes
     and average in degree of avg_degree.
     Prefers popular nodes
+
+    trial_class -- weighted_trial.FenwickUPATrial keeps O(n) memory
+                   instead of O(edges), at several times the run time
     """
     full_graph = make_complete_graph(avg_degree)
-    trial = upa_trial.UPATrial(avg_degree)
+    trial = trial_class(avg_degree)
     for node in range(avg_degree, num_nodes):
         neighbors = trial.run_trial(avg_degree)
         full_graph[node] = neighbors
         for neighbour in neighbors:
             full_graph[neighbour].add(node)
     return full_graph
+
+
+def print_examples():
+    """
+    Prints the module functions applied to the example graphs
+    """
+    for graph in (EX_GRAPH0, EX_GRAPH1, EX_GRAPH2, {}):
+        print(node_count(graph))
+    print("----------------")
+
+    graph1 = {"0": set(["1", "2"]),
+              "1": set(["0", "2"]),
+              "2": set(["1", "0"])}
+    for graph in (graph1, EX_GRAPH0, EX_GRAPH1, EX_GRAPH2, {}):
+        print(edge_count(graph))
+
+    print(make_graph1(5))
+    print(make_graph2(5))
+
+    graph2 = {"0": set(["1", "2"]),
+              "1": set(["0", "2"]),
+              "2": set(["1"])}
+    graph4 = {"0": set(["1", "2"]),
+              "1": set(["0", "2"]),
+              "2": set(["1", "3"])}
+    for graph in (graph1, graph2, make_complete_graph(100), graph4):
+        print(is_undirected_graph_valid(graph))
+
+    print(in_degree_distribution(make_random_graph(1000, 0.9)))
@@ -0,0 +1,197 @@
+"""
+Command line entry point for the graph experiments in AT/
+
+The library modules (graph_search, order_of_attack, graph_degees_calc,
+citation_graph) do no work when imported; each experiment that used to
+run at import time is a subcommand here:
+
+    python graph_experiments.py resilience
+    python graph_experiments.py attack-timing
+    python graph_experiments.py citation-in-degree
+    python graph_experiments.py dpa-in-degree
+    python graph_experiments.py examples
+    python graph_experiments.py count-in-degrees SOURCE
+    python graph_experiments.py import-times
+    python graph_experiments.py benchmark [--save FILE] [--baseline FILE]
+"""
+from __future__ import print_function
+import argparse
+import os
+import subprocess
+import sys
+
+LIBRARY_MODULES = ("graph_degees_calc", "graph_search", "order_of_attack",
+                   "citation_graph")
+IMPORT_BUDGET_MS = 100.0
+
+
+def run_resilience(args):
+    """
+    Plot resilience of the network, ER and UPA graphs under targeted attack
+    """
+    import graph_search
+    graph_search.legend_example(*graph_search.resilience_comparison(args.url))
+
+
+def run_attack_timing(args):
+    """
+    Plot running times of targeted_order against fast_target_order
+    """
+    import graph_search
+    import order_of_attack
+    normal_x, normal_y = order_of_attack.time_run(order_of_attack.targeted_order)
+    fast_x, fast_y = order_of_attack.time_run(order_of_attack.fast_target_order)
+    graph_search.legend_example2(("targeted_order", normal_y, normal_x, '-b'),
+                                 ("fast_target_order", fast_y, fast_x, '-r'))
+
+
+def run_citation_in_degree(args):
+    """
+    Plot the in degree distribution of the citation graph
+    """
+    import citation_graph
+    citation_graph.plot_in_degree_dist()
+
+
+def run_dpa_in_degree(args):
+    """
+    Plot the in degree distribution of a DPA graph
+    """
+    import citation_graph
+    citation_graph.plot_dpa_graph(args.nodes, args.degree)
+
+
+def run_examples(args):
+    """
+    Print the graph_degees_calc functions on the example graphs
+    """
+    import graph_degees_calc
+    graph_degees_calc.print_examples()
+
+
+def run_count_in_degrees(args):
+    """
+    Count in-degrees of an adjacency list out of core, with throughput
+    """
+    import chunked_degrees
+    with chunked_degrees.count_in_degrees(
+            args.source, args.block_mb << 20,
+            max_dense_id=args.max_dense_id) as counter:
+        distribution = counter.distribution()
+        rates = counter.throughput()
+        print("%d nodes, max in-degree %d%s" % (
+            sum(distribution.values()), max(distribution or [0]),
+            ", spilled to disk" if counter.is_spilling() else ""))
+        print("%.1f MB/s, %.2f M ids/s" % (rates["bytes/s"] / 1e6,
+                                           rates["ids/s"] / 1e6))
+
+
+def measure_import_ms(module, repeats=5):
+    """
+    Best time in milliseconds to import module in a fresh interpreter
+    """
+    code = ("import time; start = time.time(); import %s; "
+            "print((time.time() - start) * 1000)" % module)
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = float("inf")
+    for _ in range(repeats):
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=here)
+        best = min(best, float(output.decode().strip().splitlines()[-1]))
+    return best
+
+
+def run_import_times(args):
+    """
+    Print import times of the library modules against the budget
+    """
+    failed = False
+    for module in LIBRARY_MODULES:
+        elapsed = measure_import_ms(module, args.repeats)
+        status = "ok" if elapsed < IMPORT_BUDGET_MS else "SLOW"
+        failed = failed or elapsed >= IMPORT_BUDGET_MS
+        print("%-20s %7.1f ms  %s" % (module, elapsed, status))
+    return 1 if failed else 0
+
+
+def run_benchmark(args):
+    """
+    Time the graph functions over growing sizes, against a baseline
+    """
+    import benchmark
+    results = benchmark.run_suite(args.only, args.repeats, args.warmup,
+                                  report=lambda result: print(
+                                      benchmark.format_result(result)))
+    if args.save:
+        benchmark.save_results(results, args.save)
+    if args.plot:
+        benchmark.plot_results(results)
+    if not args.baseline:
+        return 0
+    regressions = benchmark.compare_results(
+        results, benchmark.load_results(args.baseline), args.threshold)
+    for name, size, ratio in regressions:
+        print("REGRESSION %-20s n=%-9d %.2fx slower" % (name, size, ratio))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    """
+    Parse the command line and run one experiment
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    resilience = commands.add_parser("resilience", help=run_resilience.__doc__)
+    resilience.add_argument("--url", default=None,
+                            help="adjacency list of the network graph")
+    resilience.set_defaults(func=run_resilience)
+
+    commands.add_parser("attack-timing", help=run_attack_timing.__doc__
+                        ).set_defaults(func=run_attack_timing)
+    commands.add_parser("citation-in-degree", help=run_citation_in_degree.__doc__
+                        ).set_defaults(func=run_citation_in_degree)
+
+    dpa = commands.add_parser("dpa-in-degree", help=run_dpa_in_degree.__doc__)
+    dpa.add_argument("--nodes", type=int, default=27000)
+    dpa.add_argument("--degree", type=int, default=13)
+    dpa.set_defaults(func=run_dpa_in_degree)
+
+    commands.add_parser("examples", help=run_examples.__doc__
+                        ).set_defaults(func=run_examples)
+
+    counting = commands.add_parser("count-in-degrees",
+                                   help=run_count_in_degrees.__doc__)
+    counting.add_argument("source", help="adjacency list file or URL")
+    counting.add_argument("--block-mb", type=int, default=16)
+    counting.add_argument("--max-dense-id", type=int,
+                          default=1 << 27)
+    counting.set_defaults(func=run_count_in_degrees)
+
+    imports = commands.add_parser("import-times", help=run_import_times.__doc__)
+    imports.add_argument("--repeats", type=int, default=5)
+    imports.set_defaults(func=run_import_times)
+
+    bench = commands.add_parser("benchmark", help=run_benchmark.__doc__)
+    bench.add_argument("--only", nargs="+", metavar="NAME",
+                       help="benchmarks to run, all by default")
+    bench.add_argument("--repeats", type=int, default=5)
+    bench.add_argument("--warmup", type=int, default=1)
+    bench.add_argument("--save", metavar="FILE", help="write results as JSON")
+    bench.add_argument("--baseline", metavar="FILE",
+                       help="JSON results to compare against")
+    bench.add_argument("--threshold", type=float, default=1.5,
+                       help="slowdown ratio counted as a regression")
+    bench.add_argument("--plot", action="store_true",
+                       help="log-log plot of the results")
+    bench.set_defaults(func=run_benchmark)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "url", "") is None:
+        import graph_search
+        args.url = graph_search.NETWORK_URL
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
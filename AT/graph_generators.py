@@ -0,0 +1,276 @@
+"""
+Vectorized random graph generators (ER, DPA, UPA)
+
+All generators are seedable and write edge arrays straight into a
+CSRGraph, so million node benchmark graphs never exist as dict-of-sets.
+
+ER graphs use geometric skipping: instead of one coin flip per pair of
+nodes, the gaps between consecutive edges in the list of all pairs are
+drawn from a geometric distribution, costing O(n + m) random numbers.
+
+DPA and UPA graphs use the Batagelj-Brandes endpoint pool that
+DPATrial and UPATrial keep as _node_numbers, but fill it in a few
+vectorized passes: every draw of every node is made up front as a
+position in the pool, and positions that point at other draws take
+their node once that draw is resolved.
+"""
+from array import array
+
+import numpy as np
+
+import graph_csr
+from node_interner import NodeInterner
+
+
+CHUNK_SIZE = 1 << 22
+
+
+def _to_array(values, typecode):
+    """
+    Copies a NumPy integer array into a stdlib array, chunk by chunk
+    """
+    res = array(typecode)
+    dtype = np.int32 if res.itemsize == 4 else np.int64
+    for begin in range(0, len(values), CHUNK_SIZE):
+        res.frombytes(values[begin:begin + CHUNK_SIZE].astype(dtype).tobytes())
+    return res
+
+
+def csr_from_edges(num_nodes, sources, targets, symmetric=False):
+    """
+    Builds a CSRGraph on nodes 0..num_nodes-1 from edge arrays
+
+    Duplicate edges and self-loops are dropped.  With symmetric=True
+    every edge is also added in the reverse direction.
+    """
+    if num_nodes == 0:
+        return graph_csr.CSRGraph(array("i", [0]), array("i"))
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    num_edges = len(sources)
+    # one sortable key per adjacency entry: source * num_nodes + target
+    keys = np.empty(num_edges * (2 if symmetric else 1), dtype=np.int64)
+    np.multiply(sources, num_nodes, out=keys[:num_edges])
+    keys[:num_edges] += targets
+    if symmetric:
+        np.multiply(targets, num_nodes, out=keys[num_edges:])
+        keys[num_edges:] += sources
+    keys.sort()
+    keep = keys[1:] != keys[:-1]
+    if not keep.all():
+        keys = keys[np.concatenate(([True], keep))]
+    del keep
+
+    counts = np.zeros(num_nodes, dtype=np.int64)
+    loops = np.zeros(len(keys), dtype=bool)
+    for begin in range(0, len(keys), CHUNK_SIZE):
+        chunk_sources = keys[begin:begin + CHUNK_SIZE] // num_nodes
+        chunk_targets = keys[begin:begin + CHUNK_SIZE] % num_nodes
+        chunk_loops = chunk_sources == chunk_targets
+        loops[begin:begin + CHUNK_SIZE] = chunk_loops
+        counts += np.bincount(chunk_sources[~chunk_loops], minlength=num_nodes)
+    if loops.any():
+        keys = keys[~loops]
+    del loops
+
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    targets = array(graph_csr.int_typecode(num_nodes))
+    for begin in range(0, len(keys), CHUNK_SIZE):
+        targets.extend(_to_array(keys[begin:begin + CHUNK_SIZE] % num_nodes,
+                                 targets.typecode))
+    return graph_csr.CSRGraph(
+        _to_array(offsets, graph_csr.int_typecode(len(keys))), targets)
+
+
+def csr_from_labeled_edges(sources, targets, symmetric=False):
+    """
+    Builds a CSRGraph from edge arrays of arbitrary integer node ids
+
+    The ids are interned into rows in sorted order, so the NodeInterner
+    of the result looks ids up by binary search without a dictionary.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    labels, rows = np.unique(np.concatenate((sources, targets)),
+                             return_inverse=True)
+    csr = csr_from_edges(len(labels), rows[:len(sources)],
+                         rows[len(sources):], symmetric)
+    return graph_csr.CSRGraph(csr.offsets(), csr.targets(),
+                              NodeInterner(_to_array(labels, "q")))
+
+
+def _geometric_positions(num_pairs, prob, rng):
+    """
+    Sorted positions in range(num_pairs) each picked with probability prob
+    """
+    if prob <= 0 or num_pairs <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if prob >= 1:
+        return np.arange(num_pairs, dtype=np.int64)
+    expected = num_pairs * prob
+    batch = int(expected + 4 * np.sqrt(expected) + 16)
+    chunks = []
+    last = -1
+    while last < num_pairs:
+        positions = last + np.cumsum(rng.geometric(prob, size=batch))
+        chunks.append(positions)
+        last = int(positions[-1])
+    positions = np.concatenate(chunks)
+    return positions[:np.searchsorted(positions, num_pairs)]
+
+
+def er_graph(num_nodes, prob, directed=False, seed=None):
+    """
+    Erdos-Renyi graph where every pair of distinct nodes is joined
+    independently with probability prob
+
+    Returns an undirected CSRGraph, or a directed one considering
+    ordered pairs when directed is True
+    """
+    rng = np.random.default_rng(seed)
+    if directed:
+        positions = _geometric_positions(num_nodes * (num_nodes - 1), prob, rng)
+        sources = positions // max(num_nodes - 1, 1)
+        targets = positions % max(num_nodes - 1, 1)
+        targets += targets >= sources
+        return csr_from_edges(num_nodes, sources, targets)
+
+    positions = _geometric_positions(num_nodes * (num_nodes - 1) // 2, prob, rng)
+    # position k is the pair (high, low) with k = high * (high - 1) / 2 + low
+    high = np.floor((1 + np.sqrt(1 + 8 * positions.astype(np.float64))) / 2)
+    high = high.astype(np.int64)
+    high -= high * (high - 1) // 2 > positions
+    high += (high + 1) * high // 2 <= positions
+    low = positions - high * (high - 1) // 2
+    return csr_from_edges(num_nodes, high, low, symmetric=True)
+
+
+def _preferential_draws(num_nodes, num_initial, draws, upa, rng):
+    """
+    Resolves the endpoint pool of a preferential attachment process
+
+    The pool starts with num_initial copies of each of the first
+    num_initial nodes.  Every later node makes draws uniform picks from
+    the pool as it was before the node arrived, then adds one copy of
+    itself and one copy of each distinct node it picked, and with upa
+    also one more copy of itself per distinct pick.
+
+    Each node gets a block of the largest size it can add, so block
+    offsets are known up front.  The slots a node leaves unused, for
+    repeated picks, are holes, and picks landing in a hole are drawn
+    again: that is a uniform pick from the pool without the holes.
+
+    Returns an (num_nodes - num_initial, draws) array of picked nodes
+    """
+    num_new = max(num_nodes - num_initial, 0)
+    if num_new == 0 or draws == 0:
+        return np.zeros((num_new, draws), dtype=np.int64)
+    self_slots = 1 + (draws if upa else 0)
+    block = self_slots + draws
+    start = num_initial * num_initial
+    # size of the pool with holes before each node arrives
+    bases = start + np.arange(num_new, dtype=np.int64) * block
+
+    nodes = np.full(num_new * draws, -1, dtype=np.int64)
+    # distinct picks of the resolved nodes, and their copies of themselves
+    firsts = np.zeros((num_new, draws), dtype=bool)
+    copies = np.zeros(num_new, dtype=np.int64)
+    done = np.zeros(num_new, dtype=bool)
+    unresolved = np.full(num_new, draws, dtype=np.int64)
+
+    # nodes go in batches an eighth the size of the resolved pool, so
+    # most picks land on resolved nodes and few wait on the batch
+    begin = 0
+    while begin < num_new:
+        end = min(begin + max((begin + num_initial) // 8, 64), num_new)
+        pending = np.arange(begin * draws, end * draws)
+        positions = np.floor(rng.random(len(pending)) *
+                             bases[pending // draws]).astype(np.int64)
+        while len(pending):
+            offset = positions - start
+            initial = offset < 0
+            owner = np.where(initial, 0, offset // block)
+            slot = offset % block
+            in_draws = ~initial & (slot >= self_slots)
+            draw_slot = np.where(in_draws, slot - self_slots, 0)
+            # a node's holes are known once all its picks are resolved,
+            # its first copy of itself is never a hole
+            ready = initial | done[owner] | (slot == 0)
+            valid = np.where(in_draws, firsts[owner, draw_slot],
+                             initial | (slot < np.maximum(copies[owner], 1)))
+            value = np.where(
+                initial, positions // max(num_initial, 1),
+                np.where(in_draws, nodes[owner * draws + draw_slot],
+                         num_initial + owner))
+            accept = ready & valid
+            nodes[pending[accept]] = value[accept]
+            unresolved[begin:end] -= np.bincount(
+                pending[accept] // draws - begin, minlength=end - begin)
+            redraw = ready & ~valid
+            positions[redraw] = np.floor(
+                rng.random(redraw.sum()) *
+                bases[pending[redraw] // draws]).astype(np.int64)
+            pending = pending[~accept]
+            positions = positions[~accept]
+
+            finished = begin + np.flatnonzero(
+                (unresolved[begin:end] == 0) & ~done[begin:end])
+            if len(finished):
+                picked = nodes.reshape(num_new, draws)[finished]
+                order = np.argsort(picked, axis=1, kind="stable")
+                picked = np.take_along_axis(picked, order, axis=1)
+                first = np.ones(picked.shape, dtype=bool)
+                first[:, 1:] = picked[:, 1:] != picked[:, :-1]
+                row_firsts = np.empty(first.shape, dtype=bool)
+                np.put_along_axis(row_firsts, order, first, axis=1)
+                firsts[finished] = row_firsts
+                copies[finished] = 1 + (first.sum(axis=1) if upa else 0)
+                done[finished] = True
+        begin = end
+    return nodes.reshape(num_new, draws)
+
+
+def _complete_edges(num_nodes):
+    """
+    Edge arrays of the complete directed graph on num_nodes nodes
+    """
+    sources = np.repeat(np.arange(num_nodes, dtype=np.int64), num_nodes)
+    targets = np.tile(np.arange(num_nodes, dtype=np.int64), num_nodes)
+    return sources, targets
+
+
+def dpa_graph(num_nodes, out_degree, seed=None):
+    """
+    Directed preferential attachment graph
+
+    Starts from a complete digraph on out_degree nodes, every later
+    node cites out_degree draws (duplicates collapse) picked with
+    probability proportional to in-degree + 1, as DPATrial does.
+    """
+    rng = np.random.default_rng(seed)
+    out_degree = min(out_degree, num_nodes)
+    picks = _preferential_draws(num_nodes, out_degree, out_degree, False,
+                                rng)
+    init_sources, init_targets = _complete_edges(out_degree)
+    sources = np.concatenate(
+        (init_sources, np.repeat(np.arange(out_degree, num_nodes), out_degree)))
+    targets = np.concatenate((init_targets, picks.ravel()))
+    return csr_from_edges(num_nodes, sources, targets)
+
+
+def upa_graph(num_nodes, avg_degree, seed=None):
+    """
+    Undirected preferential attachment graph
+
+    Starts from a complete graph on avg_degree nodes, every later node
+    joins avg_degree draws (duplicates collapse) picked with
+    probability proportional to degree, as UPATrial does.
+    """
+    rng = np.random.default_rng(seed)
+    avg_degree = min(avg_degree, num_nodes)
+    picks = _preferential_draws(num_nodes, avg_degree, avg_degree, True, rng)
+    init_sources, init_targets = _complete_edges(avg_degree)
+    sources = np.concatenate(
+        (init_sources, np.repeat(np.arange(avg_degree, num_nodes), avg_degree)))
+    targets = np.concatenate((init_targets, picks.ravel()))
+    return csr_from_edges(num_nodes, sources, targets, symmetric=True)
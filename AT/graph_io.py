@@ -0,0 +1,194 @@
+"""
+Shared loader for the adjacency list text format
+
+Each line of the format is a node followed by its neighbours,
+separated by spaces:
+
+    node neighbor1 neighbor2 ...
+
+Local files are memory mapped and URLs are streamed, lines are parsed
+one at a time straight into CSR arrays, so the text is never held in
+memory as a whole.  An optional cache file, a graph_snapshot, lets
+repeat loads skip text parsing entirely and map the arrays instead.
+"""
+import mmap
+import os
+from array import array
+
+import graph_csr
+import graph_snapshot
+from node_interner import NodeInterner
+
+
+def is_url(source):
+    """
+    True if source should be fetched over the network
+    """
+    return source.startswith(("http://", "https://", "ftp://", "file://"))
+
+
+def iter_lines(source):
+    """
+    Yields the lines of a local file or URL one at a time, as bytes
+
+    Local files are memory mapped, so the operating system pages the
+    data in and out instead of it being copied into Python strings.
+    """
+    if is_url(source):
+        # the network stack is imported on demand, it dominates import time
+        try:
+            from urllib2 import urlopen
+        except ImportError:
+            from urllib.request import urlopen
+        graph_file = urlopen(source)
+        try:
+            for line in graph_file:
+                yield line
+        finally:
+            graph_file.close()
+        return
+    with open(source, "rb") as graph_file:
+        if os.fstat(graph_file.fileno()).st_size == 0:
+            return
+        graph_map = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for line in iter(graph_map.readline, b""):
+                yield line
+        finally:
+            graph_map.close()
+
+
+def iter_blocks(source, block_bytes):
+    """
+    Yields the text of a local file or URL in blocks of whole lines
+
+    Blocks are about block_bytes long, ending at a line break, so memory
+    stays bounded by the block size however large the source is.
+    """
+    if is_url(source):
+        try:
+            from urllib2 import urlopen
+        except ImportError:
+            from urllib.request import urlopen
+        graph_file = urlopen(source)
+    else:
+        graph_file = open(source, "rb")
+    try:
+        rest = b""
+        while True:
+            block = graph_file.read(block_bytes)
+            if not block:
+                break
+            block = rest + block
+            end = block.rfind(b"\n") + 1
+            rest = block[end:]
+            if end:
+                yield block[:end]
+        if rest.strip():
+            yield rest + b"\n"
+    finally:
+        graph_file.close()
+
+
+def parse_adjacency_lines(lines):
+    """
+    Parses adjacency list lines into a CSRGraph
+
+    Neighbours that never appear at the start of a line become nodes
+    without neighbours of their own, and the neighbours of a node that
+    starts several lines are merged in file order.  If the nodes are exactly 0..n-1
+    in file order the graph is dense and keeps no labels; otherwise the
+    ids are interned into rows by a NodeInterner.
+    """
+    labels = array("q")
+    offsets = array("q", [0])
+    targets = array("q")
+    for line in lines:
+        tokens = line.split()
+        if not tokens:
+            continue
+        labels.append(int(tokens[0]))
+        for token in tokens[1:]:
+            targets.append(int(token))
+        offsets.append(len(targets))
+
+    dense = True
+    for row, label in enumerate(labels):
+        if row != label:
+            dense = False
+            break
+    if dense:
+        num_nodes = len(labels)
+        for target in targets:
+            if not 0 <= target < num_nodes:
+                dense = False
+                break
+    if dense:
+        return graph_csr.CSRGraph(offsets, targets)
+
+    interner = NodeInterner()
+    heads = array("q", (interner.intern(label) for label in labels))
+    if len(interner) < len(heads):
+        offsets, targets = _merge_rows(heads, offsets, targets, len(interner))
+    for idx, target in enumerate(targets):
+        row = interner.intern(target)
+        if row == len(offsets) - 1:
+            offsets.append(offsets[-1])
+        targets[idx] = row
+    return graph_csr.CSRGraph(offsets, targets, interner)
+
+
+def _merge_rows(heads, offsets, targets, num_rows):
+    """
+    Regroups per line neighbour slices into one slice per head row
+
+    heads -- row of the head of every line, repeats allowed
+    Returns the new (offsets, targets); lines of a row keep file order.
+    """
+    counts = array("q", [0]) * (num_rows + 1)
+    for line, row in enumerate(heads):
+        counts[row + 1] += offsets[line + 1] - offsets[line]
+    for row in range(num_rows):
+        counts[row + 1] += counts[row]
+    fill = array("q", counts)
+    merged = array("q", [0]) * len(targets)
+    for line, row in enumerate(heads):
+        begin, end = offsets[line], offsets[line + 1]
+        merged[fill[row]:fill[row] + end - begin] = targets[begin:end]
+        fill[row] += end - begin
+    return counts, merged
+
+
+def _cache_is_fresh(source, cache_path):
+    """
+    True if cache_path exists and is not older than a local source
+    """
+    if not os.path.exists(cache_path):
+        return False
+    if is_url(source):
+        return True
+    return os.path.getmtime(cache_path) >= os.path.getmtime(source)
+
+
+def load_graph(source, cache_path=None, as_dict=False):
+    """
+    Loads a graph in adjacency list format from a local path or URL
+
+    cache_path -- optional snapshot file, memory mapped instead of
+                  parsing the text when fresh, written after parsing
+                  otherwise
+    as_dict    -- return a mutable dict-of-sets graph instead of a CSRGraph
+
+    Returns a CSRGraph, or a dictionary that models a graph
+    """
+    if cache_path is not None and _cache_is_fresh(source, cache_path):
+        graph = graph_snapshot.map_snapshot(cache_path).graph
+    else:
+        graph = parse_adjacency_lines(iter_lines(source))
+        if cache_path is not None:
+            graph_snapshot.write_snapshot(graph, cache_path)
+
+    print("Loaded graph with %d nodes" % graph.num_nodes())
+    if as_dict:
+        return graph_csr.to_dict_graph(graph)
+    return graph
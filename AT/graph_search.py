@@ -1,14 +1,18 @@
 """
 Search graph, compute reilience
+
+Importing this module has no side effects, the experiments are run
+through graph_experiments.py.  matplotlib is only imported when plotting.
 """
+from __future__ import print_function
 from collections import deque
 import random
-import urllib2
-import time
-import math
+import graph_io
 import graph_degees_calc
-import matplotlib.pyplot as plt
-import copy
+import resilience
+import components
+import degree_queue
+import removal_view
 
 
 GRAPH0 = {0: set([1]),
@@ -52,45 +56,26 @@ def cc_visited(ugraph):
     """
     Returns set of connected components of graph
     """
-    remaining_nodes = ugraph.keys()
-    connected_set = []
-    while remaining_nodes:
-        random_node = random.choice(remaining_nodes)
-        visited_nodes = bfs_visited(ugraph, random_node)
-        connected_set.append(visited_nodes)
-        remaining_nodes = [node for node in remaining_nodes
-                           if node not in visited_nodes]
-    return connected_set
+    return components.component_sets(ugraph)
 
 
 def largest_cc_size(ugraph):
     """
     Returns size of the largest connected coponent
     """
-    return 0 if not ugraph else max((len(neighbours)
-                                     for neighbours in cc_visited(ugraph)))
+    return components.largest_component_size(ugraph)
 
 
-def compute_resilience(ugraph, attack_order):
+def compute_resilience(ugraph, attack_order, fractions=None, **options):
     """
     Returns list of largest components in graph,
     after removing the nodes in order of attack_order
+
+    With fractions, estimates at those removal fractions only
+    (see resilience.estimate_resilience)
     """
-    def remove_node(ugraph, node):
-        """
-        Mutates graph removing node, and connected edges
-        """
-        neighbours = ugraph[node]
-        graph.pop(node)
-        for edge in neighbours:
-            ugraph[edge].remove(node)
-    graph = ugraph
-    resilience = []
-    for attack in attack_order:
-        resilience.append(largest_cc_size(graph))
-        delete_node(graph, attack)
-    resilience.append(largest_cc_size(graph))
-    return resilience
+    return resilience.compute_resilience(ugraph, attack_order, fractions,
+                                         **options)
 
 
 NETWORK_URL = "http://storage.googleapis.com/codeskulptor-alg/alg_rf7.txt"
@@ -103,37 +88,24 @@ def load_graph(graph_url):
 
     Returns a dictionary that models a graph
     """
-    graph_file = urllib2.urlopen(graph_url)
-    graph_text = graph_file.read()
-    graph_lines = graph_text.split('\n')
-    graph_lines = graph_lines[: -1]
-
-    print "Loaded graph with", len(graph_lines), "nodes"
-
-    answer_graph = {}
-    for line in graph_lines:
-        neighbors = line.split(' ')
-        node = int(neighbors[0])
-        answer_graph[node] = set([])
-        for neighbor in neighbors[1: -1]:
-            answer_graph[node].add(int(neighbor))
-
-    return answer_graph
+    return graph_io.load_graph(graph_url, as_dict=True)
 
 
 def random_order(graph):
     """
     Takes graph, returns nodes in random order
     """
-    nodes = graph.keys()
+    nodes = list(graph)
     random.shuffle(nodes)
     return nodes
 
 
 def copy_graph(graph):
     """
-    Make a copy of a graph
+    Make a copy of a graph, a RemovalView is copied without its sets
     """
+    if isinstance(graph, removal_view.RemovalView):
+        return graph.copy()
     new_graph = {}
     for node in graph:
         new_graph[node] = set(graph[node])
@@ -144,6 +116,9 @@ def delete_node(ugraph, node):
     """
     Delete a node from an undirected graph
     """
+    if isinstance(ugraph, removal_view.RemovalView):
+        ugraph.delete_node(node)
+        return
     neighbors = ugraph[node]
     ugraph.pop(node)
     for neighbor in neighbors:
@@ -154,52 +129,38 @@ def fast_target_order(ugraph):
     """
     Compute attack order, return nodes in order
     """
-    ugraph_c = copy.deepcopy(ugraph)
-    result_order = []
-    num_nodes = len(ugraph_c.keys())
-    degrees = [set([]) for _ in range(num_nodes)]
-    for node in ugraph_c.keys():
-        node_degree = len(ugraph_c[node])
-        degrees[node_degree].add(node)
-    for degree in range(num_nodes - 1, -1, -1):
-        while degrees[degree] != set([]):
-            elem = degrees[degree].pop()
-            for neighbor in ugraph_c[elem]:
-                n_degree = len(ugraph_c[neighbor])
-                degrees[n_degree].remove(neighbor)
-                degrees[n_degree - 1].add(neighbor)
-            result_order.append(elem)
-            delete_node(ugraph_c, elem)
-    return result_order
-
-
-# print("--------")
-imported_graph = load_graph(NETWORK_URL)
-random_graph = graph_degees_calc.make_random_graph_undir(1239, 0.004)
-upa_graph = graph_degees_calc.make_upa_graph(1239, 3)
+    return degree_queue.target_order(ugraph)
 
 
-imported_graph_nc = range(len(imported_graph.keys()) + 1)
-random_graph_nc = range(len(random_graph.keys()) + 1)
-upa_graph_nc = range(len(upa_graph.keys()) + 1)
-
-imported_graph_rs = compute_resilience(
-    imported_graph, fast_target_order(imported_graph))
-random_graph_rs = compute_resilience(
-    random_graph, fast_target_order(random_graph))
-upa_graph_rs = compute_resilience(upa_graph, fast_target_order(upa_graph))
+def resilience_comparison(graph_url=NETWORK_URL):
+    """
+    Resilience under targeted attack of the computer network graph,
+    an ER graph and an UPA graph of the same size
 
-# print compute_resilience(imported_graph,[1, 2, 3, 4, 5, 6, 7])
+    Returns arguments for legend_example
+    """
+    imported_graph = load_graph(graph_url)
+    num_nodes = len(imported_graph)
+    random_graph = graph_degees_calc.make_random_graph_undir(num_nodes, 0.004)
+    upa_graph = graph_degees_calc.make_upa_graph(num_nodes, 3)
 
-# print graph_degees_calc.edge_count(imported_graph)
-print graph_degees_calc.edge_count(graph_degees_calc.make_random_graph_undir(1239, 0.0039))
-# print graph_degees_calc.edge_count(graph_degees_calc.make_upa_graph(1239, 3))
+    res = []
+    for name, graph, style in (("Computer network graph", imported_graph, '-b'),
+                               ("ER graph(p = 0.004)", random_graph, '-r'),
+                               ("UPA graph(m = 3)", upa_graph, '-g')):
+        print(name, "edges:", graph_degees_calc.edge_count(graph))
+        res.append((name,
+                    compute_resilience(graph, fast_target_order(graph)),
+                    list(range(len(graph) + 1)),
+                    style))
+    return res
 
 
 def legend_example(*args):
     """
     Plot multiple lines on one plot
     """
+    import matplotlib.pyplot as plt
     for item in args:
         plt.plot(item[2], item[1], item[3], label=item[0])
     plt.legend(loc='upper right')
@@ -213,6 +174,7 @@ def legend_example2(*args):
     """
     Plot multiple lines on one plot
     """
+    import matplotlib.pyplot as plt
     for item in args:
         plt.plot(item[2], item[1], item[3], label=item[0])
     plt.legend(loc='upper right')
@@ -221,11 +183,3 @@ def legend_example2(*args):
     plt.title(
         "Running time of fast vs normal target order algorithms - Desktop Python")
     plt.show()
-
-
-legend_example(("Computer network graph", imported_graph_rs, imported_graph_nc, '-b'),
-               ("ER graph(p = 0.004)", random_graph_rs, random_graph_nc, '-r'),
-               ("UPA graph(m = 3)", upa_graph_rs, upa_graph_nc, '-g'))
-
-
-# print compute_resilience(imported_graph, random_order(imported_graph))
@@ -0,0 +1,177 @@
+"""
+Versioned binary graph snapshots with zero-copy reopen
+
+A snapshot file is a fixed header followed by the CSR arrays:
+
+    header       magic, version, flags, counts and item sizes (32 bytes)
+    offsets      num_nodes + 1 integers
+    targets      num_entries integers
+    labels       num_nodes integers, if the graph has labels
+    in_degree    num_nodes integers, if degrees were saved
+    out_degree   num_nodes integers, if degrees were saved
+
+Every section starts 8-byte aligned and stores integers little endian
+with the item size recorded in the header, so compact 4-byte arrays
+stay compact on disk.  map_snapshot opens the arrays as views of a
+read-only memory map: nothing is parsed or copied, and processes that
+map the same file share one copy in the page cache.
+"""
+import collections
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import graph_csr
+
+SNAPSHOT_MAGIC = b"CSRS"
+SNAPSHOT_VERSION = 1
+# magic, version, flags, num_nodes, num_entries and the item sizes of
+# offsets, targets, labels and degrees, padded to 32 bytes
+SNAPSHOT_HEADER = struct.Struct("<4sHHqqBBBB4x")
+
+FLAG_LABELS = 1
+FLAG_DEGREES = 2
+
+# fixed width typecodes, the same as graph_csr.int_typecode picks
+_TYPECODES = {4: "i", 8: "q"}
+
+GraphSnapshot = collections.namedtuple("GraphSnapshot",
+                                       ["graph", "in_degree", "out_degree"])
+
+
+def _itemsize(max_value):
+    """
+    Item size of the integer array type used for values up to max_value
+    """
+    return array(graph_csr.int_typecode(max_value)).itemsize
+
+
+def _write_section(snapshot_file, values, itemsize):
+    """
+    Writes values as itemsize-byte integers and pads to 8 bytes
+    """
+    typecode = _TYPECODES[itemsize]
+    if not (isinstance(values, array) and values.typecode == typecode):
+        values = array(typecode, values)
+    if sys.byteorder != "little":
+        values = array(typecode, values)
+        values.byteswap()
+    values.tofile(snapshot_file)
+    snapshot_file.write(b"\0" * (-len(values) * itemsize % 8))
+
+
+def write_snapshot(graph, path, degrees=False):
+    """
+    Writes a dict-of-sets or CSR graph to path as a snapshot file
+
+    degrees -- also store in- and out-degree arrays
+
+    Node labels must be integers.  The file is written next to path and
+    renamed into place, so processes still mapping an older snapshot at
+    path keep reading the old data.
+    """
+    csr = graph_csr.as_csr(graph)
+    num_nodes = csr.num_nodes()
+    num_entries = csr.num_entries()
+    labels = csr.labels()
+    flags = (FLAG_LABELS if labels is not None else 0) | \
+        (FLAG_DEGREES if degrees else 0)
+    if labels is not None:
+        try:
+            labels = array("q", labels)
+        except TypeError:
+            raise TypeError("snapshot node labels must be integers")
+    sizes = (_itemsize(num_entries), _itemsize(num_nodes), 8,
+             _itemsize(num_entries))
+
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, num_nodes,
+                num_entries, *sizes))
+            _write_section(snapshot_file, csr.offsets(), sizes[0])
+            _write_section(snapshot_file, csr.targets(), sizes[1])
+            if labels is not None:
+                _write_section(snapshot_file, labels, sizes[2])
+            if degrees:
+                for values in graph_csr.degree_arrays(csr):
+                    _write_section(snapshot_file, values, sizes[3])
+        getattr(os, "replace", os.rename)(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _sections(header, path):
+    """
+    (count, itemsize) of every array stored after a snapshot header
+    """
+    magic, version, flags, num_nodes, num_entries, offset_size, \
+        target_size, label_size, degree_size = header
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("%s is not a graph snapshot" % path)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError("%s has unsupported snapshot version %d"
+                         % (path, version))
+    return [(num_nodes + 1, offset_size), (num_entries, target_size),
+            (num_nodes if flags & FLAG_LABELS else 0, label_size),
+            (num_nodes if flags & FLAG_DEGREES else 0, degree_size),
+            (num_nodes if flags & FLAG_DEGREES else 0, degree_size)], flags
+
+
+def _snapshot(arrays, flags):
+    """
+    GraphSnapshot from the five section arrays
+    """
+    graph = graph_csr.CSRGraph(arrays[0], arrays[1],
+                               arrays[2] if flags & FLAG_LABELS else None)
+    if flags & FLAG_DEGREES:
+        return GraphSnapshot(graph, arrays[3], arrays[4])
+    return GraphSnapshot(graph, None, None)
+
+
+def map_snapshot(path):
+    """
+    Opens a snapshot file over a read-only memory map, without copying
+
+    Returns GraphSnapshot(graph, in_degree, out_degree) where graph is
+    a CSRGraph and the degree arrays are None if they were not saved
+    """
+    with open(path, "rb") as snapshot_file:
+        snapshot_map = mmap.mmap(snapshot_file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+    sections, flags = _sections(
+        SNAPSHOT_HEADER.unpack_from(snapshot_map, 0), path)
+    if sys.byteorder != "little":
+        return read_snapshot(path)
+    data = memoryview(snapshot_map)
+    begin = SNAPSHOT_HEADER.size
+    arrays = []
+    for count, itemsize in sections:
+        arrays.append(data[begin:begin + count * itemsize].cast(
+            _TYPECODES[itemsize]))
+        begin += count * itemsize + (-count * itemsize % 8)
+    return _snapshot(arrays, flags)
+
+
+def read_snapshot(path):
+    """
+    Reads a snapshot file into in-memory arrays
+
+    Returns GraphSnapshot(graph, in_degree, out_degree) like map_snapshot
+    """
+    with open(path, "rb") as snapshot_file:
+        sections, flags = _sections(SNAPSHOT_HEADER.unpack(
+            snapshot_file.read(SNAPSHOT_HEADER.size)), path)
+        arrays = []
+        for count, itemsize in sections:
+            values = array(_TYPECODES[itemsize])
+            values.fromfile(snapshot_file, count)
+            if sys.byteorder != "little":
+                values.byteswap()
+            snapshot_file.read(-count * itemsize % 8)
+            arrays.append(values)
+    return _snapshot(arrays, flags)
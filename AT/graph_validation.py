@@ -0,0 +1,151 @@
+"""
+Bulk validation and symmetrization of undirected graphs
+
+is_undirected_graph_valid in graph_degees_calc checks one edge at a
+time and stops at the first problem.  validate_graph instead turns the
+whole graph into NumPy edge arrays, sorts one key per adjacency entry
+and looks up every reverse key in a single searchsorted call, so it
+counts all self-loops, dangling targets, duplicate entries and missing
+reverse edges in O(m log m) vectorized time.  symmetrize_graph repairs
+those problems and returns a CSRGraph that delete_node and the
+resilience code can rely on.
+"""
+import collections
+
+import numpy as np
+
+import graph_csr
+import graph_generators
+from node_interner import NodeInterner
+
+_REPORT_FIELDS = ["num_nodes", "num_entries", "self_loops", "dangling",
+                  "duplicates", "missing_reverse"]
+
+
+class ValidationReport(collections.namedtuple("ValidationReport",
+                                              _REPORT_FIELDS)):
+    """
+    Counts of problems found in an undirected graph
+
+    num_entries counts adjacency entries, so every valid undirected
+    edge is counted twice.  missing_reverse counts entries u -> v whose
+    node v does not list u.
+    """
+    __slots__ = ()
+
+    def is_valid(self):
+        """
+        True if the graph is a valid undirected graph
+        """
+        return not (self.self_loops or self.dangling or self.duplicates or
+                    self.missing_reverse)
+
+
+def graph_edge_arrays(graph):
+    """
+    Returns (num_nodes, sources, targets, labels) for a dict or CSR graph
+
+    sources and targets are int64 arrays of rows, one per adjacency
+    entry; targets that are not nodes of a dict graph are -1.  labels
+    is the NodeInterner of the node names, None when nodes are their
+    own rows.
+    """
+    if isinstance(graph, graph_csr.CSRGraph):
+        offsets = np.asarray(graph.offsets(), dtype=np.int64)
+        sources = np.repeat(np.arange(graph.num_nodes(), dtype=np.int64),
+                            np.diff(offsets))
+        targets = np.asarray(graph.targets(), dtype=np.int64)
+        return graph.num_nodes(), sources, targets, graph.interner()
+
+    dense = graph_csr._is_dense(graph)
+    interner = NodeInterner()
+    # dense nodes go in as 0..n-1 so that row i is node i whatever
+    # order the dict was filled in
+    for node in (range(len(graph)) if dense else graph):
+        interner.intern(node)
+    counts = np.fromiter((len(graph[node]) for node in interner),
+                         dtype=np.int64, count=len(interner))
+    sources = np.repeat(np.arange(len(interner), dtype=np.int64), counts)
+    targets = np.fromiter((interner.get(neighbor, -1) for node in interner
+                           for neighbor in graph[node]),
+                          dtype=np.int64, count=int(counts.sum()))
+    labels = None if dense else interner
+    return len(interner), sources, targets, labels
+
+
+def validate_edges(num_nodes, sources, targets):
+    """
+    Counts the problems of a graph given as adjacency entry arrays
+
+    Targets outside 0..num_nodes-1 are dangling.  Returns a
+    ValidationReport.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    num_entries = len(sources)
+    inside = (targets >= 0) & (targets < num_nodes)
+    dangling = num_entries - int(np.count_nonzero(inside))
+    loops = inside & (sources == targets)
+    self_loops = int(np.count_nonzero(loops))
+    inside &= ~loops
+    del loops
+    sources = sources[inside]
+    targets = targets[inside]
+    del inside
+
+    keys = sources * num_nodes
+    keys += targets
+    keys.sort()
+    duplicates = int(np.count_nonzero(keys[1:] == keys[:-1]))
+    reverse = targets * num_nodes
+    reverse += sources
+    del sources, targets
+    # sorted needles keep searchsorted walking forward through keys;
+    # unsorted ones cost a cache miss per lookup and run ~30x slower
+    reverse.sort()
+    pos = np.searchsorted(keys, reverse)
+    # reverse keys past the last key cannot match; clip before indexing
+    pos[pos == len(keys)] = 0
+    missing = int(np.count_nonzero(keys[pos] != reverse)) if len(keys) else 0
+    return ValidationReport(num_nodes, num_entries, self_loops, dangling,
+                            duplicates, missing)
+
+
+def validate_graph(graph, repair=False):
+    """
+    Validates a dict-of-sets or CSR undirected graph
+
+    Returns a ValidationReport, or (report, symmetrize_graph(graph))
+    if repair is True
+    """
+    num_nodes, sources, targets, labels = graph_edge_arrays(graph)
+    report = validate_edges(num_nodes, sources, targets)
+    if not repair:
+        return report
+    return report, _symmetrized(num_nodes, sources, targets, labels)
+
+
+def symmetrize_graph(graph):
+    """
+    Returns a valid undirected CSRGraph built from graph
+
+    Dangling targets, self-loops and duplicate entries are dropped and
+    every missing reverse edge is added.  Node labels are kept.
+    """
+    return _symmetrized(*graph_edge_arrays(graph))
+
+
+def _symmetrized(num_nodes, sources, targets, labels):
+    """
+    CSRGraph of the valid, symmetrized adjacency entries
+    """
+    inside = (targets >= 0) & (targets < num_nodes)
+    if not inside.all():
+        sources = sources[inside]
+        targets = targets[inside]
+    del inside
+    csr = graph_generators.csr_from_edges(num_nodes, sources, targets,
+                                          symmetric=True)
+    if labels is None:
+        return csr
+    return graph_csr.CSRGraph(csr.offsets(), csr.targets(), labels)
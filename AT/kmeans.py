@@ -0,0 +1,192 @@
+"""
+Vectorized k-means clustering on ClusterTables
+
+kmeans_clustering used to compute every county to center distance
+through Cluster.distance and to build a fresh Cluster for every center
+on every iteration.  Here the assignment step computes distances of a
+chunk of rows to all centers at once by broadcasting, or looks rows up
+in a grid index once there are thousands of centers, and the update
+step works on center arrays.
+
+The update reproduces Cluster.merge_clusters exactly.  Rows are merged
+into their centers in population order, as the sequential loop does,
+but in rounds: round r merges the r-th row of every center at once.  So
+the centers, and hence all later assignments, are bit-identical to
+kmeans_clustering for the same number of iterations.  With exact=False
+the centers are plain population weighted means from one bincount pass,
+faster but not identical in the last bits.
+
+Iteration stops early once an iteration moves no center by more than
+tolerance, or leaves every row with the same center as the previous
+one.  With the defaults both only stop at a fixed point, where more
+iterations would not change anything.
+"""
+import collections
+
+import numpy as np
+
+import cluster_table
+import spatial_index
+
+CHUNK_ELEMENTS = 1 << 20
+INDEX_MIN_CENTERS = 2048
+
+KMeansResult = collections.namedtuple("KMeansResult",
+                                      ["clusters", "assignment", "iterations"])
+
+
+def assign(horiz, vert, center_horiz, center_vert,
+           chunk_elements=CHUNK_ELEMENTS, index_min_centers=INDEX_MIN_CENTERS):
+    """
+    Array with the nearest center of every point, the first of equally
+    near centers, as Cluster.distance would pick
+
+    Distances are broadcast over chunks of about chunk_elements
+    point-center pairs.  From index_min_centers centers on, each point
+    queries a spatial_index.GridIndex of the centers instead, which is
+    cheaper than scanning that many centers.
+    """
+    if len(center_horiz) >= index_min_centers:
+        index = spatial_index.GridIndex(center_horiz, center_vert)
+        return np.array([index.nearest(point_horiz, point_vert)[1]
+                         for point_horiz, point_vert in
+                         zip(horiz.tolist(), vert.tolist())], dtype=np.intp)
+    num_centers = max(len(center_horiz), 1)
+    chunk = max(chunk_elements // num_centers, 1)
+    res = np.empty(len(horiz), dtype=np.intp)
+    for begin in range(0, len(horiz), chunk):
+        end = begin + chunk
+        dists = np.sqrt(
+            (vert[begin:end, None] - center_vert[None, :]) ** 2 +
+            (horiz[begin:end, None] - center_horiz[None, :]) ** 2)
+        res[begin:end] = np.argmin(dists, axis=1)
+    return res
+
+
+def _merge_rounds(labels, num_centers):
+    """
+    Splits rows by their position among the rows of the same center
+
+    Returns (order, bounds): order[bounds[r]:bounds[r + 1]] are the rows
+    that are the r-th of their center, at most one per center
+    """
+    by_center = np.argsort(labels, kind="stable")
+    counts = np.bincount(labels, minlength=num_centers)
+    ranks = np.empty(len(labels), dtype=np.intp)
+    ranks[by_center] = (np.arange(len(labels)) -
+                        np.repeat(np.cumsum(counts) - counts, counts))
+    order = np.argsort(ranks, kind="stable")
+    bounds = np.searchsorted(ranks[order], np.arange(counts.max(initial=0) + 1))
+    return order, np.append(bounds, len(labels))
+
+
+def _exact_update(points, labels, centers):
+    """
+    Merges points into empty clusters at centers, in order, with the
+    arithmetic of Cluster.merge_clusters
+
+    points  -- (horiz, vert, population, risk) arrays of the rows to merge
+    centers -- (horiz, vert) arrays of the centers
+    Returns (horiz, vert, population, risk) arrays of the new clusters
+    """
+    horiz, vert, population, risk = points
+    new_horiz = centers[0].copy()
+    new_vert = centers[1].copy()
+    new_population = np.zeros(len(new_horiz), dtype=population.dtype)
+    new_risk = np.zeros(len(new_horiz))
+    order, bounds = _merge_rounds(labels, len(new_horiz))
+    for begin, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        rows = order[begin:end]
+        targets = labels[rows]
+        total = new_population[targets] + population[rows]
+        if not total.all():
+            raise ZeroDivisionError("merging clusters with no population")
+        self_weight = new_population[targets].astype(np.float64) / total
+        other_weight = population[rows].astype(np.float64) / total
+        new_population[targets] = total
+        new_vert[targets] = (self_weight * new_vert[targets] +
+                             other_weight * vert[rows])
+        new_horiz[targets] = (self_weight * new_horiz[targets] +
+                              other_weight * horiz[rows])
+        new_risk[targets] = (self_weight * new_risk[targets] +
+                             other_weight * risk[rows])
+    return new_horiz, new_vert, new_population, new_risk
+
+
+def _mean_update(points, labels, centers):
+    """
+    Population weighted means of the points of every center, centers
+    without points stay where they are
+    """
+    horiz, vert, population, risk = points
+    num_centers = len(centers[0])
+    weights = population.astype(np.float64)
+    totals = np.bincount(labels, weights=weights, minlength=num_centers)
+    new_population = np.zeros(num_centers, dtype=population.dtype)
+    np.add.at(new_population, labels, population)
+    has_points = totals > 0
+    res = []
+    for values, default in ((horiz, centers[0]), (vert, centers[1]),
+                            (risk, np.zeros(num_centers))):
+        sums = np.bincount(labels, weights=weights * values,
+                           minlength=num_centers)
+        res.append(np.where(has_points, sums / np.where(has_points, totals, 1),
+                            default))
+    return res[0], res[1], new_population, res[2]
+
+
+def kmeans_table(table, num_clusters, num_iterations, tolerance=0.0,
+                 stop_when_stable=True, exact=True,
+                 chunk_elements=CHUNK_ELEMENTS):
+    """
+    k-means clustering of the live rows of table, which is not changed
+
+    Centers start at the num_clusters most populous rows.  Every
+    iteration assigns each row to its nearest center and moves the
+    centers to the population weighted centroids of their rows.
+
+    tolerance        -- stop once no center moves further than this
+    stop_when_stable -- stop once no row changes center
+    exact            -- centers bit-identical to kmeans_clustering
+
+    Returns a KMeansResult: a ClusterTable with one row per center, the
+    center of every live row of table in row order, and the number of
+    iterations run.
+    """
+    if num_iterations < 1:
+        raise ValueError("k-means needs at least one iteration")
+    rows = table.live_rows()
+    # rows without counties never move a center, as in merge_clusters
+    merged = table.sizes()[rows] > 0
+    by_population = np.argsort(table.populations()[rows], kind="stable")
+    rows = rows[by_population]
+    merged = merged[by_population]
+    points = (table.horiz_centers()[rows], table.vert_centers()[rows],
+              table.populations()[rows], table.risks()[rows])
+    merged_points = tuple(values[merged] for values in points)
+    centers = (points[0][len(rows) - num_clusters:],
+               points[1][len(rows) - num_clusters:])
+    num_centers = len(centers[0])
+    update = _exact_update if exact else _mean_update
+    labels = None
+    for iterations in range(1, num_iterations + 1):
+        new_labels = assign(points[0], points[1], centers[0], centers[1],
+                            chunk_elements)
+        new_clusters = update(merged_points, new_labels[merged], centers)
+        shift = np.sqrt((new_clusters[0] - centers[0]) ** 2 +
+                        (new_clusters[1] - centers[1]) ** 2)
+        stable = labels is not None and np.array_equal(labels, new_labels)
+        labels = new_labels
+        centers = new_clusters[:2]
+        if (tolerance is not None and num_centers and
+                shift.max() <= tolerance) or (stop_when_stable and stable):
+            break
+
+    assignment = np.empty(len(rows), dtype=np.intp)
+    assignment[by_population] = labels
+    table_labels = np.full(table.num_rows(), -1, dtype=np.intp)
+    table_labels[rows] = labels
+    clusters = cluster_table.ClusterTable(
+        new_clusters[0], new_clusters[1], new_clusters[2], new_clusters[3],
+        table.fips(), table_labels[table.labels()], table.points())
+    return KMeansResult(clusters, assignment, iterations)
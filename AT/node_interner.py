@@ -0,0 +1,167 @@
+"""
+Interning of external node ids into dense rows
+
+Array-backed structures index nodes by row 0..n-1.  A NodeInterner
+hands out those rows in order of first appearance and remembers the
+external id of every row.  The reverse map is a flat array of 64-bit
+integers while all ids are integers, falling back to a list only for
+other hashable names.  The forward map is built on first lookup, as a
+binary search over the reverse array when the ids are sorted and as a
+dictionary otherwise, so reopening a memory mapped graph costs nothing
+until a node is actually looked up by id.
+"""
+import operator
+import sys
+from array import array
+from bisect import bisect_left
+
+
+def _as_int(node):
+    """
+    node as a plain int if it is an integer of any type (NumPy integers
+    included), None otherwise
+    """
+    try:
+        return operator.index(node)
+    except TypeError:
+        return None
+
+
+class NodeInterner(object):
+    """
+    Two-way map between external node ids and rows 0..n-1
+    """
+
+    def __init__(self, labels=None):
+        """
+        labels -- optional sequence of the ids of rows 0..n-1, kept as
+                  given (arrays and memoryviews are not copied)
+        """
+        self._labels = array("q") if labels is None else labels
+        self._index = None
+        self._sorted = False
+
+    def __repr__(self):
+        return "NodeInterner(%d nodes)" % len(self)
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __iter__(self):
+        return iter(self._labels)
+
+    def __contains__(self, node):
+        return self.get(node) is not None
+
+    def labels(self):
+        """
+        Get the sequence of ids, indexed by row
+        """
+        return self._labels
+
+    def label(self, row):
+        """
+        Returns the id of row
+        """
+        return self._labels[row]
+
+    def _build_index(self):
+        """
+        Builds the forward map: binary search if ids are sorted integers
+        """
+        labels = self._labels
+        if not isinstance(labels, list) and all(
+                labels[row] < labels[row + 1] for row in range(len(labels) - 1)):
+            self._sorted = True
+            self._index = {}
+            return
+        self._index = dict((label, row) for row, label in enumerate(labels))
+
+    def get(self, node, default=None):
+        """
+        Returns the row of node, default for unknown nodes
+        """
+        if self._index is None:
+            self._build_index()
+        if self._sorted:
+            node = _as_int(node)
+            if node is None:
+                return default
+            pos = bisect_left(self._labels, node)
+            if pos < len(self._labels) and self._labels[pos] == node:
+                return pos
+            return default
+        return self._index.get(node, default)
+
+    def row(self, node):
+        """
+        Returns the row of node, raises KeyError for unknown nodes
+        """
+        row = self.get(node)
+        if row is None:
+            raise KeyError(node)
+        return row
+
+    def intern(self, node):
+        """
+        Returns the row of node, giving it the next row if it is new
+        """
+        row = self.get(node)
+        if row is not None:
+            return row
+        # NumPy integers are stored as the ints they equal
+        as_int = _as_int(node)
+        if as_int is not None:
+            node = as_int
+        row = len(self._labels)
+        if self._sorted and not (isinstance(node, int) and
+                                 (not row or node > self._labels[-1])):
+            # appending out of order or a non-integer id ends the binary
+            # search shortcut
+            self._sorted = False
+            self._index = dict((label, idx)
+                               for idx, label in enumerate(self._labels))
+        self._append(node)
+        if not self._sorted:
+            self._index[node] = row
+        return row
+
+    def _append(self, node):
+        """
+        Appends node to the reverse map, widening it to a list if needed
+        """
+        if not isinstance(self._labels, (array, list)):
+            try:
+                self._labels = array("q", self._labels)
+            except (TypeError, OverflowError):
+                self._labels = list(self._labels)
+        if isinstance(self._labels, array):
+            try:
+                self._labels.append(node)
+                return
+            except (TypeError, OverflowError):
+                self._labels = list(self._labels)
+        self._labels.append(node)
+
+    def is_identity(self):
+        """
+        True if every row is its own id
+        """
+        labels = self._labels
+        return all(isinstance(labels[row], int) and labels[row] == row
+                   for row in range(len(labels)))
+
+    def nbytes(self):
+        """
+        Approximate bytes held by the reverse and forward maps
+        """
+        labels = self._labels
+        if isinstance(labels, array):
+            total = labels.buffer_info()[1] * labels.itemsize
+        elif isinstance(labels, memoryview):
+            total = labels.nbytes
+        else:
+            total = sys.getsizeof(labels)
+        if self._index:
+            total += sys.getsizeof(self._index)
+        return total
@@ -1,12 +1,12 @@
 """
 Functions to calculate order of attack on graph
 """
-import urllib2
-import random
-import time
-import math
 import graph_search as gs
 import graph_degees_calc as gdc
+import degree_queue
+import graph_csr
+import removal_view
+import benchmark
 
 GRAPH2 = {1: set([2, 4, 6, 8]),
           2: set([1, 3, 5, 7]),
@@ -20,8 +20,10 @@ GRAPH2 = {1: set([2, 4, 6, 8]),
 
 def copy_graph(graph):
     """
-    Make a copy of a graph
+    Make a copy of a graph, a RemovalView is copied without its sets
     """
+    if isinstance(graph, removal_view.RemovalView):
+        return graph.copy()
     new_graph = {}
     for node in graph:
         new_graph[node] = set(graph[node])
@@ -32,6 +34,9 @@ def delete_node(ugraph, node):
     """
     Delete a node from an undirected graph
     """
+    if isinstance(ugraph, removal_view.RemovalView):
+        ugraph.delete_node(node)
+        return
     neighbors = ugraph[node]
     ugraph.pop(node)
     for neighbor in neighbors:
@@ -43,26 +48,25 @@ def targeted_order(ugraph):
     Compute a targeted attack order consisting
     of nodes of maximal degree
 
+    Nodes are deleted from a RemovalView of ugraph, so the graph is
+    neither copied nor modified.  Of the nodes of maximal degree the
+    first in the iteration order of ugraph goes first.
+
     Returns:
     A list of nodes
     """
-    # copy the graph
-    new_graph = copy_graph(ugraph)
+    if isinstance(ugraph, dict):
+        # rows in dict order, so the first row is the first node
+        ugraph = graph_csr.from_dict_graph(ugraph, keep_order=True)
+    view = removal_view.RemovalView(ugraph)
+    degrees = view.live_degrees()
 
     order = []
-    while len(new_graph) > 0:
-        max_degree = -1
-        for node in new_graph:
-            if len(new_graph[node]) > max_degree:
-                max_degree = len(new_graph[node])
-                max_degree_node = node
-
-        neighbors = new_graph[max_degree_node]
-        new_graph.pop(max_degree_node)
-        for neighbor in neighbors:
-            new_graph[neighbor].remove(max_degree_node)
-
-        order.append(max_degree_node)
+    while len(view) > 0:
+        # deleted rows have degree -1, the first row of maximal degree wins
+        max_degree_row = degrees.index(max(degrees))
+        view.delete_row(max_degree_row)
+        order.append(view.base().label(max_degree_row))
     return order
 
 
@@ -70,39 +74,21 @@ def fast_target_order(ugraph):
     """
     Compute attack order, return nodes in order
     """
-    result_order = []
-    num_nodes = len(ugraph.keys())
-    degrees = [set([]) for _ in range(num_nodes)]
-    for node in ugraph.keys():
-        node_degree = len(ugraph[node])
-        degrees[node_degree].add(node)
-    for degree in range(num_nodes - 1, -1, -1):
-        while degrees[degree] != set([]):
-            elem = degrees[degree].pop()
-            for neighbor in ugraph[elem]:
-                n_degree = len(ugraph[neighbor])
-                degrees[n_degree].remove(neighbor)
-                degrees[n_degree - 1].add(neighbor)
-            result_order.append(elem)
-            delete_node(ugraph, elem)
-    return result_order
+    return degree_queue.target_order(ugraph)
 
 
 #test_graph = gdc.make_upa_graph(1300, 5)
 
 
-def time_run(fnk):
-    """Times fnk on upa graph"""
-    xval = []
-    yval = []
-    for n in range(10, 1000, 10):
-        xval.append(n)
-        graph = gdc.make_upa_graph(n, 5)
-        c_time = time.time()
-        fnk(graph)
-        time_passed = time.time() - c_time
-        yval.append(time_passed)
-    return xval, yval
+def time_run(fnk, repeats=3):
+    """
+    Times fnk on upa graphs of 10 to 990 nodes
+
+    Graphs are built outside the timed region; returns the sizes and
+    the best of repeats times for each.
+    """
+    return benchmark.time_run(fnk, lambda n: (gdc.make_upa_graph(n, 5),),
+                              range(10, 1000, 10), repeats)
 
 
 # normal_x, normal_y = time_run(targeted_order)
@@ -0,0 +1,149 @@
+"""
+Removal views: node deletion without copying the graph
+
+Destructive algorithms (delete_node, targeted_order, attack orders and
+resilience) used to copy every adjacency set before deleting nodes.  A
+RemovalView instead wraps an immutable CSRGraph with a byte per row
+marking deleted nodes and an array of live degrees.  Deleting a node
+touches only its own adjacency slice, the base graph is never changed,
+and any number of views can attack the same base graph at once.
+"""
+from array import array
+
+import graph_csr
+
+
+class RemovalView(object):
+    """
+    An undirected graph minus the nodes deleted so far
+
+    Exposes the same read API as dict-of-sets graphs (graph[node],
+    iteration, len, in) restricted to live nodes, plus delete_node.
+    """
+
+    def __init__(self, ugraph):
+        """
+        ugraph -- dict-of-sets, CSRGraph or RemovalView; a view starts
+                  from the live nodes of another view
+        """
+        if isinstance(ugraph, RemovalView):
+            self._base = ugraph._base
+            self._removed = bytearray(ugraph._removed)
+            self._degrees = array(ugraph._degrees.typecode, ugraph._degrees)
+            self._num_live = ugraph._num_live
+            return
+        self._base = graph_csr.as_csr(ugraph)
+        offsets = self._base.offsets()
+        num_nodes = self._base.num_nodes()
+        self._removed = bytearray(num_nodes)
+        self._degrees = array(graph_csr.int_typecode(num_nodes),
+                              [offsets[row + 1] - offsets[row]
+                               for row in range(num_nodes)])
+        self._num_live = num_nodes
+
+    def __repr__(self):
+        return "RemovalView(%d of %d nodes)" % (self._num_live,
+                                                self._base.num_nodes())
+
+    def base(self):
+        """
+        Get the underlying CSRGraph
+        """
+        return self._base
+
+    def removed(self):
+        """
+        Get the bytearray marking deleted rows with 1
+        """
+        return self._removed
+
+    def live_degrees(self):
+        """
+        Get the array of degrees among live nodes, indexed by row,
+        with -1 for deleted rows
+        """
+        return self._degrees
+
+    def copy(self):
+        """
+        Independent view of the same live nodes, sharing the base graph
+        """
+        return RemovalView(self)
+
+    def row(self, node):
+        """
+        Returns the row of a live node, raises KeyError otherwise
+        """
+        row = self._base.row(node)
+        if self._removed[row]:
+            raise KeyError(node)
+        return row
+
+    def delete_row(self, row):
+        """
+        Deletes the live node at row
+        """
+        self._removed[row] = 1
+        self._degrees[row] = -1
+        self._num_live -= 1
+        offsets = self._base.offsets()
+        targets = self._base.targets()
+        degrees = self._degrees
+        removed = self._removed
+        for idx in range(offsets[row], offsets[row + 1]):
+            if not removed[targets[idx]]:
+                degrees[targets[idx]] -= 1
+
+    def delete_node(self, node):
+        """
+        Deletes node, raises KeyError if it is not a live node
+        """
+        self.delete_row(self.row(node))
+
+    def degree(self, node):
+        """
+        Number of live neighbours of node
+        """
+        return self._degrees[self.row(node)]
+
+    def live_neighbor_rows(self, row):
+        """
+        List of the live neighbour rows of row
+        """
+        removed = self._removed
+        return [target for target in self._base.neighbor_rows(row)
+                if not removed[target]]
+
+    def __len__(self):
+        return self._num_live
+
+    def __iter__(self):
+        removed = self._removed
+        base = self._base
+        return (base.label(row) for row in range(base.num_nodes())
+                if not removed[row])
+
+    def __contains__(self, node):
+        try:
+            self.row(node)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __getitem__(self, node):
+        base = self._base
+        return [base.label(row) for row in
+                self.live_neighbor_rows(self.row(node))]
+
+    def keys(self):
+        """
+        List of live nodes, in row order
+        """
+        return list(self)
+
+    def items(self):
+        """
+        List of (node, live neighbours) pairs, in row order
+        """
+        return [(node, self[node]) for node in self]
+
@@ -0,0 +1,284 @@
+"""
+Resilience of graphs under node attacks
+
+Instead of deleting nodes one by one and recomputing the connected
+components after every removal, the attack order is replayed
+backwards: nodes are added back to the graph and merged into their
+neighbours' components with a weighted union-find.  The largest
+component can only grow while adding nodes, so the whole resilience
+curve costs near-linear time.
+
+For graphs where even that is too much, estimate_resilience only looks
+at a schedule of removal fractions and estimates the largest component
+at each of them from budgeted BFSs out of randomly sampled nodes, with
+Wilson confidence bounds.
+"""
+import collections
+import math
+import random
+from array import array
+
+import components
+import graph_csr
+import removal_view
+
+DEFAULT_SAMPLES = 200
+DEFAULT_BUDGET = 2000
+
+ResilienceEstimate = collections.namedtuple("ResilienceEstimate",
+                                            ["removed", "size", "low", "high"])
+
+
+class UnionFind(object):
+    """
+    Weighted union-find over the integers 0..n-1 with path halving
+    """
+
+    def __init__(self, num_items):
+        """
+        Create num_items singleton sets
+        """
+        typecode = graph_csr.int_typecode(num_items)
+        self._parent = array(typecode, range(num_items))
+        self._size = array(typecode, [1]) * num_items
+
+    @classmethod
+    def from_components(cls, labels, sizes):
+        """
+        Create sets from a component labelling, items labelled -1 stay
+        singletons
+
+        Each component is rooted at its first item, so no unions are needed
+        """
+        sets = cls(len(labels))
+        roots = array(sets._parent.typecode, [-1]) * len(sizes)
+        for item, component in enumerate(labels):
+            if component == -1:
+                continue
+            if roots[component] == -1:
+                roots[component] = item
+                sets._size[item] = sizes[component]
+            sets._parent[item] = roots[component]
+        return sets
+
+    def find(self, item):
+        """
+        Returns the representative of the set holding item
+        """
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, item1, item2):
+        """
+        Merges the sets of item1 and item2, the smaller under the larger
+
+        Returns the size of the merged set
+        """
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        size = self._size
+        if root1 == root2:
+            return size[root1]
+        if size[root1] < size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        size[root1] += size[root2]
+        return size[root1]
+
+    def set_size(self, item):
+        """
+        Returns the size of the set holding item
+        """
+        return self._size[self.find(item)]
+
+
+def _base_graph(ugraph):
+    """
+    (CSRGraph, deleted rows mask or None) of a graph or RemovalView
+    """
+    if isinstance(ugraph, removal_view.RemovalView):
+        return ugraph.base(), ugraph.removed()
+    return graph_csr.as_csr(ugraph), None
+
+
+def attack_rows(csr, attack_order, deleted=None):
+    """
+    Converts attack_order into an array of rows of csr
+
+    deleted -- optional mask of rows already deleted, not modified
+
+    Returns the rows and a mask of the rows deleted or attacked.
+    Raises KeyError for unknown nodes and for nodes attacked twice or
+    already deleted, as deleting them from a dict graph would
+    """
+    removed = bytearray(csr.num_nodes()) if deleted is None else \
+        bytearray(deleted)
+    rows = array(graph_csr.int_typecode(csr.num_nodes()))
+    for node in attack_order:
+        row = csr.row(node)
+        if removed[row]:
+            raise KeyError(node)
+        removed[row] = 1
+        rows.append(row)
+    return rows, removed
+
+
+def compute_resilience(ugraph, attack_order, fractions=None, **options):
+    """
+    Returns list of largest components in graph,
+    after removing the nodes in order of attack_order
+
+    The first entry is the largest component of the intact graph, so the
+    list has len(attack_order) + 1 entries.  ugraph is not modified; if
+    it is a RemovalView the attack starts from its live nodes.
+
+    If fractions is given the curve is estimated at those fractions of
+    attack_order only, see estimate_resilience for the result and options.
+    """
+    if fractions is not None:
+        return estimate_resilience(ugraph, attack_order, fractions, **options)
+    csr, deleted = _base_graph(ugraph)
+    rows, present = attack_rows(csr, attack_order, deleted)
+    for row in range(len(present)):
+        present[row] ^= 1
+
+    labels, sizes = components.connected_components(csr, present)
+    sets = UnionFind.from_components(labels, sizes)
+    largest = max(sizes) if sizes else 0
+    offsets = csr.offsets()
+    targets = csr.targets()
+
+    resilience = [0] * (len(rows) + 1)
+    resilience[len(rows)] = largest
+    for step in range(len(rows) - 1, -1, -1):
+        row = rows[step]
+        present[row] = 1
+        largest = max(largest, 1)
+        for idx in range(offsets[row], offsets[row + 1]):
+            if present[targets[idx]]:
+                largest = max(largest, sets.union(row, targets[idx]))
+        resilience[step] = largest
+    return resilience
+
+
+def wilson_interval(hits, trials, z=1.96):
+    """
+    Wilson score interval (low, high) for a proportion of hits in trials
+    """
+    if not trials:
+        return 0.0, 1.0
+    phat = float(hits) / trials
+    denom = 1 + z * z / trials
+    centre = phat + z * z / (2 * trials)
+    spread = z * math.sqrt(phat * (1 - phat) / trials +
+                           z * z / (4 * trials * trials))
+    return max(0.0, (centre - spread) / denom), min(1.0, (centre + spread) / denom)
+
+
+def _budgeted_component(csr, present, start, budget):
+    """
+    Size of the component of row start among present rows, or budget + 1
+    if the BFS reaches more than budget rows
+    """
+    offsets = csr.offsets()
+    targets = csr.targets()
+    seen = set([start])
+    queue = collections.deque([start])
+    while queue:
+        row = queue.popleft()
+        for idx in range(offsets[row], offsets[row + 1]):
+            neighbor = targets[idx]
+            if present[neighbor] and neighbor not in seen:
+                if len(seen) == budget:
+                    return budget + 1
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return len(seen)
+
+
+def _sample_present(present, num_alive, num_samples, rnd):
+    """
+    num_samples rows drawn uniformly, with replacement, from present rows
+    """
+    num_nodes = len(present)
+    res = []
+    # rejection sampling while most rows are present, a list of the
+    # present rows once too many draws would be wasted
+    for _ in range(4 * num_samples):
+        if len(res) == num_samples:
+            return res
+        row = rnd.randrange(num_nodes)
+        if present[row]:
+            res.append(row)
+    alive = [row for row in range(num_nodes) if present[row]]
+    while len(res) < num_samples:
+        res.append(alive[rnd.randrange(num_alive)])
+    return res
+
+
+def estimate_resilience(ugraph, attack_order, fractions,
+                        num_samples=DEFAULT_SAMPLES, budget=DEFAULT_BUDGET,
+                        seed=None, z=1.96):
+    """
+    Estimates the largest component after removing fractions of attack_order
+
+    At every fraction num_samples surviving nodes are picked at random
+    and a BFS of at most budget nodes is run from each.  Samples whose
+    BFS runs out of budget are taken to sit in the giant component, so
+    its size is estimated as the share of such samples times the number
+    of surviving nodes; otherwise the largest component explored in full
+    is used.  The work per fraction is bounded by num_samples * budget
+    nodes regardless of the size of the graph.
+
+    Returns a list of ResilienceEstimate(removed, size, low, high), one
+    per fraction in increasing order, where removed is the number of
+    nodes attacked and low, high are the bounds from the z-score
+    Wilson interval.  ugraph is not modified.
+    """
+    csr, deleted = _base_graph(ugraph)
+    rows, _ = attack_rows(csr, attack_order, deleted)
+    present = bytearray(b"\x01") * csr.num_nodes()
+    num_live = csr.num_nodes()
+    if deleted is not None:
+        for row in range(len(deleted)):
+            present[row] ^= deleted[row]
+        num_live -= sum(deleted)
+    rnd = random.Random(seed)
+    res = []
+    removed = 0
+    for fraction in sorted(fractions):
+        if not 0 <= fraction <= 1:
+            raise ValueError("removal fraction %r is outside [0, 1]" % fraction)
+        target = int(round(fraction * len(rows)))
+        while removed < target:
+            present[rows[removed]] = 0
+            removed += 1
+        num_alive = num_live - removed
+        if not num_alive:
+            res.append(ResilienceEstimate(removed, 0, 0, 0))
+            continue
+
+        hits = 0
+        largest_small = 0
+        for start in _sample_present(present, num_alive, num_samples, rnd):
+            size = _budgeted_component(csr, present, start, budget)
+            if size > budget:
+                hits += 1
+            else:
+                largest_small = max(largest_small, size)
+        p_low, p_high = wilson_interval(hits, num_samples, z)
+        low = max(largest_small, int(math.ceil(p_low * num_alive)))
+        high = max(largest_small, int(p_high * num_alive))
+        if hits:
+            low = max(low, budget + 1)
+            size = int(round(float(hits) / num_samples * num_alive))
+        else:
+            size = largest_small
+        low = min(low, num_alive)
+        high = min(max(high, low), num_alive)
+        res.append(ResilienceEstimate(removed, min(max(size, low), high),
+                                      low, high))
+    return res
@@ -0,0 +1,198 @@
+"""
+Parallel Monte-Carlo resilience experiments
+
+A batch is a list of ResilienceJob(graph, strategy, seed) tuples.
+Random graph specs draw a new graph for every job, seeded by both the
+spec's graph seed and the job seed, so the spread of a group covers
+graph draws as well as attack orders.  Workers generate those graphs
+themselves.  Graphs loaded from files are the same for every job: each
+is loaded once in the parent process and written to a graph_snapshot
+file, and worker processes memory map it, so it reaches the pool
+through the page cache instead of being pickled.  Curves stream back as
+jobs finish and are aggregated into mean and percentile curves per
+(graph, strategy) group.
+
+Graph specs are tuples:
+    ("er", num_nodes, prob, graph_seed)
+    ("upa", num_nodes, avg_degree, graph_seed)
+    ("file", path_or_url)
+Strategies are "random" and "targeted".  A targeted attack on a file
+graph is deterministic, so monte_carlo_jobs runs it once.
+"""
+import collections
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+
+import degree_queue
+import graph_io
+import graph_snapshot
+import resilience
+
+ResilienceJob = collections.namedtuple("ResilienceJob",
+                                       ["graph", "strategy", "seed"])
+
+DETERMINISTIC_STRATEGIES = ("targeted",)
+
+# the graph last mapped by this worker process, by snapshot path
+_MAPPED_GRAPHS = {}
+
+
+def _graph_seed(spec_seed, seed):
+    """
+    Generator seed for a job seed on top of the spec's graph seed
+    """
+    if seed is None:
+        return spec_seed
+    if spec_seed is None:
+        return seed
+    return [spec_seed, seed]
+
+
+def build_graph(spec, seed=None):
+    """
+    Builds the CSRGraph described by a graph spec, a random graph drawn
+    with the job seed seed if given
+    """
+    kind = spec[0]
+    if kind == "file":
+        return graph_io.load_graph(spec[1])
+    import graph_generators
+    if kind == "er":
+        return graph_generators.er_graph(spec[1], spec[2],
+                                         seed=_graph_seed(spec[3], seed))
+    if kind == "upa":
+        return graph_generators.upa_graph(spec[1], spec[2],
+                                          seed=_graph_seed(spec[3], seed))
+    raise ValueError("unknown graph spec %r" % (spec,))
+
+
+def attack_order(csr, strategy, seed):
+    """
+    Attack order of csr for a strategy; random orders are seeded
+    """
+    if strategy == "targeted":
+        return degree_queue.iter_target_order(csr)
+    if strategy == "random":
+        order = list(csr)
+        random.Random(seed).shuffle(order)
+        return order
+    raise ValueError("unknown attack strategy %r" % (strategy,))
+
+
+def _run_job(task):
+    """
+    Worker: resilience curve of one job, on its own random graph or on
+    a memory mapped file graph
+    """
+    job, snapshot_path = task
+    if snapshot_path is None:
+        csr = build_graph(job.graph, job.seed)
+    else:
+        csr = _MAPPED_GRAPHS.get(snapshot_path)
+        if csr is None:
+            _MAPPED_GRAPHS.clear()
+            csr = _MAPPED_GRAPHS[snapshot_path] = \
+                graph_snapshot.map_snapshot(snapshot_path).graph
+    return job, resilience.compute_resilience(
+        csr, attack_order(csr, job.strategy, job.seed))
+
+
+def iter_resilience_curves(jobs, processes=None, work_dir=None):
+    """
+    Runs jobs on a process pool, yielding (job, curve) as they finish
+
+    work_dir -- directory for the graph snapshot files, a temporary
+                directory removed afterwards by default
+    """
+    own_dir = work_dir is None
+    if own_dir:
+        work_dir = tempfile.mkdtemp(prefix="resilience_")
+    try:
+        snapshot_paths = {}
+        tasks = []
+        for job in jobs:
+            if job.graph[0] != "file":
+                tasks.append((job, None))
+                continue
+            if job.graph not in snapshot_paths:
+                path = os.path.join(work_dir,
+                                    "graph%d.csrs" % len(snapshot_paths))
+                graph_snapshot.write_snapshot(build_graph(job.graph), path)
+                snapshot_paths[job.graph] = path
+            tasks.append((job, snapshot_paths[job.graph]))
+        pool = multiprocessing.Pool(processes)
+        try:
+            for result in pool.imap_unordered(_run_job, tasks):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _percentile(sorted_values, percent):
+    """
+    Linearly interpolated percentile of a sorted list
+    """
+    pos = (len(sorted_values) - 1) * percent / 100.0
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] -
+                                 sorted_values[low]) * (pos - low)
+
+
+def aggregate_curves(curves, percentiles=(5, 50, 95)):
+    """
+    Pointwise mean and percentiles of equally long curves
+
+    Returns a dictionary with "mean", "runs" and one entry per percentile
+    """
+    res = {"runs": len(curves), "mean": []}
+    for percent in percentiles:
+        res[percent] = []
+    for values in zip(*curves):
+        values = sorted(values)
+        res["mean"].append(float(sum(values)) / len(values))
+        for percent in percentiles:
+            res[percent].append(_percentile(values, percent))
+    return res
+
+
+def run_resilience_batch(jobs, processes=None, percentiles=(5, 50, 95),
+                         work_dir=None):
+    """
+    Runs jobs in parallel and aggregates their curves
+
+    Returns a dictionary from (graph spec, strategy) to aggregated
+    curves, without percentiles for groups of a single run
+    """
+    groups = collections.defaultdict(list)
+    for job, curve in iter_resilience_curves(jobs, processes, work_dir):
+        groups[(job.graph, job.strategy)].append(curve)
+    return dict((key, aggregate_curves(
+        curves, percentiles if len(curves) > 1 else ()))
+                for key, curves in groups.items())
+
+
+def monte_carlo_jobs(graph_specs, strategies, runs, seed=0):
+    """
+    runs jobs with distinct seeds for every graph spec and strategy
+
+    Every run of a random graph spec draws its own graph.  Deterministic
+    strategies on file graphs would repeat the same curve, so they get
+    a single job.
+    """
+    res = []
+    for spec in graph_specs:
+        for strategy in strategies:
+            num_runs = runs
+            if spec[0] == "file" and strategy in DETERMINISTIC_STRATEGIES:
+                num_runs = min(runs, 1)
+            res.extend(ResilienceJob(spec, strategy, seed + run)
+                       for run in range(num_runs))
+    return res
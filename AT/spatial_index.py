@@ -0,0 +1,289 @@
+"""
+Uniform grid index of points in the plane
+
+fast_closest_pair re-slices the cluster list and re-sorts a strip at
+every level of recursion, and the clustering engines scan every center
+to find a nearest one.  A GridIndex buckets points by square cell, so a
+nearest point query only looks at the cells in rings around the query
+until no unseen cell can hold anything closer.  With about
+POINTS_PER_CELL points per cell that is O(1) expected work per query.
+
+Points are identified by integer ids and can be inserted, deleted and
+moved one at a time, as clusters are merged or centers move.  When
+deletions leave fewer than a quarter of the points the grid was sized
+for, it is rebuilt with cells sized for the points left.
+
+Distances are compared squared, with the same operations as the NumPy
+scans elsewhere (products, not ** 2, which goes through libm pow and can
+be an ulp off), so both find the same point.  Ties go to the smaller id.
+"""
+import heapq
+import math
+
+POINTS_PER_CELL = 2.0
+
+
+def _cell_size(horiz, vert, num_points):
+    """
+    Side of square cells holding about POINTS_PER_CELL of num_points
+    spread over the bounding box of horiz and vert
+    """
+    if not num_points:
+        return 1.0
+    width = max(horiz) - min(horiz)
+    height = max(vert) - min(vert)
+    area = width * height
+    if area > 0:
+        return math.sqrt(area * POINTS_PER_CELL / num_points)
+    return max(width, height) * POINTS_PER_CELL / num_points or 1.0
+
+
+class GridIndex(object):
+    """
+    Dynamic set of points with nearest neighbour queries
+    """
+
+    def __init__(self, horiz=(), vert=(), cell_size=None):
+        """
+        horiz, vert -- coordinates of points with ids 0..n-1
+        cell_size   -- side of the grid cells, fitted to the points by
+                       default
+        """
+        horiz = [float(value) for value in horiz]
+        vert = [float(value) for value in vert]
+        self._points = {}
+        self._build(list(zip(range(len(horiz)), horiz, vert)),
+                    cell_size or _cell_size(horiz, vert, len(horiz)))
+
+    def _build(self, points, cell_size):
+        """
+        Fills an empty grid of the given cell size with (id, horiz, vert)
+        """
+        self._cell = cell_size
+        self._cells = {}
+        self._points = {}
+        self._bounds = None
+        self._built_size = len(points)
+        for idx, horiz, vert in points:
+            self._add(idx, horiz, vert)
+
+    def __repr__(self):
+        return "GridIndex(%d points, cell %g)" % (len(self), self._cell)
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, idx):
+        return idx in self._points
+
+    def __iter__(self):
+        return iter(self._points)
+
+    def cell_size(self):
+        """
+        Get the side of the grid cells
+        """
+        return self._cell
+
+    def position(self, idx):
+        """
+        Returns the (horiz, vert) position of point idx
+        """
+        return self._points[idx]
+
+    def _key(self, horiz, vert):
+        """
+        Cell of a position
+        """
+        return (int(math.floor(horiz / self._cell)),
+                int(math.floor(vert / self._cell)))
+
+    def _add(self, idx, horiz, vert):
+        """
+        Puts point idx in its cell, growing the bounds of used cells
+        """
+        key = self._key(horiz, vert)
+        self._points[idx] = (horiz, vert)
+        self._cells.setdefault(key, []).append(idx)
+        if self._bounds is None:
+            self._bounds = [key[0], key[0], key[1], key[1]]
+        else:
+            bounds = self._bounds
+            bounds[0] = min(bounds[0], key[0])
+            bounds[1] = max(bounds[1], key[0])
+            bounds[2] = min(bounds[2], key[1])
+            bounds[3] = max(bounds[3], key[1])
+
+    def insert(self, idx, horiz, vert):
+        """
+        Adds point idx at (horiz, vert), raises KeyError if it exists
+        """
+        if idx in self._points:
+            raise KeyError(idx)
+        self._add(idx, float(horiz), float(vert))
+
+    def delete(self, idx):
+        """
+        Removes point idx, raises KeyError if it does not exist
+        """
+        horiz, vert = self._points.pop(idx)
+        key = self._key(horiz, vert)
+        bucket = self._cells[key]
+        bucket.remove(idx)
+        if not bucket:
+            del self._cells[key]
+        if self._points and 4 * len(self._points) < self._built_size:
+            points = [(other, position[0], position[1])
+                      for other, position in self._points.items()]
+            self._build(points, _cell_size([point[1] for point in points],
+                                           [point[2] for point in points],
+                                           len(points)))
+
+    def move(self, idx, horiz, vert):
+        """
+        Moves point idx to (horiz, vert)
+        """
+        old = self._points[idx]
+        horiz = float(horiz)
+        vert = float(vert)
+        old_key = self._key(old[0], old[1])
+        key = self._key(horiz, vert)
+        if key == old_key:
+            self._points[idx] = (horiz, vert)
+            return
+        bucket = self._cells[old_key]
+        bucket.remove(idx)
+        if not bucket:
+            del self._cells[old_key]
+        self._add(idx, horiz, vert)
+
+    def _rings(self, horiz, vert):
+        """
+        Yields (bound, cells) for rings 0, 1, ... of cells around a
+        position, until the rings cover every used cell; bound is the
+        least distance from the position to a cell of the ring
+        """
+        if self._bounds is None:
+            return
+        cell = self._cell
+        col, row = self._key(horiz, vert)
+        # shrunk a little so rounding in the cell keys never prunes a
+        # point sitting on a cell border
+        edge = min(horiz - col * cell, (col + 1) * cell - horiz,
+                   vert - row * cell, (row + 1) * cell - vert)
+        edge -= 1e-9 * (cell + abs(horiz) + abs(vert))
+        min_col, max_col, min_row, max_row = self._bounds
+        last = max(col - min_col, max_col - col, row - min_row, max_row - row)
+        cells = self._cells
+        yield 0.0, (cells.get((col, row)),)
+        for ring in range(1, last + 1):
+            ring_cells = []
+            for dcol in range(-ring, ring + 1):
+                if dcol in (-ring, ring):
+                    drows = range(-ring, ring + 1)
+                else:
+                    drows = (-ring, ring)
+                for drow in drows:
+                    ring_cells.append(cells.get((col + dcol, row + drow)))
+            yield max((ring - 1) * cell + edge, 0.0), ring_cells
+
+    def nearest(self, horiz, vert, exclude=None):
+        """
+        Returns (squared distance, id) of the point nearest to
+        (horiz, vert) other than exclude, (inf, None) if there is none
+        """
+        best_dist = float("inf")
+        best = None
+        points = self._points
+        for bound, cells in self._rings(horiz, vert):
+            if bound * bound > best_dist:
+                break
+            for bucket in cells:
+                if not bucket:
+                    continue
+                for idx in bucket:
+                    if idx == exclude:
+                        continue
+                    position = points[idx]
+                    dvert = position[1] - vert
+                    dhoriz = position[0] - horiz
+                    dist = dvert * dvert + dhoriz * dhoriz
+                    if dist < best_dist or (dist == best_dist and idx < best):
+                        best_dist = dist
+                        best = idx
+        return best_dist, best
+
+    def k_nearest(self, horiz, vert, num, exclude=None):
+        """
+        List of (squared distance, id) of the num points nearest to
+        (horiz, vert) other than exclude, nearest first
+        """
+        found = []
+        points = self._points
+        for bound, cells in self._rings(horiz, vert):
+            if len(found) == num and bound * bound > -found[0][0]:
+                break
+            for bucket in cells:
+                if not bucket:
+                    continue
+                for idx in bucket:
+                    if idx == exclude:
+                        continue
+                    position = points[idx]
+                    dvert = position[1] - vert
+                    dhoriz = position[0] - horiz
+                    dist = dvert * dvert + dhoriz * dhoriz
+                    # a max-heap of the best num, worst on top
+                    entry = (-dist, -idx)
+                    if len(found) < num:
+                        heapq.heappush(found, entry)
+                    elif entry > found[0]:
+                        heapq.heapreplace(found, entry)
+        return sorted((-dist, -idx) for dist, idx in found)
+
+    def closest_pair(self):
+        """
+        Returns (distance, id1, id2) of the closest pair of points,
+        id1 < id2, (inf, None, None) with fewer than two points
+        """
+        best = self._adjacent_closest_pair()
+        if best[0] > self._cell * self._cell:
+            # pairs more than a cell apart may skip a cell, ask per point
+            for idx, position in self._points.items():
+                dist, other = self.nearest(position[0], position[1], idx)
+                if other is not None:
+                    best = min(best, (dist, min(idx, other), max(idx, other)))
+        if best[1] is None:
+            return best
+        return math.sqrt(best[0]), best[1], best[2]
+
+    def _adjacent_closest_pair(self):
+        """
+        Closest (squared distance, id1, id2) among pairs of points in the
+        same or adjacent cells; the closest pair of all when that is
+        within one cell side
+        """
+        best = (float("inf"), None, None)
+        cells = self._cells
+        points = self._points
+        for (col, row), bucket in cells.items():
+            # each pair of adjacent cells once: this one and four ahead
+            neighbours = [cells.get((col + 1, row - 1)),
+                          cells.get((col + 1, row)),
+                          cells.get((col + 1, row + 1)),
+                          cells.get((col, row + 1))]
+            for pos, idx in enumerate(bucket):
+                horiz, vert = points[idx]
+                others = bucket[pos + 1:]
+                for other_bucket in neighbours:
+                    if other_bucket:
+                        others = others + other_bucket
+                for other in others:
+                    position = points[other]
+                    dvert = position[1] - vert
+                    dhoriz = position[0] - horiz
+                    dist = dvert * dvert + dhoriz * dhoriz
+                    if dist <= best[0]:
+                        best = min(best, (dist, min(idx, other),
+                                          max(idx, other)))
+        return best
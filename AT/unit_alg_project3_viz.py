@@ -0,0 +1,57 @@
+"""
+Tests for the cluster distortion experiments
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import alg_project3_viz
+import cluster_table
+import clustering
+import fixtures
+
+
+class DistortionTest(unittest.TestCase):
+    """Distortions equal those of clusterings computed one k at a time"""
+
+    def setUp(self):
+        self.data = cluster_table.random_data_table(150, 3)
+
+    def test_load_data_table(self):
+        """Lines of a csv file come back as typed data table rows"""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "data.csv")
+            with open(path, "w") as data_file:
+                data_file.write("\n".join(",".join(str(value) for value in line)
+                                          for line in self.data[:3]))
+            self.assertEqual(alg_project3_viz.load_data_table(
+                "file://" + os.path.abspath(path)), self.data[:3])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_hierarchical_distortions(self):
+        """Dendrogram cuts give the distortion of separate runs"""
+        res = alg_project3_viz.hierarchical_distortions(self.data, range(3, 8))
+        self.assertEqual(sorted(res), list(range(3, 8)))
+        for num_clusters, distortion in res.items():
+            clusters = clustering.hierarchical_clustering(
+                fixtures.singletons(self.data), num_clusters)
+            self.assertAlmostEqual(
+                distortion / sum(cluster.cluster_error(self.data)
+                                 for cluster in clusters), 1.0)
+
+    def test_kmeans_distortions(self):
+        """Vectorized k-means gives the distortion of the sequential loop"""
+        res = alg_project3_viz.kmeans_distortions(self.data, range(3, 8), 4)
+        self.assertEqual(sorted(res), list(range(3, 8)))
+        for num_clusters, distortion in res.items():
+            clusters = clustering.slow_kmeans_clustering(
+                fixtures.singletons(self.data), num_clusters, 4)
+            self.assertAlmostEqual(
+                distortion / sum(cluster.cluster_error(self.data)
+                                 for cluster in clusters), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the benchmark harness
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import benchmark
+
+
+class TimeCallTest(unittest.TestCase):
+    """Setup is repeated and kept out of the times"""
+
+    def test_setup_runs_before_every_call(self):
+        """Setup is untimed and rerun before each timed call"""
+        calls = []
+        setups = []
+
+        def setup():
+            setups.append(1)
+            return ([],)
+        times = benchmark.time_call(lambda items: calls.append(items),
+                                    setup, repeats=3, warmup=2)
+        self.assertEqual(len(times), 3)
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(len(setups), 5)
+        # every call got a fresh input
+        self.assertEqual(len(set(id(items) for items in calls)), 5)
+
+    def test_time_run(self):
+        """One best time per size, in the order of sizes"""
+        sizes, times = benchmark.time_run(lambda items: sorted(items),
+                                          lambda n: (list(range(n)),),
+                                          [10, 100], repeats=2)
+        self.assertEqual(sizes, [10, 100])
+        self.assertEqual(len(times), 2)
+        self.assertTrue(all(elapsed >= 0 for elapsed in times))
+
+
+class FitExponentTest(unittest.TestCase):
+    """Exponents of exact power laws are recovered"""
+
+    def test_power_laws(self):
+        """Exponents of exact power laws are recovered"""
+        sizes = [10, 100, 1000, 10000]
+        self.assertAlmostEqual(
+            benchmark.fit_exponent(sizes, [3e-6 * size for size in sizes]), 1.0)
+        self.assertAlmostEqual(
+            benchmark.fit_exponent(sizes, [size ** 2 for size in sizes]), 2.0)
+
+    def test_too_few_points(self):
+        """No exponent without two distinct sizes with positive times"""
+        self.assertIsNone(benchmark.fit_exponent([10], [1.0]))
+        self.assertIsNone(benchmark.fit_exponent([10, 10], [1.0, 2.0]))
+        self.assertIsNone(benchmark.fit_exponent([10, 20], [0.0, 1.0]))
+
+
+class SuiteTest(unittest.TestCase):
+    """Suite results round trip through JSON and compare to a baseline"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_suite_benchmarks_run(self):
+        """Every graph benchmark runs on a small size"""
+        names = set(bench.name for bench in benchmark._graph_benchmarks())
+        self.assertTrue(set(["targeted_order", "fast_target_order",
+                             "compute_resilience", "bfs_visited",
+                             "compute_in_degrees", "upa_graph"]) <= names)
+        for bench in benchmark._graph_benchmarks():
+            small = bench._replace(sizes=(40, 80))
+            result = benchmark.run_benchmark(small, repeats=1, warmup=0)
+            self.assertEqual(result["sizes"], [40, 80])
+            self.assertEqual(len(result["best"]), 2)
+            self.assertIn(bench.name, benchmark.format_result(result))
+
+    def test_save_load_compare(self):
+        """Only benchmarks slower than the threshold are regressions"""
+        results = {"f": {"name": "f", "sizes": [10, 20], "best": [1.0, 2.0],
+                         "median": [1.0, 2.0], "exponent": 1.0}}
+        path = os.path.join(self.directory, "results.json")
+        benchmark.save_results(results, path)
+        baseline = benchmark.load_results(path)
+        self.assertEqual(baseline, results)
+        self.assertEqual(benchmark.compare_results(results, baseline), [])
+
+        slower = {"f": dict(results["f"], sizes=[10, 20, 40],
+                            best=[1.2, 5.0, 9.0]),
+                  "g": dict(results["f"], name="g", best=[9.0, 9.0])}
+        self.assertEqual(benchmark.compare_results(slower, baseline),
+                         [("f", 20, 2.5)])
+        self.assertEqual(benchmark.compare_results(slower, baseline, 1.1),
+                         [("f", 20, 2.5), ("f", 10, 1.2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
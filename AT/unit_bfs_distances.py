@@ -0,0 +1,54 @@
+"""
+Tests for the BFS distance engine
+"""
+import random
+import unittest
+import bfs_distances
+import graph_csr
+
+GRAPH0 = {0: set([1]),
+          1: set([0, 2]),
+          2: set([1, 3]),
+          3: set([2])}
+
+
+class DistanceTest(unittest.TestCase):
+    """Single, multi-source and bit-parallel distances agree"""
+
+    def test_path(self):
+        """Distances along a path, unreachable nodes get -1"""
+        graph = dict(GRAPH0)
+        graph[4] = set()
+        self.assertEqual(list(bfs_distances.bfs_distances(graph, [0])),
+                         [0, 1, 2, 3, -1])
+        self.assertEqual(list(bfs_distances.bfs_distances(graph, [0, 3])),
+                         [0, 1, 1, 0, -1])
+
+    def test_bit_parallel_matches(self):
+        """More than one word of sources on a random graph"""
+        rnd = random.Random(11)
+        graph = dict((node, set()) for node in range(150))
+        for _ in range(220):
+            node1, node2 = rnd.randrange(150), rnd.randrange(150)
+            if node1 != node2:
+                graph[node1].add(node2)
+                graph[node2].add(node1)
+        sources = list(range(0, 150, 2))
+        parallel = bfs_distances.bit_parallel_bfs(graph, sources)
+        self.assertEqual(len(parallel), len(sources))
+        for source, distances in zip(sources, parallel):
+            self.assertEqual(list(distances),
+                             list(bfs_distances.bfs_distances(graph, [source])))
+
+    def test_summaries(self):
+        """Path length, eccentricity and diameter of a path graph"""
+        csr = graph_csr.from_dict_graph(GRAPH0)
+        self.assertEqual(bfs_distances.eccentricity(csr, 1), 2)
+        self.assertEqual(bfs_distances.estimate_diameter(csr, seed=1), 3)
+        self.assertAlmostEqual(bfs_distances.average_path_length(csr), 20 / 12.0)
+        self.assertEqual(bfs_distances.sample_eccentricities(csr),
+                         {0: 3, 1: 2, 2: 2, 3: 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
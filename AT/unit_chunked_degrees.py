@@ -0,0 +1,87 @@
+"""
+Tests for out-of-core in-degree counting
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import chunked_degrees
+import graph_degees_calc
+import graph_io
+
+
+class ChunkedDegreesTest(unittest.TestCase):
+    """Chunked counts equal in_degree_distribution of the loaded graph"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        """Writes text to a file in the temporary directory"""
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as graph_file:
+            graph_file.write(text)
+        return path
+
+    def random_file(self, name, num_nodes, id_range, rnd):
+        """Adjacency list with num_nodes random ids below id_range"""
+        nodes = rnd.sample(range(id_range), num_nodes)
+        lines = []
+        for node in nodes:
+            neighbors = rnd.sample(nodes, rnd.randrange(6))
+            lines.append(" ".join(str(n) for n in [node] + neighbors))
+        return self.write(name, "\n".join(lines) + "\n")
+
+    def expected(self, path):
+        """in_degree_distribution of the graph as load_graph reads it"""
+        return graph_degees_calc.in_degree_distribution(
+            graph_io.load_graph(path, as_dict=True))
+
+    def test_parse_block(self):
+        """Line starts are marked, commas and blank lines are skipped"""
+        ids, first = chunked_degrees.parse_block(b"1 2 3\n\n4,5\r\n6\n")
+        self.assertEqual(list(ids), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(list(first), [True, False, False, True, False, True])
+
+    def test_dense(self):
+        """Small ids with blocks much shorter than the file"""
+        rnd = random.Random(1)
+        path = self.random_file("dense.txt", 300, 400, rnd)
+        with chunked_degrees.count_in_degrees(path, block_bytes=64) as counter:
+            self.assertFalse(counter.is_spilling())
+            self.assertEqual(counter.distribution(), self.expected(path))
+            self.assertEqual(counter.bytes_read, os.path.getsize(path))
+
+    def test_spill(self):
+        """Sparse ids are counted through the partition files"""
+        rnd = random.Random(2)
+        path = self.random_file("sparse.txt", 300, 10 ** 12, rnd)
+        spill_dir = os.path.join(self.directory, "spill")
+        os.mkdir(spill_dir)
+        counter = chunked_degrees.count_in_degrees(
+            path, block_bytes=256, max_dense_id=1000, spill_dir=spill_dir,
+            num_partitions=7)
+        self.assertTrue(counter.is_spilling())
+        self.assertEqual(counter.distribution(), self.expected(path))
+        counter.close()
+        self.assertEqual(os.listdir(spill_dir), [])
+
+    def test_switch_to_spill(self):
+        """Dense counts carry over when a large id shows up later"""
+        path = self.write("mixed.txt", "0 1 2\n1 2\n5000 0 2\n2\n")
+        self.assertEqual(chunked_degrees.in_degree_distribution(
+            path, block_bytes=8, max_dense_id=100), self.expected(path))
+
+    def test_edge_pairs(self):
+        """Comma separated edge pairs count like adjacency lines"""
+        path = self.write("edges.csv", "1,2\n3,2\n2,1\n")
+        self.assertEqual(chunked_degrees.in_degree_distribution(path),
+                         {1: 1, 2: 1, 0: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the structure-of-arrays cluster store
+"""
+import random
+import unittest
+import numpy as np
+import cluster_table
+import clustering_alaysis
+import fixtures
+
+
+class ClusterTableTest(unittest.TestCase):
+    """ClusterTable agrees with lists of Cluster objects"""
+
+    def setUp(self):
+        self.data = cluster_table.random_data_table(60, 1)
+        self.table = cluster_table.ClusterTable.from_data_table(self.data)
+        self.clusters = fixtures.singletons(self.data)
+
+    def assert_same(self, table, clusters):
+        """Live rows of table equal clusters, exactly"""
+        converted = table.to_clusters()
+        self.assertEqual(len(table), len(clusters))
+        self.assertEqual(len(converted), len(clusters))
+        for mine, theirs in zip(converted, clusters):
+            self.assertEqual(mine.fips_codes(), theirs.fips_codes())
+            self.assertEqual(mine.horiz_center(), theirs.horiz_center())
+            self.assertEqual(mine.vert_center(), theirs.vert_center())
+            self.assertEqual(mine.total_population(), theirs.total_population())
+            self.assertEqual(mine.averaged_risk(), theirs.averaged_risk())
+
+    def test_round_trip(self):
+        """Tables from data and from clusters hold the same clusters"""
+        self.assert_same(self.table, self.clusters)
+        table = cluster_table.ClusterTable.from_clusters(self.clusters)
+        self.assert_same(table, self.clusters)
+        self.assertEqual(repr(table), "ClusterTable(60 clusters, 60 counties)")
+
+    def test_distance(self):
+        """Distances agree with Cluster.distance"""
+        for idx1, idx2 in [(0, 1), (5, 17), (30, 30)]:
+            self.assertAlmostEqual(
+                self.table.distance(idx1, idx2),
+                self.clusters[idx1].distance(self.clusters[idx2]))
+        dists = self.table.distances(3)
+        self.assertEqual(len(dists), 60)
+        for idx in range(60):
+            self.assertAlmostEqual(dists[idx],
+                                   self.clusters[3].distance(self.clusters[idx]))
+        self.assertTrue(np.allclose(self.table.distances(3, [4, 9]),
+                                    dists[[4, 9]]))
+
+    def test_sequential_merges(self):
+        """Random merges and errors agree with Cluster objects"""
+        rnd = random.Random(2)
+        clusters = dict(enumerate(self.clusters))
+        while len(clusters) > 5:
+            idx1, idx2 = rnd.sample(sorted(clusters), 2)
+            clusters[idx1].merge_clusters(clusters.pop(idx2))
+            self.table.merge_clusters(idx1, idx2)
+            self.assertFalse(self.table.is_live(idx2))
+        self.assertEqual(self.table.live_rows().tolist(), sorted(clusters))
+        expected = [clusters[row] for row in sorted(clusters)]
+        self.assert_same(self.table, expected)
+        self.assert_same(self.table.compact(), expected)
+        errors = self.table.cluster_error()
+        for row, cluster in clusters.items():
+            self.assertTrue(np.isclose(errors[row],
+                                       cluster.cluster_error(self.data)))
+            self.assertEqual(self.table.fips_codes(row), cluster.fips_codes())
+        self.assertAlmostEqual(
+            self.table.total_error() /
+            clustering_alaysis.compute_distortion(expected, self.data), 1.0)
+        self.assertAlmostEqual(self.table.compact().total_error(self.data) /
+                               self.table.total_error(), 1.0)
+
+    def test_vectorized_merges(self):
+        """Merging arrays of rows equals merging pairs one by one"""
+        other = cluster_table.ClusterTable.from_data_table(self.data)
+        self.table.merge_clusters(np.arange(0, 60, 2), np.arange(1, 60, 2))
+        for row in range(0, 60, 2):
+            other.merge_clusters(row, row + 1)
+        self.assertEqual(len(self.table), 30)
+        self.assert_same(self.table, other.to_clusters())
+        self.assertEqual(self.table.sizes()[::2].tolist(), [2] * 30)
+
+    def test_empty_and_dead_rows(self):
+        """Empty clusters keep their center, dead rows raise"""
+        table = cluster_table.ClusterTable([0.0, 3.0], [0.0, 4.0], [0, 0],
+                                           [0.0, 0.0])
+        # rows without counties merge without changing the center
+        table.merge_clusters(0, 1)
+        self.assertEqual(table.horiz_centers()[0], 0.0)
+        self.assertEqual(len(table), 1)
+        self.assertRaises(KeyError, table.merge_clusters, 0, 1)
+        self.assertRaises(ValueError, table.cluster_error)
+
+
+if __name__ == '__main__':
+    unittest.main()
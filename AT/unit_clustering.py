@@ -1,29 +1,177 @@
-import clustering
+"""
+Tests for closest pairs and hierarchical clustering
+"""
+import itertools
+import unittest
 import alg_cluster
-import imp
+import agglomerative
+import cluster_table
+import clustering
+import fixtures
+
+
+def empty_clusters(centers):
+    """Clusters without counties at (horiz, vert) centers"""
+    return [alg_cluster.Cluster(set([]), horiz, vert, 1, 0)
+            for horiz, vert in centers]
+
+
+def cluster_key(clusters):
+    """Sorted tuples of everything in a list of clusters"""
+    return sorted((sorted(cluster.fips_codes()), cluster.horiz_center(),
+                   cluster.vert_center(), cluster.total_population(),
+                   cluster.averaged_risk()) for cluster in clusters)
+
+
+def brute_merges(table, num_clusters):
+    """Merges of the pair smallest in (distance, row1, row2), one by one"""
+    res = []
+    while len(table) > num_clusters:
+        horiz = table.horiz_centers()
+        vert = table.vert_centers()
+        best = min(((vert[row1] - vert[row2]) ** 2 +
+                    (horiz[row1] - horiz[row2]) ** 2, row1, row2)
+                   for row1, row2 in itertools.combinations(
+                       table.live_rows().tolist(), 2))
+        table.merge_clusters(best[1], best[2])
+        res.append(best[1:])
+    return res
+
+
+class ClosestPairTest(unittest.TestCase):
+    """Closest pairs of the course examples"""
+
+    def test_closest_pair_strip(self):
+        """Only clusters inside the strip are paired"""
+        clusters = empty_clusters([(1.0, 1.0), (1.0, 5.0), (1.0, 4.0),
+                                   (1.0, 7.0)])
+        self.assertEqual(clustering.closest_pair_strip(clusters, 1.0, 3.0),
+                         (1.0, 1, 2))
+
+    def test_fast_closest_pair(self):
+        """Divide and conquer agrees with brute force on a line"""
+        clusters = empty_clusters([(0, 0), (1, 0), (2, 0), (3, 0)])
+        self.assertEqual(clustering.fast_closest_pair(clusters), (1.0, 0, 1))
+        self.assertEqual(clustering.slow_closest_pair(clusters), (1.0, 0, 1))
+
+
+class HierarchicalClusteringTest(unittest.TestCase):
+    """Cached nearest neighbours merge the same pairs as the slow loop"""
+
+    def test_course_example(self):
+        """Centers on a vertical line, the input list untouched"""
+        clusters = empty_clusters([(1.0, 1.0), (1.0, 5.0), (1.0, 4.0),
+                                   (1.0, 7.0)])
+        res = clustering.hierarchical_clustering(clusters, 2)
+        self.assertEqual(cluster_key(res), cluster_key(
+            clustering.slow_hierarchical_clustering(clusters, 2)))
+        self.assertEqual(len(clusters), 4)
+
+    def test_same_as_slow(self):
+        """Random counties give the clusters of the slow loop"""
+        for seed in range(3):
+            clusters = fixtures.singletons(cluster_table.random_data_table(150, seed))
+            for num_clusters in (1, 9, 149, 150):
+                self.assertEqual(
+                    cluster_key(clustering.hierarchical_clustering(
+                        clusters, num_clusters)),
+                    cluster_key(clustering.slow_hierarchical_clustering(
+                        clusters, num_clusters)))
+
+    def test_merge_distances(self):
+        """Merges go into the smaller row, the first at the closest pair"""
+        table = cluster_table.ClusterTable.from_data_table(
+            cluster_table.random_data_table(80, 4))
+        merges = list(agglomerative.iter_merges(table.compact(), 1))
+        self.assertEqual(len(merges), 79)
+        for row1, row2, dist in merges[:3]:
+            self.assertLess(row1, row2)
+        # the first merge is the closest pair of all
+        self.assertAlmostEqual(merges[0][2], min(
+            table.distances(row)[row + 1:].min() for row in range(79)))
+
+    def test_tied_distances(self):
+        """Ties go to the pair with the smallest rows, with or without the grid"""
+        # integer centers put many pairs at the same distance
+        old_min_rows = agglomerative.INDEX_MIN_ROWS
+        try:
+            for seed in range(4):
+                data = cluster_table.random_data_table(120, seed)
+                table = cluster_table.ClusterTable(
+                    [float(int(line[1]) % 12) for line in data],
+                    [float(int(line[2]) % 12) for line in data],
+                    [line[3] for line in data], [line[4] for line in data])
+                expected = brute_merges(table.compact(), 3)
+                for min_rows in (old_min_rows, 2):
+                    agglomerative.INDEX_MIN_ROWS = min_rows
+                    merges = agglomerative.iter_merges(table.compact(), 3)
+                    self.assertEqual([merge[:2] for merge in merges], expected)
+        finally:
+            agglomerative.INDEX_MIN_ROWS = old_min_rows
+
+    def test_initial_neighbours_with_ties(self):
+        """The sweep finds the nearest row, the smaller of equally near ones"""
+        # a grid has many pairs at the same distance
+        table = cluster_table.ClusterTable(
+            [float(idx % 7) for idx in range(49)],
+            [float(idx // 7) for idx in range(49)], [1] * 49, [0.0] * 49)
+        dists, nearest = agglomerative._initial_neighbours(
+            table.horiz_centers(), table.vert_centers(), table.live_rows())
+        for row in range(49):
+            row_dists = table.distances(row) ** 2
+            row_dists[row] = float("inf")
+            self.assertEqual(nearest[row], row_dists.argmin())
+            self.assertEqual(dists[row], row_dists.min())
+
+
+class DendrogramTest(unittest.TestCase):
+    """Cuts of one full run equal runs stopped at each number of clusters"""
 
-foo = imp.load_source('poc_simpletest', '../PoC/poc_simpletest.py')
-foo.TestSuite()
+    def setUp(self):
+        self.data = cluster_table.random_data_table(120, 5)
+        self.table = cluster_table.ClusterTable.from_data_table(self.data)
+        self.dendrogram = agglomerative.build_dendrogram(self.table)
 
+    def test_linkage(self):
+        """Every node is merged once, after the merges creating it"""
+        linkage = self.dendrogram.linkage()
+        self.assertEqual(linkage.shape, (119, 4))
+        self.assertEqual(len(self.table), 120)
+        self.assertEqual(linkage[-1, 3], 120)
+        # every node but the root is merged exactly once
+        children = sorted(linkage[:, :2].ravel().astype(int).tolist())
+        self.assertEqual(children, list(range(238)))
+        for merge, (child1, child2, _, size) in enumerate(linkage):
+            self.assertLess(max(child1, child2), 120 + merge)
 
-#                                   horiz_pos, vert_pos, population, risk
-print clustering.closest_pair_strip([alg_cluster.Cluster(set([]), 1.0, 1.0, 1, 0),
-                                     alg_cluster.Cluster(
-                                         set([]), 1.0, 5.0, 1, 0),
-                                     alg_cluster.Cluster(
-                                         set([]), 1.0, 4.0, 1, 0),
-                                     alg_cluster.Cluster(set([]), 1.0, 7.0, 1, 0)],
-                                    1.0, 3.0)
+    def test_cuts(self):
+        """Each cut holds the clusters and distortion of a run to that k"""
+        singleton_list = fixtures.singletons(self.data)
+        for num_clusters in (1, 2, 6, 20, 119, 120):
+            expected = clustering.hierarchical_clustering(singleton_list,
+                                                          num_clusters)
+            cut = self.dendrogram.cut(num_clusters)
+            self.assertEqual(cluster_key(cut.to_clusters()),
+                             cluster_key(expected))
+            self.assertAlmostEqual(
+                self.dendrogram.distortion(num_clusters) /
+                max(sum(cluster.cluster_error(self.data)
+                        for cluster in expected), 1.0),
+                1.0 if num_clusters < 120 else 0.0)
+        self.assertEqual(len(self.dendrogram.cut(500)), 120)
 
-# closest_pair_strip([alg_cluster.Cluster(set([]), 0, 0, 1, 0), alg_cluster.Cluster(set([]), 0, 1, 1, 0), alg_cluster.Cluster(set([]), 0, 2, 1, 0), alg_cluster.Cluster(set([]), 0, 3, 1, 0)], 0.0, 1.0) expected one of the tuples in set([(1.0, 2, 3), (1.0, 0, 1), (1.0, 1, 2)]) but received (1.0, 0, 0)
-# fast_closest_pair([alg_cluster.Cluster(set([]), 0, 0, 1, 0), alg_cluster.Cluster(set([]), 1, 0, 1, 0), alg_cluster.Cluster(set([]), 2, 0, 1, 0), alg_cluster.Cluster(set([]), 3, 0, 1, 0)]) expected one of the tuples in set([(1.0, 1, 2), (1.0, 0, 1), (1.0, 2, 3)]) but received (Exception: TypeError) "'tuple' object does not support item assignment" at line 71, in fast_closest_pair
-# print fast_closest_pair([alg_cluster.Cluster(set([]), 0, 0, 1, 0), alg_cluster.Cluster(set([]), 1, 0, 1, 0), alg_cluster.Cluster(set([]), 2, 0, 1, 0), alg_cluster.Cluster(set([]), 3, 0, 1, 0)])
+    def test_from_clusters(self):
+        """Trees built from clustered tables cut like the clustering"""
+        clusters = clustering.hierarchical_clustering(fixtures.singletons(self.data), 30)
+        dendrogram = agglomerative.build_dendrogram(
+            cluster_table.ClusterTable.from_clusters(clusters))
+        self.assertEqual(dendrogram.num_leaves(), 30)
+        self.assertEqual(
+            cluster_key(dendrogram.cut(7).to_clusters()),
+            cluster_key(clustering.hierarchical_clustering(clusters, 7)))
+        self.assertAlmostEqual(dendrogram.distortion(7, self.data) /
+                               self.dendrogram.distortion(7), 1.0)
 
-# print slow_closest_pair([alg_cluster.Cluster(set([]), 0, 0, 1, 0), alg_cluster.Cluster(set([]), 1, 0, 1, 0), alg_cluster.Cluster(set([]), 2, 0, 1, 0), alg_cluster.Cluster(set([]), 3, 0, 1, 0)])
 
-print clustering.hierarchical_clustering([alg_cluster.Cluster(set([]), 1.0, 1.0, 1, 0),
-                                          alg_cluster.Cluster(
-                                              set([]), 1.0, 5.0, 1, 0),
-                                          alg_cluster.Cluster(
-                                              set([]), 1.0, 4.0, 1, 0),
-                                          alg_cluster.Cluster(set([]), 1.0, 7.0, 1, 0)], 2)
+if __name__ == '__main__':
+    unittest.main()
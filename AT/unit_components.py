@@ -0,0 +1,46 @@
+"""
+Tests for one pass connected components labelling
+"""
+import unittest
+import components
+import graph_csr
+
+GRAPH3 = {0: set([]),
+          1: set([2]),
+          2: set([1]),
+          3: set([4]),
+          4: set([3])}
+
+
+class ComponentsTest(unittest.TestCase):
+    """Labels, sizes and the set based views"""
+
+    def test_labels_and_sizes(self):
+        """Every node gets the id of its component"""
+        labels, sizes = components.connected_components(GRAPH3)
+        self.assertEqual(list(labels), [0, 1, 1, 2, 2])
+        self.assertEqual(list(sizes), [1, 2, 2])
+
+    def test_present_mask(self):
+        """Masked out rows are skipped and labelled -1"""
+        present = bytearray([1, 1, 0, 1, 1])
+        labels, sizes = components.connected_components(GRAPH3, present)
+        self.assertEqual(list(labels), [0, 1, -1, 2, 2])
+        self.assertEqual(components.largest_component_size(GRAPH3, present), 2)
+
+    def test_component_sets(self):
+        """Sets of node names, also for labelled CSR graphs"""
+        graph = {"x": set(["y"]), "y": set(["x"]), "z": set()}
+        self.assertEqual(sorted(map(sorted, components.component_sets(graph))),
+                         [["x", "y"], ["z"]])
+        csr = graph_csr.from_dict_graph(GRAPH3)
+        self.assertEqual(len(components.component_sets(csr)), 3)
+
+    def test_empty(self):
+        """Empty graphs have no components"""
+        self.assertEqual(components.component_sets({}), [])
+        self.assertEqual(components.largest_component_size({}), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
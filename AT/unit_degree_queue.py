@@ -0,0 +1,84 @@
+"""
+Tests for the degree bucket queue and targeted attack orders
+"""
+import random
+import unittest
+import degree_queue
+import resilience
+
+GRAPH2 = {1: set([2, 4, 6, 8]),
+          2: set([1, 3, 5, 7]),
+          3: set([2, 4, 6, 8]),
+          4: set([1, 3, 5, 7]),
+          5: set([2, 4, 6, 8]),
+          6: set([1, 3, 5, 7]),
+          7: set([2, 4, 6, 8]),
+          8: set([1, 3, 5, 7])}
+
+
+def is_targeted(ugraph, order):
+    """Every node has maximal degree when it is removed"""
+    graph = dict((node, set(neighbors)) for node, neighbors in ugraph.items())
+    for node in order:
+        if len(graph[node]) != max(len(nbrs) for nbrs in graph.values()):
+            return False
+        for neighbor in graph.pop(node):
+            graph[neighbor].remove(node)
+    return not graph
+
+
+class DegreeBucketQueueTest(unittest.TestCase):
+    """Bucket bookkeeping and tie policies"""
+
+    def test_policies(self):
+        """fifo pops the earliest entry of the top bucket, lifo the latest"""
+        fifo = degree_queue.DegreeBucketQueue([2, 0, 2, 1], "fifo")
+        lifo = degree_queue.DegreeBucketQueue([2, 0, 2, 1], "lifo")
+        self.assertEqual([fifo.pop_max() for _ in range(4)], [0, 2, 3, 1])
+        self.assertEqual([lifo.pop_max() for _ in range(4)], [2, 0, 3, 1])
+        self.assertRaises(IndexError, fifo.pop_max)
+
+    def test_decrement(self):
+        """Decremented rows move down a bucket"""
+        queue = degree_queue.DegreeBucketQueue([3, 3, 1])
+        queue.decrement(1)
+        queue.decrement(1)
+        self.assertEqual(queue.degree(1), 1)
+        self.assertEqual(queue.pop_max(), 0)
+        self.assertEqual(queue.pop_max(), 1)
+
+    def test_bad_policy(self):
+        """Unknown policies are rejected"""
+        self.assertRaises(ValueError, degree_queue.DegreeBucketQueue,
+                          [1], "random")
+
+
+class TargetOrderTest(unittest.TestCase):
+    """Attack orders remove a node of maximal remaining degree each step"""
+
+    def test_random_graphs(self):
+        """Orders are targeted, complete and leave the input alone"""
+        rnd = random.Random(7)
+        for _ in range(20):
+            graph = dict((node, set()) for node in range(30))
+            for _ in range(rnd.randrange(80)):
+                node1, node2 = rnd.randrange(30), rnd.randrange(30)
+                if node1 != node2:
+                    graph[node1].add(node2)
+                    graph[node2].add(node1)
+            edges = sum(len(nbrs) for nbrs in graph.values())
+            for policy in degree_queue.TIE_POLICIES:
+                order = degree_queue.target_order(graph, policy)
+                self.assertEqual(sorted(order), sorted(graph))
+                self.assertTrue(is_targeted(graph, order))
+            self.assertEqual(sum(len(nbrs) for nbrs in graph.values()), edges)
+
+    def test_streaming_resilience(self):
+        """The generator feeds compute_resilience without a list"""
+        order = degree_queue.iter_target_order(GRAPH2, "fifo")
+        self.assertEqual(resilience.compute_resilience(GRAPH2, order),
+                         [8, 7, 6, 5, 1, 1, 1, 1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
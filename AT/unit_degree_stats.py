@@ -0,0 +1,62 @@
+"""
+Tests for single pass degree statistics
+"""
+import os
+import tempfile
+import unittest
+import degree_stats
+
+EX_GRAPH1 = {0: set([1, 4, 5]), 1: set([2, 6]), 2: set([3]),
+             3: set([0]), 4: set([1]), 5: set([2]), 6: set([])}
+
+
+class DegreeStatsTest(unittest.TestCase):
+    """Distributions and summaries match direct counting"""
+
+    def test_distributions(self):
+        """Same answers as in_degree_distribution / out_degree_distribution"""
+        stats = degree_stats.graph_degree_stats(EX_GRAPH1)
+        self.assertEqual(stats.distribution("in"), {1: 5, 2: 2})
+        self.assertEqual(stats.distribution("out"), {0: 1, 1: 4, 2: 1, 3: 1})
+        self.assertEqual(stats.max_degree("out"), 3)
+        self.assertAlmostEqual(stats.mean("in"), 9 / 7.0)
+        self.assertAlmostEqual(stats.variance("in"),
+                               (5 + 2 * 4) / 7.0 - (9 / 7.0) ** 2)
+
+    def test_ccdf(self):
+        """CCDF starts at the fraction of nodes with degree >= 1"""
+        graph = dict((node, set(range(node))) for node in range(30))
+        ccdf = degree_stats.graph_degree_stats(graph).ccdf("out", 5)
+        degrees = [degree for degree, _ in ccdf]
+        self.assertEqual(degrees[:4], [1, 2, 3, 6])
+        self.assertEqual(ccdf[0], (1, 29 / 30.0))
+        self.assertEqual(degrees, sorted(set(degrees)))
+        self.assertTrue(degrees[-1] <= 29)
+
+    def test_stream_matches_graph(self):
+        """Streaming a file gives the same degrees as the graph"""
+        handle, path = tempfile.mkstemp()
+        with os.fdopen(handle, "w") as graph_file:
+            for node in sorted(EX_GRAPH1):
+                graph_file.write(" ".join(str(item) for item in
+                                          [node] + sorted(EX_GRAPH1[node])))
+                graph_file.write(" \n")
+        try:
+            stats = degree_stats.file_degree_stats(path)
+        finally:
+            os.remove(path)
+        graph_stats = degree_stats.graph_degree_stats(EX_GRAPH1)
+        for kind in ("in", "out"):
+            self.assertEqual(stats.distribution(kind),
+                             graph_stats.distribution(kind))
+
+    def test_empty(self):
+        """Empty graphs have empty statistics"""
+        stats = degree_stats.graph_degree_stats({})
+        self.assertEqual(stats.distribution(), {})
+        self.assertEqual(stats.ccdf(), [])
+        self.assertEqual(stats.mean(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
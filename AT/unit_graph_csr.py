@@ -0,0 +1,79 @@
+"""
+Tests for the CSR graph representation
+"""
+import copy
+import unittest
+import graph_csr
+
+GRAPH0 = {0: set([1]),
+          1: set([0, 2]),
+          2: set([1, 3]),
+          3: set([2])}
+
+SPARSE_GRAPH = {10: set([30, 20]),
+                20: set([10]),
+                30: set([10]),
+                "a": set([])}
+
+
+class CSRGraphTest(unittest.TestCase):
+    """Read API of CSRGraph mirrors dict-of-sets graphs"""
+
+    def test_dense_read_api(self):
+        """Dense graphs keep their node numbers as rows"""
+        csr = graph_csr.from_dict_graph(GRAPH0)
+        self.assertEqual(csr.labels(), None)
+        self.assertEqual(len(csr), 4)
+        self.assertEqual(sorted(csr), [0, 1, 2, 3])
+        self.assertEqual(list(csr[1]), [0, 2])
+        self.assertEqual(csr.num_entries(), 6)
+        self.assertTrue(3 in csr)
+        self.assertFalse(4 in csr)
+        self.assertRaises(KeyError, lambda: csr[4])
+
+    def test_sparse_read_api(self):
+        """Arbitrary hashable node names are kept as labels"""
+        csr = graph_csr.from_dict_graph(SPARSE_GRAPH)
+        self.assertEqual(sorted(csr[10]), [20, 30])
+        self.assertEqual(list(csr["a"]), [])
+        self.assertEqual(set(csr.keys()), set(SPARSE_GRAPH))
+        self.assertEqual(csr.degree(10), 2)
+
+    def test_degree_arrays(self):
+        """Degrees by row, in fixed width arrays"""
+        csr = graph_csr.from_dict_graph({0: set([1, 2]), 1: set([2]),
+                                         2: set()})
+        in_degree, out_degree = graph_csr.degree_arrays(csr)
+        self.assertEqual(list(in_degree), [0, 1, 2])
+        self.assertEqual(list(out_degree), [2, 1, 0])
+        self.assertEqual(graph_csr.int_typecode(2 ** 31 - 1), 'i')
+        self.assertEqual(graph_csr.int_typecode(2 ** 31), 'q')
+
+    def test_round_trip(self):
+        """Dict -> CSR -> dict is the identity"""
+        for graph in (GRAPH0, SPARSE_GRAPH, {}):
+            csr = graph_csr.from_dict_graph(graph)
+            self.assertEqual(graph_csr.to_dict_graph(csr), graph)
+
+    def test_deepcopy_is_mutable_dict(self):
+        """Deep copies can be mutated by destructive algorithms"""
+        csr = graph_csr.from_dict_graph(GRAPH0)
+        graph = copy.deepcopy(csr)
+        self.assertEqual(graph, GRAPH0)
+        graph.pop(0)
+        self.assertEqual(len(csr), 4)
+
+    def test_dangling_neighbor(self):
+        """Neighbours must be nodes of the graph"""
+        self.assertRaises(KeyError, graph_csr.from_dict_graph,
+                          {0: set([1])})
+
+    def test_smaller_than_dict(self):
+        """CSR buffers are much smaller than sets"""
+        graph = graph_csr._random_undirected_graph(2000, 10)
+        stats = graph_csr.compare_representations(graph, repeats=1)
+        self.assertTrue(stats["csr_bytes"] * 5 < stats["dict_bytes"])
+
+
+if __name__ == '__main__':
+    unittest.main()
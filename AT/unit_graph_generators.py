@@ -0,0 +1,142 @@
+"""
+Tests for the vectorized random graph generators
+"""
+import random
+import unittest
+import graph_csr
+import graph_generators as gg
+import dpa_trial
+import graph_degees_calc
+import upa_trial
+
+
+def is_symmetric(csr):
+    """Every adjacency entry has its reverse and there are no self-loops"""
+    graph = graph_csr.to_dict_graph(csr)
+    for node in graph:
+        for neighbor in graph[node]:
+            if neighbor == node or node not in graph[neighbor]:
+                return False
+    return True
+
+
+def trial_degrees(trial_class, num_nodes, num_edges, seed, undirected):
+    """Degrees of a graph made with a DPATrial or UPATrial"""
+    random.seed(seed)
+    trial = trial_class(num_edges)
+    degrees = [num_edges - 1] * num_edges + [0] * (num_nodes - num_edges)
+    for node in range(num_edges, num_nodes):
+        neighbors = trial.run_trial(num_edges)
+        for neighbor in neighbors:
+            degrees[neighbor] += 1
+        if undirected:
+            degrees[node] += len(neighbors)
+    return degrees
+
+
+def degree_summary(degree_lists, oldest):
+    """Mean degree and the share of degree held by the oldest nodes"""
+    total = sum(sum(degrees) for degrees in degree_lists)
+    return (float(total) / sum(len(degrees) for degrees in degree_lists),
+            float(sum(sum(degrees[:oldest]) for degrees in degree_lists)) /
+            total)
+
+
+class GeneratorTest(unittest.TestCase):
+    """Shape, reproducibility and edge counts of generated graphs"""
+
+    def test_csr_from_edges(self):
+        """Duplicates and self-loops are dropped, rows are sorted"""
+        csr = gg.csr_from_edges(4, [2, 0, 0, 1, 3], [0, 2, 2, 1, 0])
+        self.assertEqual(graph_csr.to_dict_graph(csr),
+                         {0: set([2]), 1: set(), 2: set([0]), 3: set([0])})
+        csr = gg.csr_from_edges(3, [0], [2], symmetric=True)
+        self.assertEqual(list(csr[2]), [0])
+        self.assertEqual(len(gg.csr_from_edges(0, [], [])), 0)
+
+    def test_er_extremes(self):
+        """p = 1 gives complete graphs and p = 0 empty ones"""
+        for directed in (False, True):
+            graph = graph_csr.to_dict_graph(gg.er_graph(7, 1.0, directed))
+            for node in graph:
+                self.assertEqual(graph[node], set(range(7)) - set([node]))
+            self.assertEqual(gg.er_graph(7, 0.0, directed).num_entries(), 0)
+
+    def test_er_edge_count(self):
+        """Edge count is close to its expectation"""
+        csr = gg.er_graph(2000, 0.01, seed=5)
+        expected = 2000 * 1999 / 2 * 0.01
+        self.assertTrue(is_symmetric(csr))
+        self.assertTrue(abs(csr.num_entries() / 2 - expected) < 5 * expected ** 0.5)
+        directed = gg.er_graph(2000, 0.01, directed=True, seed=5)
+        self.assertTrue(abs(directed.num_entries() - 2 * expected) <
+                        5 * (2 * expected) ** 0.5)
+
+    def test_make_random_graph(self):
+        """Edges, self-loops included, are missing with probability p ** 2"""
+        graph = graph_degees_calc.make_random_graph(300, 0.6, seed=3)
+        expected = 300 * 300 * (1 - 0.36)
+        num_edges = sum(len(neighbors) for neighbors in graph.values())
+        self.assertTrue(abs(num_edges - expected) < 5 * expected ** 0.5)
+        self.assertEqual(graph, graph_degees_calc.make_random_graph(300, 0.6,
+                                                                    seed=3))
+        self.assertEqual(graph_degees_calc.make_random_graph(3, 0.0),
+                         {0: set([0, 1, 2]), 1: set([0, 1, 2]),
+                          2: set([0, 1, 2])})
+
+    def test_seeded(self):
+        """Equal seeds give equal graphs"""
+        for make in (lambda: gg.er_graph(300, 0.05, seed=9),
+                     lambda: gg.upa_graph(300, 4, seed=9),
+                     lambda: gg.dpa_graph(300, 4, seed=9)):
+            self.assertEqual(graph_csr.to_dict_graph(make()),
+                             graph_csr.to_dict_graph(make()))
+
+    def test_preferential_graphs(self):
+        """New nodes only attach to older nodes, at most m of them"""
+        dpa = gg.dpa_graph(500, 5, seed=1)
+        upa = gg.upa_graph(500, 5, seed=1)
+        self.assertTrue(is_symmetric(upa))
+        for node in range(5, 500):
+            self.assertTrue(0 < dpa.degree(node) <= 5)
+            self.assertTrue(max(dpa[node]) < node)
+            older = [nbr for nbr in upa[node] if nbr < node]
+            self.assertTrue(0 < len(older) <= 5)
+        self.assertEqual(graph_csr.to_dict_graph(gg.dpa_graph(3, 3)),
+                         {0: set([1, 2]), 1: set([0, 2]), 2: set([0, 1])})
+
+    def test_preferential_bias(self):
+        """Old nodes collect far more links than young ones"""
+        dpa = gg.dpa_graph(20000, 5, seed=2)
+        in_degree = [0] * 20000
+        for target in dpa.targets():
+            in_degree[target] += 1
+        self.assertTrue(sum(in_degree[:100]) > 10 * sum(in_degree[-100:]))
+
+    def test_same_distribution_as_trials(self):
+        """Degrees are distributed as with DPATrial and UPATrial"""
+        num_nodes, num_edges, seeds = 3000, 10, range(6)
+        for trial_class, make, undirected in (
+                (dpa_trial.DPATrial, gg.dpa_graph, False),
+                (upa_trial.UPATrial, gg.upa_graph, True)):
+            expected = degree_summary(
+                [trial_degrees(trial_class, num_nodes, num_edges, seed,
+                               undirected) for seed in seeds], 50)
+            graphs = [make(num_nodes, num_edges, seed=seed) for seed in seeds]
+            if undirected:
+                degree_lists = [[graph.degree(node) for node in range(num_nodes)]
+                                for graph in graphs]
+            else:
+                degree_lists = []
+                for graph in graphs:
+                    in_degree = [0] * num_nodes
+                    for target in graph.targets():
+                        in_degree[target] += 1
+                    degree_lists.append(in_degree)
+            res = degree_summary(degree_lists, 50)
+            self.assertAlmostEqual(res[0] / expected[0], 1.0, delta=0.02)
+            self.assertAlmostEqual(res[1] / expected[1], 1.0, delta=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the shared adjacency list loader
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import graph_csr
+import graph_io
+import graph_snapshot
+
+
+class LoadGraphTest(unittest.TestCase):
+    """Parsing, caching and dict conversion of adjacency list files"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        """Write text to a file in the scratch directory"""
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as graph_file:
+            graph_file.write(text)
+        return path
+
+    def test_dense(self):
+        """Nodes 0..n-1 in order keep no labels"""
+        path = self.write("dense.txt", "0 1 2 \n1 0 \n2 0 \n")
+        graph = graph_io.load_graph(path)
+        self.assertEqual(graph.labels(), None)
+        self.assertEqual(graph_csr.to_dict_graph(graph),
+                         {0: set([1, 2]), 1: set([0]), 2: set([0])})
+
+    def test_sparse_and_dangling(self):
+        """Sparse ids are labelled and dangling targets become nodes"""
+        path = self.write("sparse.txt", "100 7 300\n300\n")
+        graph = graph_io.load_graph(path, as_dict=True)
+        self.assertEqual(graph, {100: set([7, 300]), 300: set(), 7: set()})
+
+    def test_repeated_heads(self):
+        """Lines with the same head merge into one node"""
+        path = self.write("pairs.txt", "1 2\n1 3\n2 1\n3 1\n")
+        graph = graph_io.load_graph(path)
+        self.assertEqual(list(graph.labels()), [1, 2, 3])
+        self.assertEqual(graph_csr.to_dict_graph(graph),
+                         {1: set([2, 3]), 2: set([1]), 3: set([1])})
+        path = self.write("dense_pairs.txt", "0 1\n1 0\n0 2\n2 0\n")
+        self.assertEqual(graph_io.load_graph(path, as_dict=True),
+                         {0: set([1, 2]), 1: set([0]), 2: set([0])})
+
+    def test_empty_file(self):
+        """Empty files load as empty graphs"""
+        path = self.write("empty.txt", "")
+        self.assertEqual(len(graph_io.load_graph(path)), 0)
+
+    def test_cache_round_trip(self):
+        """The snapshot cache reproduces the parsed graph"""
+        path = self.write("sparse.txt", "5 6\n6 5 9\n9 6\n")
+        cache_path = os.path.join(self.directory, "sparse.csr")
+        parsed = graph_io.load_graph(path, cache_path=cache_path)
+        self.assertTrue(os.path.exists(cache_path))
+        cached = graph_snapshot.read_snapshot(cache_path).graph
+        self.assertEqual(graph_csr.to_dict_graph(cached),
+                         graph_csr.to_dict_graph(parsed))
+        self.assertEqual(graph_io.load_graph(path, cache_path=cache_path,
+                                             as_dict=True),
+                         {5: set([6]), 6: set([5, 9]), 9: set([6])})
+
+
+if __name__ == '__main__':
+    unittest.main()
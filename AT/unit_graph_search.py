@@ -0,0 +1,69 @@
+"""
+Tests for the graph_search library functions and their imports
+"""
+import subprocess
+import sys
+import unittest
+import graph_csr
+import graph_degees_calc
+import graph_experiments
+import graph_search
+import order_of_attack
+
+
+def bfs_resilience(ugraph, attack_order):
+    """Largest component sizes by a BFS after every removal, on a copy"""
+    graph = graph_search.copy_graph(ugraph)
+    res = [graph_search.largest_cc_size(graph)]
+    for node in attack_order:
+        graph_search.delete_node(graph, node)
+        res.append(graph_search.largest_cc_size(graph))
+    return res
+
+
+class ImportTest(unittest.TestCase):
+    """Importing the library modules does no work"""
+
+    def test_silent_imports(self):
+        """No output, no matplotlib"""
+        for module in graph_experiments.LIBRARY_MODULES:
+            code = ("import sys, %s; "
+                    "assert 'matplotlib' not in sys.modules" % module)
+            output = subprocess.check_output([sys.executable, "-c", code])
+            self.assertEqual(output, b"")
+
+
+class CSRCompatibilityTest(unittest.TestCase):
+    """Read-only routines run unchanged on CSR graphs"""
+
+    def test_read_only_routines(self):
+        """Same answers on dict and CSR forms"""
+        graph = graph_degees_calc.make_upa_graph(200, 3)
+        csr = graph_csr.from_dict_graph(graph)
+        self.assertEqual(graph_search.bfs_visited(csr, 0),
+                         graph_search.bfs_visited(graph, 0))
+        self.assertEqual(graph_degees_calc.compute_in_degrees(csr),
+                         graph_degees_calc.compute_in_degrees(graph))
+        self.assertEqual(graph_degees_calc.edge_count(csr),
+                         graph_degees_calc.edge_count(graph))
+        self.assertEqual(graph_search.fast_target_order(csr),
+                         graph_search.fast_target_order(graph))
+
+    def test_resilience(self):
+        """Attack curves equal the BFS recount after every removal"""
+        path = {0: set([1]), 1: set([0, 2]), 2: set([1, 3]), 3: set([2]),
+                4: set([5]), 5: set([4])}
+        self.assertEqual(graph_search.compute_resilience(path, [1, 4, 2]),
+                         [4, 2, 2, 1])
+        graph = graph_degees_calc.make_random_graph_undir(150, 0.03, seed=4)
+        for order in (order_of_attack.fast_target_order(graph),
+                      order_of_attack.targeted_order(graph),
+                      graph_search.random_order(graph)):
+            self.assertEqual(graph_search.compute_resilience(graph, order),
+                             bfs_resilience(graph, order))
+        self.assertEqual(len(graph_search.cc_visited(graph)),
+                         len(graph_search.cc_visited(graph_csr.as_csr(graph))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for the binary graph snapshot format
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import degree_stats
+import graph_csr
+import graph_degees_calc
+import graph_snapshot
+
+
+class SnapshotTest(unittest.TestCase):
+    """Snapshots round trip through both readers"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        """Path of a file in the temporary directory"""
+        return os.path.join(self.directory, name)
+
+    def test_round_trip(self):
+        """Dense, labelled and empty graphs come back unchanged"""
+        graphs = [graph_degees_calc.EX_GRAPH2, {},
+                  {100: set([7, 300]), 300: set([100]), 7: set()}]
+        for graph in graphs:
+            path = self.path("graph.csrs")
+            graph_snapshot.write_snapshot(graph, path)
+            for reader in (graph_snapshot.map_snapshot,
+                           graph_snapshot.read_snapshot):
+                snapshot = reader(path)
+                self.assertEqual(graph_csr.to_dict_graph(snapshot.graph), graph)
+                self.assertIsNone(snapshot.in_degree)
+
+    def test_degrees(self):
+        """Saved degree arrays match the degree statistics"""
+        graph = graph_degees_calc.EX_GRAPH2
+        path = self.path("degrees.csrs")
+        graph_snapshot.write_snapshot(graph, path, degrees=True)
+        snapshot = graph_snapshot.map_snapshot(path)
+        self.assertEqual(list(snapshot.in_degree),
+                         [graph_degees_calc.compute_in_degrees(graph)[node]
+                          for node in range(len(graph))])
+        self.assertEqual(list(snapshot.out_degree),
+                         [len(graph[node]) for node in range(len(graph))])
+        self.assertEqual(degree_stats.snapshot_degree_stats(path).distribution(),
+                         graph_degees_calc.in_degree_distribution(graph))
+
+    def test_zero_copy(self):
+        """Mapped arrays are views of the file, not copies"""
+        path = self.path("mapped.csrs")
+        graph_snapshot.write_snapshot(graph_degees_calc.EX_GRAPH1, path)
+        graph = graph_snapshot.map_snapshot(path).graph
+        self.assertIsInstance(graph.targets(), memoryview)
+        self.assertTrue(graph.targets().readonly)
+
+    def test_bad_files(self):
+        """Foreign files, future versions and text labels are rejected"""
+        path = self.path("bad.csrs")
+        with open(path, "wb") as bad_file:
+            bad_file.write(b"\0" * graph_snapshot.SNAPSHOT_HEADER.size)
+        self.assertRaises(ValueError, graph_snapshot.map_snapshot, path)
+        with open(path, "wb") as bad_file:
+            bad_file.write(graph_snapshot.SNAPSHOT_HEADER.pack(
+                graph_snapshot.SNAPSHOT_MAGIC, 99, 0, 0, 0, 4, 4, 8, 4))
+        self.assertRaises(ValueError, graph_snapshot.read_snapshot, path)
+        self.assertRaises(TypeError, graph_snapshot.write_snapshot,
+                          {"a": set()}, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for bulk graph validation and symmetrization
+"""
+import unittest
+import graph_csr
+import graph_degees_calc
+import graph_validation as gv
+
+
+class ValidateTest(unittest.TestCase):
+    """Problem counts match the definition of a valid undirected graph"""
+
+    def test_valid_graphs(self):
+        """Example graphs and their CSR forms are valid"""
+        for graph in (graph_degees_calc.EX_GRAPH0, {}, {0: set()},
+                      {"a": set(["b"]), "b": set(["a"])}):
+            undirected = dict((node, set(graph[node])) for node in graph)
+            for node in graph:
+                for neighbor in graph[node]:
+                    undirected[neighbor].add(node)
+            self.assertTrue(gv.validate_graph(undirected).is_valid())
+            self.assertTrue(gv.validate_graph(
+                graph_csr.from_dict_graph(undirected)).is_valid())
+
+    def test_counts(self):
+        """Every kind of problem is counted, not just the first"""
+        graph = {0: set([0, 1, 2]), 1: set([0, 7]), 2: set(), 3: set([1, 9])}
+        report = gv.validate_graph(graph)
+        self.assertEqual(report, gv.ValidationReport(
+            num_nodes=4, num_entries=7, self_loops=1, dangling=2,
+            duplicates=0, missing_reverse=2))
+        self.assertFalse(report.is_valid())
+        self.assertFalse(graph_degees_calc.is_undirected_graph_valid(graph))
+
+    def test_duplicates(self):
+        """Repeated CSR entries count as duplicates"""
+        report = gv.validate_edges(2, [0, 0, 1], [1, 1, 0])
+        self.assertEqual((report.duplicates, report.missing_reverse), (1, 0))
+
+
+class SymmetrizeTest(unittest.TestCase):
+    """Repaired graphs are valid and keep every good edge"""
+
+    def test_repair(self):
+        """Dangling targets and loops go, reverse edges are added"""
+        graph = {"a": set(["a", "b", "x"]), "b": set(), "c": set(["b"])}
+        report, csr = gv.validate_graph(graph, repair=True)
+        self.assertEqual((report.dangling, report.self_loops,
+                          report.missing_reverse), (1, 1, 2))
+        self.assertEqual(graph_csr.to_dict_graph(csr),
+                         {"a": set(["b"]), "b": set(["a", "c"]),
+                          "c": set(["b"])})
+        self.assertTrue(gv.validate_graph(csr).is_valid())
+
+    def test_dense_csr(self):
+        """Dense graphs stay unlabelled"""
+        csr = gv.symmetrize_graph(graph_degees_calc.EX_GRAPH1)
+        self.assertIsNone(csr.labels())
+        self.assertTrue(gv.validate_graph(csr).is_valid())
+        self.assertEqual(csr.num_entries(), 2 * 9)
+
+    def test_unordered_dense(self):
+        """Dense dicts filled out of order keep their node ids"""
+        csr = gv.symmetrize_graph({2: set([0]), 0: set([2]), 1: set()})
+        self.assertEqual(graph_csr.to_dict_graph(csr),
+                         {0: set([2]), 1: set(), 2: set([0])})
+        report, csr = gv.validate_graph({1: set([0]), 0: set([1, 2]),
+                                         2: set()}, repair=True)
+        self.assertEqual(report.missing_reverse, 1)
+        self.assertEqual(graph_csr.to_dict_graph(csr),
+                         {0: set([1, 2]), 1: set([0]), 2: set([0])})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for vectorized k-means
+"""
+import unittest
+import numpy as np
+import alg_cluster
+import cluster_table
+import clustering
+import fixtures
+import kmeans
+
+
+def cluster_key(clusters):
+    """Tuples of everything in a list of clusters, in order"""
+    return [(sorted(cluster.fips_codes()), cluster.horiz_center(),
+             cluster.vert_center(), cluster.total_population(),
+             cluster.averaged_risk()) for cluster in clusters]
+
+
+class AssignTest(unittest.TestCase):
+    """Nearest centers, first of ties, whatever the chunk size"""
+
+    def test_assign(self):
+        """Equally near centers go to the first, for any chunk size"""
+        horiz = np.array([0.0, 1.0, 2.0, 3.0, 10.0])
+        vert = np.zeros(5)
+        centers = (np.array([0.0, 2.0, 2.0]), np.array([0.0, 0.0, 0.0]))
+        for chunk in (1, 4, 1000):
+            self.assertEqual(
+                kmeans.assign(horiz, vert, centers[0], centers[1],
+                              chunk).tolist(), [0, 0, 1, 1, 1])
+
+
+class KMeansTest(unittest.TestCase):
+    """kmeans_table gives the clusters of the sequential loop"""
+
+    def setUp(self):
+        self.data = cluster_table.random_data_table(400, 7)
+        self.table = cluster_table.ClusterTable.from_data_table(self.data)
+        self.clusters = fixtures.singletons(self.data)
+
+    def test_same_as_slow(self):
+        """Clusters equal the sequential loop for a fixed iteration count"""
+        for num_clusters, num_iterations in ((1, 1), (9, 5), (25, 12)):
+            expected = clustering.slow_kmeans_clustering(
+                self.clusters, num_clusters, num_iterations)
+            res = kmeans.kmeans_table(self.table, num_clusters, num_iterations,
+                                      tolerance=None, stop_when_stable=False,
+                                      chunk_elements=1000)
+            self.assertEqual(res.iterations, num_iterations)
+            self.assertEqual(cluster_key(res.clusters.to_clusters()),
+                             cluster_key(expected))
+            self.assertEqual(cluster_key(clustering.kmeans_clustering(
+                self.clusters, num_clusters, num_iterations)),
+                             cluster_key(expected))
+
+    def test_early_stop(self):
+        """Runs stop at a fixed point, or sooner with a tolerance"""
+        res = kmeans.kmeans_table(self.table, 6, 500)
+        self.assertLess(res.iterations, 500)
+        # stopping at a fixed point changes nothing
+        self.assertEqual(
+            cluster_key(res.clusters.to_clusters()),
+            cluster_key(clustering.slow_kmeans_clustering(self.clusters, 6,
+                                                          res.iterations + 3)))
+        loose = kmeans.kmeans_table(self.table, 6, 500, tolerance=50.0,
+                                    stop_when_stable=False)
+        self.assertLessEqual(loose.iterations, res.iterations)
+
+    def test_assignment_and_error(self):
+        """Every row is assigned to the cluster holding its county"""
+        res = kmeans.kmeans_table(self.table, 8, 5)
+        clusters = res.clusters.to_clusters()
+        self.assertEqual(len(res.assignment), 400)
+        for row in (0, 17, 399):
+            self.assertIn(self.data[row][0],
+                          clusters[res.assignment[row]].fips_codes())
+        self.assertAlmostEqual(
+            res.clusters.total_error() /
+            sum(cluster.cluster_error(self.data) for cluster in clusters), 1.0)
+
+    def test_mean_update(self):
+        """Plain means are close to the exact update"""
+        exact = kmeans.kmeans_table(self.table, 8, 5)
+        mean = kmeans.kmeans_table(self.table, 8, 5, exact=False)
+        self.assertTrue(np.allclose(exact.clusters.horiz_centers(),
+                                    mean.clusters.horiz_centers()))
+        self.assertTrue(np.allclose(exact.clusters.risks(),
+                                    mean.clusters.risks()))
+        self.assertEqual(exact.clusters.populations().tolist(),
+                         mean.clusters.populations().tolist())
+
+    def test_empty_clusters(self):
+        """Empty clusters never move centers, zero iterations raise"""
+        # clusters without counties are never merged into centers
+        clusters = [alg_cluster.Cluster(set([]), 0.0, 0.0, 1, 0),
+                    alg_cluster.Cluster(set(["a"]), 1.0, 0.0, 2, 0.5),
+                    alg_cluster.Cluster(set(["b"]), 9.0, 0.0, 3, 0.25)]
+        self.assertEqual(
+            cluster_key(clustering.kmeans_clustering(clusters, 2, 3)),
+            cluster_key(clustering.slow_kmeans_clustering(clusters, 2, 3)))
+        self.assertRaises(ValueError, kmeans.kmeans_table, self.table, 2, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for the node id interning layer
+"""
+import unittest
+from array import array
+import numpy as np
+import graph_csr
+import graph_generators
+from node_interner import NodeInterner
+
+
+class NodeInternerTest(unittest.TestCase):
+    """Rows are handed out densely and map back to the ids"""
+
+    def test_intern(self):
+        """Rows follow first appearance, repeats keep their row"""
+        interner = NodeInterner()
+        self.assertEqual([interner.intern(node) for node in
+                          (2 ** 62, 5, 2 ** 62, 17)], [0, 1, 0, 2])
+        self.assertEqual(list(interner), [2 ** 62, 5, 17])
+        self.assertIsInstance(interner.labels(), array)
+        self.assertEqual(interner.row(17), 2)
+        self.assertEqual(interner.label(1), 5)
+        self.assertRaises(KeyError, interner.row, 6)
+        self.assertNotIn("5", interner)
+
+    def test_sorted_ids_need_no_dict(self):
+        """Ascending ids are found by binary search until out of order"""
+        interner = NodeInterner(array("q", [3, 10 ** 12, 10 ** 15]))
+        self.assertEqual(interner.row(10 ** 12), 1)
+        self.assertEqual(interner.intern(10 ** 16), 3)
+        self.assertFalse(interner._index)
+        self.assertEqual(interner.intern(4), 4)
+        self.assertEqual(interner.row(10 ** 16), 3)
+        self.assertEqual(interner.row(4), 4)
+
+    def test_other_names(self):
+        """Non-integer and huge ids widen the reverse map to a list"""
+        interner = NodeInterner()
+        interner.intern(1)
+        self.assertEqual(interner.intern("a"), 1)
+        self.assertEqual(interner.intern(2 ** 70), 2)
+        self.assertEqual(list(interner), [1, "a", 2 ** 70])
+        self.assertEqual(interner.row("a"), 1)
+
+    def test_mapped_labels(self):
+        """Read-only memoryviews are used in place and copied on append"""
+        labels = memoryview(array("q", [4, 2, 9]))
+        interner = NodeInterner(labels)
+        self.assertIs(interner.labels(), labels)
+        self.assertEqual(interner.row(9), 2)
+        self.assertEqual(interner.intern(1), 3)
+        self.assertEqual(list(interner), [4, 2, 9, 1])
+
+    def test_identity(self):
+        """Dense ids are recognised"""
+        self.assertTrue(NodeInterner(array("q", [0, 1, 2])).is_identity())
+        self.assertFalse(NodeInterner(array("q", [0, 2])).is_identity())
+
+
+class InternedGraphTest(unittest.TestCase):
+    """Graphs built from sparse ids keep compact labels"""
+
+    def test_labeled_edges(self):
+        """Sparse 64-bit ids become rows in sorted order"""
+        csr = graph_generators.csr_from_labeled_edges(
+            [2 ** 40, 7, 2 ** 40], [7, 3, 3], symmetric=True)
+        self.assertEqual(list(csr), [3, 7, 2 ** 40])
+        self.assertEqual(graph_csr.to_dict_graph(csr),
+                         {3: set([7, 2 ** 40]), 7: set([3, 2 ** 40]),
+                          2 ** 40: set([3, 7])})
+        self.assertIsInstance(csr.interner(), NodeInterner)
+
+    def test_dict_graph(self):
+        """from_dict_graph interns non-dense keys"""
+        csr = graph_csr.from_dict_graph({10: set([20]), 20: set([10])})
+        self.assertEqual(list(csr.interner()), [10, 20])
+        self.assertEqual(list(csr[20]), [10])
+
+    def test_numpy_integer_keys(self):
+        """NumPy integers find nodes wherever plain ints do"""
+        labeled = graph_generators.csr_from_labeled_edges(
+            [10 ** 12, 5], [7, 10 ** 12], symmetric=True)
+        self.assertEqual(labeled[np.int64(7)], [10 ** 12])
+        self.assertIn(np.int32(5), labeled)
+        self.assertNotIn(np.int64(6), labeled)
+        self.assertNotIn(7.5, labeled)
+        dense = graph_csr.from_dict_graph({0: set([1]), 1: set([0]), 2: set()})
+        self.assertEqual(list(dense[np.int64(1)]), [0])
+        self.assertEqual(dense.degree(np.uint8(2)), 0)
+        self.assertRaises(KeyError, dense.row, np.int64(3))
+        self.assertRaises(KeyError, dense.row, "1")
+        interner = NodeInterner()
+        for node in ("a", 3):
+            interner.intern(node)
+        self.assertEqual(interner.get(np.int64(3)), 1)
+        self.assertEqual(interner.intern(np.int64(9)), 2)
+        self.assertIs(type(interner.label(2)), int)
+
+
+if __name__ == '__main__':
+    unittest.main()
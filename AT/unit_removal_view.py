@@ -0,0 +1,97 @@
+"""
+Tests for removal views over immutable graphs
+"""
+import random
+import unittest
+import degree_queue
+import fixtures
+import graph_csr
+import graph_search
+import order_of_attack
+import removal_view
+import resilience
+
+
+def copying_targeted_order(ugraph):
+    """targeted_order as it was written against a copied dict graph"""
+    new_graph = order_of_attack.copy_graph(ugraph)
+    order = []
+    while new_graph:
+        max_degree = -1
+        for node in new_graph:
+            if len(new_graph[node]) > max_degree:
+                max_degree = len(new_graph[node])
+                max_degree_node = node
+        order_of_attack.delete_node(new_graph, max_degree_node)
+        order.append(max_degree_node)
+    return order
+
+
+class RemovalViewTest(unittest.TestCase):
+    """Views behave like deleting from a copy, without touching the base"""
+
+    def test_delete_node(self):
+        """Live neighbours and degrees follow deletions"""
+        rnd = random.Random(1)
+        graph = fixtures.random_graph(30, 0.2, rnd)
+        base = graph_csr.from_dict_graph(graph)
+        view = removal_view.RemovalView(base)
+        expected = order_of_attack.copy_graph(graph)
+        for node in rnd.sample(range(30), 12):
+            graph_search.delete_node(view, node)
+            order_of_attack.delete_node(expected, node)
+            self.assertEqual(dict((key, set(nbrs)) for key, nbrs in view.items()),
+                             expected)
+            for key in expected:
+                self.assertEqual(view.degree(key), len(expected[key]))
+        self.assertEqual(len(view), 18)
+        self.assertEqual(graph_csr.to_dict_graph(base), graph)
+        self.assertRaises(KeyError, view.delete_node, node)
+
+    def test_independent_views(self):
+        """Views and their copies share the base but not deletions"""
+        view = removal_view.RemovalView({0: set([1]), 1: set([0]), 2: set()})
+        other = order_of_attack.copy_graph(view)
+        view.delete_node(0)
+        self.assertIs(other.base(), view.base())
+        self.assertEqual(list(view), [1, 2])
+        self.assertEqual(list(other), [0, 1, 2])
+        self.assertEqual(other.degree(1), 1)
+
+    def test_targeted_order(self):
+        """targeted_order matches the copying version and leaves input alone"""
+        rnd = random.Random(2)
+        for _ in range(10):
+            graph = fixtures.random_graph(40, rnd.random() * 0.2, rnd)
+            before = order_of_attack.copy_graph(graph)
+            self.assertEqual(order_of_attack.targeted_order(graph),
+                             copying_targeted_order(graph))
+            self.assertEqual(graph, before)
+        # ties go to the first node in dict order, not the lowest id
+        graph = {3: set([1]), 1: set([3, 2]), 2: set([1]), 0: set()}
+        self.assertEqual(order_of_attack.targeted_order(graph), [1, 3, 2, 0])
+        self.assertEqual(copying_targeted_order(graph), [1, 3, 2, 0])
+
+    def test_attacks_on_view(self):
+        """Attack orders and resilience start from the live nodes"""
+        rnd = random.Random(3)
+        graph = fixtures.random_graph(50, 0.08, rnd)
+        view = removal_view.RemovalView(graph)
+        expected = order_of_attack.copy_graph(graph)
+        for node in rnd.sample(range(50), 10):
+            view.delete_node(node)
+            order_of_attack.delete_node(expected, node)
+        order = degree_queue.target_order(view)
+        self.assertEqual(order_of_attack.targeted_order(view),
+                         order_of_attack.targeted_order(expected))
+        self.assertEqual(sorted(order), sorted(expected))
+        self.assertEqual(resilience.compute_resilience(view, order),
+                         resilience.compute_resilience(expected, order))
+        self.assertEqual(len(view), 40)
+        deleted = [node for node in graph if node not in view]
+        self.assertRaises(KeyError, resilience.compute_resilience,
+                          view, deleted[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
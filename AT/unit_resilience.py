@@ -0,0 +1,141 @@
+"""
+Tests for the union-find resilience engine
+"""
+import random
+import unittest
+from collections import deque
+import fixtures
+import graph_csr
+import resilience
+
+
+def naive_resilience(ugraph, attack_order):
+    """Delete nodes one by one and BFS every component after each step"""
+    graph = dict((node, set(neighbors)) for node, neighbors in ugraph.items())
+
+    def largest():
+        """Largest connected component of graph"""
+        seen = set()
+        best = 0
+        for start in graph:
+            if start in seen:
+                continue
+            seen.add(start)
+            queue = deque([start])
+            size = 0
+            while queue:
+                node = queue.popleft()
+                size += 1
+                for neighbor in graph[node]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        queue.append(neighbor)
+            best = max(best, size)
+        return best
+
+    res = [largest()]
+    for node in attack_order:
+        for neighbor in graph.pop(node):
+            graph[neighbor].discard(node)
+        res.append(largest())
+    return res
+
+
+class UnionFindTest(unittest.TestCase):
+    """Weighted union-find bookkeeping"""
+
+    def test_union_sizes(self):
+        """Set sizes add up on union and stay put on repeated union"""
+        sets = resilience.UnionFind(5)
+        self.assertEqual(sets.union(0, 1), 2)
+        self.assertEqual(sets.union(2, 3), 2)
+        self.assertEqual(sets.union(1, 3), 4)
+        self.assertEqual(sets.union(0, 2), 4)
+        self.assertEqual(sets.set_size(4), 1)
+        self.assertEqual(sets.find(0), sets.find(3))
+
+
+class ResilienceTest(unittest.TestCase):
+    """Resilience curves match deleting nodes and recounting"""
+
+    def test_matches_naive(self):
+        """Random graphs, random and degree ordered attacks"""
+        rnd = random.Random(3)
+        for _ in range(20):
+            graph = fixtures.random_graph(40, rnd.random() * 0.15, rnd)
+            order = list(graph)
+            rnd.shuffle(order)
+            order = order[:rnd.randrange(len(order) + 1)]
+            self.assertEqual(resilience.compute_resilience(graph, order),
+                             naive_resilience(graph, order))
+            order = sorted(graph, key=lambda node: -len(graph[node]))
+            self.assertEqual(resilience.compute_resilience(graph, order),
+                             naive_resilience(graph, order))
+
+    def test_csr_input_untouched(self):
+        """CSR graphs with labels work and inputs are not mutated"""
+        graph = {"a": set(["b"]), "b": set(["a", "c"]), "c": set(["b"]),
+                 "d": set()}
+        csr = graph_csr.from_dict_graph(graph)
+        self.assertEqual(resilience.compute_resilience(csr, ["b", "a"]),
+                         [3, 1, 1])
+        self.assertEqual(resilience.compute_resilience(graph, ["b", "a"]),
+                         [3, 1, 1])
+        self.assertEqual(len(graph["b"]), 2)
+
+    def test_bad_orders(self):
+        """Unknown and repeated nodes raise KeyError"""
+        graph = {0: set([1]), 1: set([0])}
+        self.assertRaises(KeyError, resilience.compute_resilience, graph, [2])
+        self.assertRaises(KeyError, resilience.compute_resilience,
+                          graph, [0, 0])
+
+    def test_empty(self):
+        """Empty graph has a single zero entry"""
+        self.assertEqual(resilience.compute_resilience({}, []), [0])
+
+
+class EstimateResilienceTest(unittest.TestCase):
+    """Sampled estimates at a schedule of removal fractions"""
+
+    def test_exact_when_budget_covers_graph(self):
+        """With a budget over the graph size the giant is found exactly"""
+        rnd = random.Random(5)
+        graph = fixtures.random_graph(150, 0.03, rnd)
+        order = sorted(graph, key=lambda node: -len(graph[node]))
+        exact = naive_resilience(graph, order)
+        estimates = resilience.compute_resilience(
+            graph, order, [0.5, 0, 1, 0.25], num_samples=400, budget=200,
+            seed=1)
+        self.assertEqual([est.removed for est in estimates], [0, 38, 75, 150])
+        for est in estimates:
+            self.assertEqual(est.size, exact[est.removed])
+            self.assertTrue(est.low <= est.size <= est.high)
+
+    def test_bounds_contain_exact(self):
+        """Budgeted estimates bracket the exact curve on a giant component"""
+        rnd = random.Random(7)
+        graph = fixtures.random_graph(600, 0.01, rnd)
+        order = list(graph)
+        rnd.shuffle(order)
+        exact = resilience.compute_resilience(graph, order)
+        for est in resilience.estimate_resilience(graph, order, [0, 0.2, 0.4],
+                                                  budget=50, seed=2):
+            self.assertTrue(est.low <= exact[est.removed] <= est.high)
+
+    def test_wilson_interval(self):
+        """Interval contains the proportion and tightens with trials"""
+        low, high = resilience.wilson_interval(30, 100)
+        self.assertTrue(low < 0.3 < high)
+        low2, high2 = resilience.wilson_interval(300, 1000)
+        self.assertTrue(high2 - low2 < high - low)
+        self.assertEqual(resilience.wilson_interval(0, 100)[0], 0.0)
+
+    def test_bad_fraction(self):
+        """Fractions outside [0, 1] raise ValueError"""
+        self.assertRaises(ValueError, resilience.estimate_resilience,
+                          {0: set()}, [0], [1.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
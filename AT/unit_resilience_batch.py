@@ -0,0 +1,84 @@
+"""
+Tests for the parallel resilience batch runner
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import graph_csr
+import graph_generators
+import resilience
+import resilience_batch as rb
+
+UPA_SPEC = ("upa", 300, 3, 1)
+ER_SPEC = ("er", 300, 0.01, 2)
+
+
+class AggregateTest(unittest.TestCase):
+    """Pointwise mean and percentiles"""
+
+    def test_aggregate(self):
+        """Percentiles interpolate between sorted values"""
+        res = rb.aggregate_curves([[4, 0], [2, 0], [0, 3]], (0, 50, 100))
+        self.assertEqual(res["runs"], 3)
+        self.assertEqual(res["mean"], [2.0, 1.0])
+        self.assertEqual(res[50], [2, 0])
+        self.assertEqual(res[100], [4, 3])
+
+
+class BatchTest(unittest.TestCase):
+    """Pool results match serial computations"""
+
+    def test_batch(self):
+        """Targeted curves are deterministic, random ones are seeded"""
+        jobs = rb.monte_carlo_jobs([UPA_SPEC, ER_SPEC],
+                                   ["random", "targeted"], 3)
+        results = list(rb.iter_resilience_curves(jobs, processes=2))
+        self.assertEqual(len(results), len(jobs))
+        for job, curve in results:
+            csr = rb.build_graph(job.graph, job.seed)
+            expected = resilience.compute_resilience(
+                csr, rb.attack_order(csr, job.strategy, job.seed))
+            self.assertEqual(curve, expected)
+
+        summary = rb.run_resilience_batch(jobs, processes=2)
+        targeted = summary[(UPA_SPEC, "targeted")]
+        self.assertEqual(targeted["runs"], 3)
+        # every run attacks a graph of its own
+        self.assertNotEqual(targeted[5], targeted[95])
+        self.assertEqual(len(targeted["mean"]), 301)
+
+    def test_graph_draws(self):
+        """Job seeds draw new random graphs, file graphs stay the same"""
+        self.assertEqual(graph_csr.to_dict_graph(rb.build_graph(UPA_SPEC, 4)),
+                         graph_csr.to_dict_graph(rb.build_graph(UPA_SPEC, 4)))
+        self.assertNotEqual(
+            graph_csr.to_dict_graph(rb.build_graph(UPA_SPEC, 4)),
+            graph_csr.to_dict_graph(rb.build_graph(UPA_SPEC, 5)))
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "graph.txt")
+            with open(path, "w") as graph_file:
+                graph_file.write("0 1 2\n1 0\n2 0\n3\n")
+            file_spec = ("file", path)
+            jobs = rb.monte_carlo_jobs([file_spec], ["random", "targeted"], 4)
+            self.assertEqual([job.strategy for job in jobs],
+                             ["random"] * 4 + ["targeted"])
+            summary = rb.run_resilience_batch(jobs, processes=2)
+            targeted = summary[(file_spec, "targeted")]
+            self.assertEqual(targeted["runs"], 1)
+            self.assertEqual(targeted["mean"], [3.0, 1.0, 1.0, 1.0, 0.0])
+            self.assertNotIn(5, targeted)
+            self.assertIn(5, summary[(file_spec, "random")])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_unknown(self):
+        """Bad specs and strategies are rejected"""
+        self.assertRaises(ValueError, rb.build_graph, ("ba", 10))
+        csr = graph_generators.er_graph(5, 0.5, seed=1)
+        self.assertRaises(ValueError, rb.attack_order, csr, "smart", 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Tests for the grid spatial index
+"""
+import math
+import random
+import unittest
+import numpy as np
+import agglomerative
+import cluster_table
+import clustering
+import clustering_alaysis
+import kmeans
+import spatial_index
+
+
+def brute_nearest(horiz, vert, live, point, exclude=None):
+    """(squared distance, id) of all live points, nearest first"""
+    return sorted(((vert[idx] - point[1]) * (vert[idx] - point[1]) +
+                   (horiz[idx] - point[0]) * (horiz[idx] - point[0]), idx)
+                  for idx in live if idx != exclude)
+
+
+class GridIndexTest(unittest.TestCase):
+    """Queries agree with brute force through inserts, moves and deletes"""
+
+    def test_dynamic_queries(self):
+        """Nearest and k nearest agree with brute force after every update"""
+        rnd = random.Random(1)
+        for trial in range(20):
+            num_points = rnd.randint(1, 150)
+            # integer grids have many ties
+            if trial % 2:
+                horiz = [float(rnd.randint(0, 15)) for _ in range(num_points)]
+                vert = [float(rnd.randint(0, 15)) for _ in range(num_points)]
+            else:
+                horiz = [rnd.uniform(-50, 50) for _ in range(num_points)]
+                vert = [rnd.uniform(0, 9) for _ in range(num_points)]
+            index = spatial_index.GridIndex(horiz, vert)
+            live = set(range(num_points))
+            for _ in range(num_points):
+                choice = rnd.random()
+                if choice < 0.4 and len(live) > 1:
+                    idx = rnd.choice(sorted(live))
+                    index.delete(idx)
+                    live.discard(idx)
+                elif choice < 0.7:
+                    idx = rnd.choice(sorted(live))
+                    horiz[idx] = rnd.uniform(-80, 80)
+                    vert[idx] = rnd.uniform(-10, 20)
+                    index.move(idx, horiz[idx], vert[idx])
+                else:
+                    idx = len(horiz)
+                    horiz.append(rnd.uniform(-50, 50))
+                    vert.append(rnd.uniform(0, 9))
+                    index.insert(idx, horiz[idx], vert[idx])
+                    live.add(idx)
+                point = (rnd.uniform(-100, 100), rnd.uniform(-30, 30))
+                exclude = rnd.choice(sorted(live))
+                expected = brute_nearest(horiz, vert, live, point, exclude)
+                self.assertEqual(index.nearest(point[0], point[1], exclude),
+                                 expected[0] if expected else
+                                 (float("inf"), None))
+                self.assertEqual(index.k_nearest(point[0], point[1], 4,
+                                                 exclude), expected[:4])
+            self.assertEqual(len(index), len(live))
+            self.assertEqual(sorted(index), sorted(live))
+
+    def test_closest_pair(self):
+        """The closest pair agrees with brute force for any cell size"""
+        rnd = random.Random(2)
+        for trial in range(60):
+            num_points = rnd.randint(0, 60)
+            spread = 100 if trial % 3 == 0 else 1
+            horiz = [rnd.randint(0, 9) * spread for _ in range(num_points)]
+            vert = [rnd.randint(0, 9) for _ in range(num_points)]
+            index = spatial_index.GridIndex(
+                horiz, vert, cell_size=rnd.choice([None, 0.3, 5.0]))
+            pairs = sorted(((vert[idx1] - vert[idx2]) ** 2 +
+                            (horiz[idx1] - horiz[idx2]) ** 2, idx1, idx2)
+                           for idx1 in range(num_points)
+                           for idx2 in range(idx1 + 1, num_points))
+            res = index.closest_pair()
+            if pairs:
+                self.assertEqual(res, (math.sqrt(pairs[0][0]),) + pairs[0][1:])
+            else:
+                self.assertEqual(res, (float("inf"), None, None))
+
+    def test_regrid_and_errors(self):
+        """Deletions rebuild coarser cells, unknown ids raise KeyError"""
+        index = spatial_index.GridIndex([float(idx % 10) for idx in range(100)],
+                                        [float(idx // 10) for idx in range(100)])
+        cell = index.cell_size()
+        # keep the diagonal, sparse enough to need bigger cells
+        for idx in range(100):
+            if idx % 10 != idx // 10:
+                index.delete(idx)
+        self.assertGreater(index.cell_size(), cell)
+        self.assertEqual(index.nearest(0.0, 0.0, 0), (2.0, 11))
+        self.assertEqual(index.k_nearest(9.0, 9.0, 2), [(0.0, 99), (2.0, 88)])
+        self.assertEqual(index.position(55), (5.0, 5.0))
+        self.assertRaises(KeyError, index.insert, 55, 0.0, 0.0)
+        self.assertRaises(KeyError, index.delete, 3)
+        self.assertEqual(spatial_index.GridIndex().nearest(1.0, 1.0),
+                         (float("inf"), None))
+
+
+class IndexUsersTest(unittest.TestCase):
+    """Clustering gives the same answers with and without the index"""
+
+    def test_grid_closest_pair(self):
+        """The grid finds the distance fast_closest_pair finds"""
+        for num_clusters in (0, 1, 2, 3, 40, 400):
+            clusters = clustering_alaysis.gen_random_clusters(num_clusters)
+            clusters.sort(key=lambda cluster: cluster.horiz_center())
+            self.assertEqual(clustering.grid_closest_pair(clusters)[0],
+                             clustering.fast_closest_pair(clusters)[0])
+
+    def test_kmeans_assign(self):
+        """Assignment through the grid equals broadcasting"""
+        rng = np.random.default_rng(3)
+        horiz, vert = rng.uniform(0, 100, 500), rng.uniform(0, 60, 500)
+        centers = rng.uniform(0, 100, 40), rng.uniform(0, 60, 40)
+        self.assertEqual(
+            kmeans.assign(horiz, vert, centers[0], centers[1],
+                          index_min_centers=1).tolist(),
+            kmeans.assign(horiz, vert, centers[0], centers[1]).tolist())
+
+    def test_agglomerative(self):
+        """Merges with the grid equal merges with scans"""
+        data = cluster_table.random_data_table(300, 4)
+        merges = []
+        old_min_rows = agglomerative.INDEX_MIN_ROWS
+        try:
+            for min_rows in (old_min_rows, 2):
+                agglomerative.INDEX_MIN_ROWS = min_rows
+                table = cluster_table.ClusterTable.from_data_table(data)
+                merges.append(list(agglomerative.iter_merges(table, 3)))
+        finally:
+            agglomerative.INDEX_MIN_ROWS = old_min_rows
+        self.assertEqual(merges[0], merges[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
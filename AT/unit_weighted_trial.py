@@ -0,0 +1,79 @@
+"""
+Tests for the Fenwick tree trials
+"""
+import random
+import unittest
+import graph_degees_calc
+import weighted_trial
+
+
+class FenwickTreeTest(unittest.TestCase):
+    """Prefix sums, updates and weighted search"""
+
+    def test_prefix_sums(self):
+        """Appends and adds keep every prefix sum right"""
+        rnd = random.Random(1)
+        weights = []
+        tree = weighted_trial.FenwickTree()
+        for _ in range(200):
+            if weights and rnd.random() < 0.5:
+                idx = rnd.randrange(len(weights))
+                weights[idx] += 3
+                tree.add(idx, 3)
+            else:
+                weights.append(rnd.randrange(5))
+                tree.append(weights[-1])
+            count = rnd.randrange(len(weights) + 1)
+            self.assertEqual(tree.prefix_sum(count), sum(weights[:count]))
+        self.assertEqual(tree.total(), sum(weights))
+        self.assertEqual([tree.weight(idx) for idx in range(len(tree))],
+                         weights)
+
+    def test_find(self):
+        """Every value maps to the item whose interval holds it"""
+        weights = [2, 0, 3, 1, 0, 4]
+        tree = weighted_trial.FenwickTree(weights)
+        expected = [0, 0, 2, 2, 2, 3, 5, 5, 5, 5]
+        self.assertEqual([tree.find(value) for value in range(10)], expected)
+
+
+class TrialTest(unittest.TestCase):
+    """Trials keep the DPATrial / UPATrial contract"""
+
+    def test_contract(self):
+        """run_trial returns at most num_nodes existing nodes"""
+        for trial_class in (weighted_trial.FenwickDPATrial,
+                            weighted_trial.FenwickUPATrial):
+            trial = trial_class(4, random.Random(3))
+            for node in range(4, 200):
+                neighbors = trial.run_trial(4)
+                self.assertTrue(0 < len(neighbors) <= 4)
+                self.assertTrue(max(neighbors) < node)
+
+    def test_weights(self):
+        """Weights follow in-degree + 1 (DPA) and degree + 1 (UPA)"""
+        dpa = weighted_trial.FenwickDPATrial(3, random.Random(4))
+        upa = weighted_trial.FenwickUPATrial(3, random.Random(4))
+        dpa_neighbors = dpa.run_trial(3)
+        upa_neighbors = upa.run_trial(3)
+        self.assertEqual(dpa._weights.weight(3), 1)
+        self.assertEqual(upa._weights.weight(3), 1 + len(upa_neighbors))
+        for node in range(3):
+            self.assertEqual(dpa._weights.weight(node),
+                             3 + (node in dpa_neighbors))
+
+    def test_graph_makers(self):
+        """Graph makers take the Fenwick trials in place of the lists"""
+        dpa = graph_degees_calc.make_dpa_graph(
+            200, 4, trial_class=weighted_trial.FenwickDPATrial)
+        upa = graph_degees_calc.make_upa_graph(
+            200, 4, trial_class=weighted_trial.FenwickUPATrial)
+        self.assertEqual(len(dpa), 200)
+        self.assertTrue(graph_degees_calc.is_undirected_graph_valid(upa))
+        for node in range(4, 200):
+            self.assertTrue(0 < len(dpa[node]) <= 4)
+            self.assertTrue(max(dpa[node]) < node)
+
+
+if __name__ == '__main__':
+    unittest.main()
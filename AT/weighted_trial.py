@@ -0,0 +1,174 @@
+"""
+Fenwick tree versions of DPATrial and UPATrial
+
+DPATrial and UPATrial keep one list entry per unit of weight, so their
+memory grows with the number of edges.  These trials keep one integer
+weight per node in a Fenwick (binary indexed) tree instead: memory is
+O(n) and each draw is an O(log n) descent of the tree.  All draws of a
+trial are made against the weights as they were before the trial.
+
+Each draw is still a Python level descent, so these trials are several
+times slower than the list versions.  They are opt-in, through the
+trial_class argument of make_dpa_graph and make_upa_graph, for graphs
+whose node number list would not fit in memory.
+"""
+import random
+from array import array
+
+
+class FenwickTree:
+    """
+    Growable Fenwick tree of non-negative integer weights
+    """
+
+    def __init__(self, weights=()):
+        """
+        Create a tree holding weights, in order
+        """
+        self._tree = array('q', [0])
+        self._total = 0
+        self._top_step = 0
+        for weight in weights:
+            self.append(weight)
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def total(self):
+        """
+        Sum of all weights
+        """
+        return self._total
+
+    def prefix_sum(self, count):
+        """
+        Sum of the first count weights
+        """
+        tree = self._tree
+        res = 0
+        while count > 0:
+            res += tree[count]
+            count &= count - 1
+        return res
+
+    def weight(self, idx):
+        """
+        Weight of item idx
+        """
+        return self.prefix_sum(idx + 1) - self.prefix_sum(idx)
+
+    def append(self, weight):
+        """
+        Adds a new item with weight at the end
+        """
+        pos = len(self._tree)
+        lowbit = pos & -pos
+        self._tree.append(weight + self.prefix_sum(pos - 1) -
+                          self.prefix_sum(pos - lowbit))
+        self._total += weight
+        if lowbit == pos:
+            self._top_step = pos
+
+    def add(self, idx, delta):
+        """
+        Adds delta to the weight of item idx
+        """
+        tree = self._tree
+        pos = idx + 1
+        while pos < len(tree):
+            tree[pos] += delta
+            pos += pos & -pos
+        self._total += delta
+
+    def find(self, value):
+        """
+        Returns the item idx whose weight interval holds value, that is
+        prefix_sum(idx) <= value < prefix_sum(idx + 1)
+        """
+        tree = self._tree
+        size = len(tree) - 1
+        pos = 0
+        step = self._top_step
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] <= value:
+                pos = nxt
+                value -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def sample(self, count, rnd=random):
+        """
+        Returns count items drawn with replacement,
+        each with probability proportional to its weight
+        """
+        find = self.find
+        total = self._total
+        draw = rnd.random
+        return [find(int(draw() * total)) for _ in range(count)]
+
+
+class FenwickDPATrial:
+    """
+    DPATrial with per-node weights in a Fenwick tree
+
+    Same contract as dpa_trial.DPATrial: the complete graph on num_nodes
+    nodes to start with, and run_trial returns the neighbors of the next
+    node.  Weights are in-degree + 1 as in the node number list.
+    """
+
+    def __init__(self, num_nodes, rnd=random):
+        """
+        Initialize a trial corresponding to a
+        complete graph with num_nodes nodes
+        """
+        self._num_nodes = num_nodes
+        self._weights = FenwickTree([num_nodes] * num_nodes)
+        self._rnd = rnd
+
+    def run_trial(self, num_nodes):
+        """
+        Conduct num_nodes weighted draws
+
+        Returns:
+        Set of nodes
+        """
+        new_node_neighbors = set(self._weights.sample(num_nodes, self._rnd))
+        self._weights.append(1)
+        for neighbor in new_node_neighbors:
+            self._weights.add(neighbor, 1)
+        self._num_nodes += 1
+        return new_node_neighbors
+
+
+class FenwickUPATrial:
+    """
+    UPATrial with per-node weights in a Fenwick tree
+
+    Same contract as upa_trial.UPATrial: the complete graph on num_nodes
+    nodes to start with, and run_trial returns the neighbors of the next
+    node.  Weights are degree + 1 as in the node number list.
+    """
+
+    def __init__(self, num_nodes, rnd=random):
+        """
+        Initialize a trial corresponding to a
+        complete graph with num_nodes nodes
+        """
+        self._num_nodes = num_nodes
+        self._weights = FenwickTree([num_nodes] * num_nodes)
+        self._rnd = rnd
+
+    def run_trial(self, num_nodes):
+        """
+        Conduct num_nodes weighted draws
+
+        Returns:
+        Set of nodes
+        """
+        new_node_neighbors = set(self._weights.sample(num_nodes, self._rnd))
+        self._weights.append(1 + len(new_node_neighbors))
+        for neighbor in new_node_neighbors:
+            self._weights.add(neighbor, 1)
+        self._num_nodes += 1
+        return new_node_neighbors
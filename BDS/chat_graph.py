@@ -0,0 +1,465 @@
+"""
+Local ingestion and queries for the team chat CSV logs
+
+courcera_w4_load.cql loads the chat_* CSV files into Neo4j one MERGE
+per row.  Here every file is read in large byte chunks, each chunk is
+parsed by NumPy straight into typed columns (int64 ids, datetime64
+timestamps), and the queries from the .cql file are answered with
+sorted group indexes over those columns and a level-by-level
+topological pass over the ResponseTo edges:
+
+    1.1 / 1.2  longest ResponseTo chain and the users who wrote it
+    2.1        top chatters, by chat items created
+    2.2        top teams, by chat items in their sessions
+
+The CSV files have no header and no quoting.  Timestamps are ISO 8601
+and a trailing UTC "Z" is ignored.
+
+    python chat_graph.py [directory]
+
+benchmarks ingestion in rows/sec on the logs in directory, or on
+synthetic logs if no directory is given, in which case the chain query
+is also timed on synthetic logs of increasing size.
+"""
+from __future__ import print_function
+import collections
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+ResponseChain = collections.namedtuple("ResponseChain", ["items", "authors"])
+
+CHUNK_BYTES = 1 << 24
+CHAIN_BENCHMARK_SIZES = (10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+
+# table name -> (file name, column names); the last column is the timestamp
+CHAT_TABLES = {
+    "create": ("chat_create_team_chat.csv", ("user", "team", "session", "time")),
+    "join": ("chat_join_team_chat.csv", ("user", "session", "time")),
+    "leave": ("chat_leave_team_chat.csv", ("user", "session", "time")),
+    "item": ("chat_item_team_chat.csv", ("user", "session", "item", "time")),
+    "mention": ("chat_mention_team_chat.csv", ("item", "user", "time")),
+    "respond": ("chat_respond_team_chat.csv", ("item", "parent", "time")),
+}
+
+
+def _row_dtype(columns):
+    """
+    Structured dtype of one CSV row: int64 ids and a datetime64 timestamp
+    """
+    return np.dtype([(name, "datetime64[ms]" if name == "time" else np.int64)
+                     for name in columns])
+
+
+def _iter_chunks(csv_file, chunk_bytes):
+    """
+    Yields blocks of whole lines of about chunk_bytes bytes
+    """
+    rest = b""
+    while True:
+        block = csv_file.read(chunk_bytes)
+        if not block:
+            break
+        block = rest + block
+        end = block.rfind(b"\n") + 1
+        rest = block[end:]
+        if end:
+            yield block[:end]
+    if rest.strip():
+        yield rest + b"\n"
+
+
+def read_chat_csv(path, columns, chunk_bytes=CHUNK_BYTES):
+    """
+    Reads a headerless CSV file into a dictionary of column arrays
+
+    columns -- names of the columns, "time" is parsed as a timestamp and
+               every other column as an integer id
+    """
+    dtype = _row_dtype(columns)
+    chunks = []
+    with open(path, "rb") as csv_file:
+        for block in _iter_chunks(csv_file, chunk_bytes):
+            block = block.replace(b"\r", b"").replace(b"Z\n", b"\n")
+            if block.strip():
+                chunks.append(np.loadtxt(io.BytesIO(block), delimiter=",",
+                                         dtype=dtype, ndmin=1))
+    rows = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+    return dict((name, np.ascontiguousarray(rows[name])) for name in columns)
+
+
+def _empty_table(columns):
+    """
+    Column arrays of a table without rows
+    """
+    dtype = _row_dtype(columns)
+    return dict((name, np.empty(0, dtype=dtype[name])) for name in columns)
+
+
+def _lookup(keys, values, queries):
+    """
+    Array of values[i] where keys[i] == query for each query, -1 where
+    no key matches; the first match wins for repeated keys
+    """
+    if not len(keys):
+        return np.full(len(queries), -1, dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    pos = np.searchsorted(ordered, queries)
+    pos[pos == len(ordered)] = 0
+    return np.where(ordered[pos] == queries, values[order][pos], -1)
+
+
+def longest_path(sources, targets):
+    """
+    Longest path in the DAG with edges sources[i] -> targets[i]
+
+    Runs Kahn's algorithm one level at a time: every node leaves the
+    queue in the round equal to the length of the longest path ending
+    at it, and each round is one vectorized step over the edges leaving
+    that level.  Total work is O(V + E) plus NumPy overhead per level.
+
+    Returns the list of node ids on the path, [] without edges.
+    Raises ValueError if the edges contain a cycle.
+    """
+    if not len(sources):
+        return []
+    nodes, ends = np.unique(np.concatenate((sources, targets)),
+                            return_inverse=True)
+    heads = ends[:len(sources)]
+    tails = ends[len(sources):]
+    # edges grouped by head, so a level's edges are slices
+    order = np.argsort(heads, kind="stable")
+    tails = tails[order]
+    offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=len(nodes)), out=offsets[1:])
+
+    remaining = np.bincount(tails, minlength=len(nodes))
+    level = np.full(len(nodes), -1, dtype=np.int64)
+    frontier = np.flatnonzero(remaining == 0)
+    depth = 0
+    while len(frontier):
+        level[frontier] = depth
+        counts = offsets[frontier + 1] - offsets[frontier]
+        edge_ids = np.repeat(offsets[frontier] - np.cumsum(counts) + counts,
+                             counts) + np.arange(counts.sum())
+        reached = tails[edge_ids]
+        reached, hits = np.unique(reached, return_counts=True)
+        remaining[reached] -= hits
+        frontier = reached[remaining[reached] == 0]
+        depth += 1
+    if (level < 0).any():
+        raise ValueError("edges contain a cycle")
+
+    # walk back along edges that climb exactly one level
+    heads = heads[order]
+    step = level[tails] == level[heads] + 1
+    previous = np.full(len(nodes), -1, dtype=np.int64)
+    previous[tails[step]] = heads[step]
+    node = int(np.argmax(level))
+    path = [node]
+    while previous[node] != -1:
+        node = int(previous[node])
+        path.append(node)
+    path.reverse()
+    return nodes[path].tolist()
+
+
+class GroupIndex(object):
+    """
+    Rows of a table grouped by the values of one column
+
+    The rows are sorted by value once; the rows with a given value are
+    then a slice found by binary search.
+    """
+
+    def __init__(self, values):
+        """
+        values -- integer column to group by
+        """
+        self._order = np.argsort(values, kind="stable")
+        ordered = values[self._order]
+        boundary = np.ones(len(ordered), dtype=bool)
+        boundary[1:] = ordered[1:] != ordered[:-1]
+        starts = np.flatnonzero(boundary)
+        self._keys = ordered[starts]
+        self._offsets = np.append(starts, len(ordered))
+
+    def keys(self):
+        """
+        Sorted array of the distinct values
+        """
+        return self._keys
+
+    def counts(self):
+        """
+        Number of rows per value, aligned with keys()
+        """
+        return np.diff(self._offsets)
+
+    def rows(self, key):
+        """
+        Array of the rows holding key, in table order
+        """
+        pos = np.searchsorted(self._keys, key)
+        if pos == len(self._keys) or self._keys[pos] != key:
+            return self._order[:0]
+        return self._order[self._offsets[pos]:self._offsets[pos + 1]]
+
+    def top(self, count=10):
+        """
+        List of the count (value, rows) pairs with the most rows,
+        ties broken by the smaller value
+        """
+        counts = self.counts()
+        best = np.lexsort((self._keys, -counts))[:count]
+        return [(int(self._keys[pos]), int(counts[pos])) for pos in best]
+
+
+class ChatLog(object):
+    """
+    The chat tables as column arrays plus lazily built indexes
+    """
+
+    def __init__(self, tables):
+        """
+        tables -- dictionary from table name in CHAT_TABLES to a
+                  dictionary of column arrays
+        """
+        self._tables = tables
+        self._indexes = {}
+
+    def table(self, name):
+        """
+        Dictionary of the column arrays of a table
+        """
+        return self._tables[name]
+
+    def num_rows(self, name=None):
+        """
+        Number of rows in one table, or in all of them
+        """
+        if name is None:
+            return sum(self.num_rows(table) for table in self._tables)
+        columns = CHAT_TABLES[name][1]
+        return len(self._tables[name][columns[0]])
+
+    def index(self, name, column):
+        """
+        GroupIndex of a table by one of its columns, built on first use
+        """
+        key = (name, column)
+        if key not in self._indexes:
+            if column == "team" and name != "create":
+                values = self.session_teams(self._tables[name]["session"])
+            else:
+                values = self._tables[name][column]
+            self._indexes[key] = GroupIndex(values)
+        return self._indexes[key]
+
+    def session_teams(self, sessions):
+        """
+        Array of the teams owning sessions, -1 for unknown sessions
+        """
+        create = self._tables["create"]
+        return _lookup(create["session"], create["team"], sessions)
+
+    def items_by_user(self):
+        """
+        GroupIndex of chat items by the user who wrote them
+        """
+        return self.index("item", "user")
+
+    def items_by_session(self):
+        """
+        GroupIndex of chat items by their chat session
+        """
+        return self.index("item", "session")
+
+    def items_by_team(self):
+        """
+        GroupIndex of chat items by the team owning their session
+        """
+        return self.index("item", "team")
+
+    def top_chatters(self, count=10):
+        """
+        Query 2.1: list of (user, chat items written), most active first
+        """
+        return self.items_by_user().top(count)
+
+    def top_teams(self, count=10):
+        """
+        Query 2.2: list of (team, chat items), most active first
+        """
+        index = self.items_by_team()
+        return [pair for pair in index.top(count + 1) if pair[0] != -1][:count]
+
+    def item_authors(self, items):
+        """
+        List of the users who wrote items, None for unknown items
+        """
+        item_table = self._tables["item"]
+        authors = _lookup(item_table["item"], item_table["user"],
+                          np.asarray(items, dtype=np.int64))
+        return [int(user) if user != -1 else None for user in authors]
+
+    def longest_response_chain(self):
+        """
+        Queries 1.1 and 1.2: longest chain of chat items linked by
+        ResponseTo, and who wrote them
+
+        Returns ResponseChain(items, authors) where each item responds
+        to the next one, so the chain has len(items) - 1 edges
+        """
+        respond = self._tables["respond"]
+        items = longest_path(respond["item"], respond["parent"])
+        return ResponseChain(items, self.item_authors(items))
+
+
+def load_chat_logs(directory, chunk_bytes=CHUNK_BYTES):
+    """
+    Reads the chat_* CSV files of a directory into a ChatLog
+
+    Missing files load as empty tables.
+    """
+    tables = {}
+    for name, (file_name, columns) in CHAT_TABLES.items():
+        path = os.path.join(directory, file_name)
+        if os.path.exists(path):
+            tables[name] = read_chat_csv(path, columns, chunk_bytes)
+        else:
+            tables[name] = _empty_table(columns)
+    return ChatLog(tables)
+
+
+def synthetic_chat_log(num_items, num_users=None, num_teams=None, seed=None):
+    """
+    Random ChatLog with num_items chat items
+
+    Every session belongs to one team, items are written by random
+    users in random sessions, about a third of the items respond to an
+    earlier item and a tenth mention a user.
+    """
+    rng = np.random.default_rng(seed)
+    num_users = num_users or max(1, num_items // 20)
+    num_teams = num_teams or max(1, num_users // 10)
+    num_sessions = max(1, num_items // 50)
+    start = np.datetime64("2016-05-01T00:00:00", "ms")
+
+    def table(name, *columns):
+        """Column arrays of table name with sorted random timestamps"""
+        count = len(columns[0])
+        times = start + np.sort(rng.integers(0, 30 * 86400, count)) * 1000
+        names = CHAT_TABLES[name][1]
+        return dict(zip(names, [np.asarray(column, dtype=np.int64)
+                                for column in columns] + [times]))
+
+    sessions = np.arange(num_sessions)
+    session_users = rng.integers(0, num_users, num_sessions)
+    items = np.arange(num_items)
+    mentions = items[rng.random(num_items) < 0.1]
+    responders = items[1:][rng.random(num_items - 1) < 1.0 / 3]
+    # respond to one of the few items before, so chains grow long
+    parents = np.maximum(responders - rng.integers(1, 20, len(responders)), 0)
+    return ChatLog({
+        "create": table("create", session_users,
+                        rng.integers(0, num_teams, num_sessions), sessions),
+        "join": table("join", session_users, sessions),
+        "leave": table("leave", session_users, sessions),
+        "item": table("item", rng.integers(0, num_users, num_items),
+                      rng.integers(0, num_sessions, num_items), items),
+        "mention": table("mention", mentions,
+                         rng.integers(0, num_users, len(mentions))),
+        "respond": table("respond", responders, parents),
+    })
+
+
+def write_chat_logs(log, directory):
+    """
+    Writes the tables of a ChatLog as chat_* CSV files in directory
+    """
+    for name, (file_name, columns) in CHAT_TABLES.items():
+        values = [log.table(name)[column] for column in columns]
+        values[-1] = np.datetime_as_string(values[-1], unit="s")
+        with open(os.path.join(directory, file_name), "w") as csv_file:
+            for row in zip(*[column.tolist() for column in values]):
+                csv_file.write(",".join(map(str, row)) + "\n")
+
+
+def write_synthetic_logs(directory, num_items, num_users=None, num_teams=None,
+                         seed=None):
+    """
+    Writes the CSV files of a synthetic_chat_log to directory
+    """
+    write_chat_logs(synthetic_chat_log(num_items, num_users, num_teams, seed),
+                    directory)
+
+
+def benchmark_ingest(directory, repeats=3):
+    """
+    Best ingestion rate of the logs in directory, in rows per second
+
+    Returns (rows, seconds)
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.time()
+        log = load_chat_logs(directory)
+        best = min(best, time.time() - start)
+    return log.num_rows(), best
+
+
+def benchmark_chains(sizes=CHAIN_BENCHMARK_SIZES, seed=0):
+    """
+    Times longest_response_chain on synthetic logs of increasing size
+
+    Returns a list of (chat items, ResponseTo edges, chain edges, seconds)
+    """
+    res = []
+    for size in sizes:
+        log = synthetic_chat_log(size, seed=seed)
+        start = time.time()
+        chain = log.longest_response_chain()
+        res.append((size, log.num_rows("respond"), len(chain.items) - 1,
+                    time.time() - start))
+    return res
+
+
+def main(argv):
+    """
+    Benchmarks ingestion and the chain query, prints the query answers
+    """
+    import shutil
+    import tempfile
+    directory = argv[1] if len(argv) > 1 else None
+    own_dir = directory is None
+    if own_dir:
+        directory = tempfile.mkdtemp(prefix="chat_")
+        write_synthetic_logs(directory, 1000000, seed=0)
+    try:
+        rows, seconds = benchmark_ingest(directory)
+        print("ingested %d rows in %.2f s: %.0f rows/sec"
+              % (rows, seconds, rows / seconds))
+        log = load_chat_logs(directory)
+        start = time.time()
+        chain = log.longest_response_chain()
+        print("longest ResponseTo chain: %d edges, users %s"
+              % (max(len(chain.items) - 1, 0), sorted(set(chain.authors))))
+        print("top chatters:", log.top_chatters())
+        print("top teams:", log.top_teams())
+        print("queries took %.2f s" % (time.time() - start))
+    finally:
+        if own_dir:
+            shutil.rmtree(directory, ignore_errors=True)
+    if own_dir:
+        for items, edges, length, seconds in benchmark_chains():
+            print("%9d items %9d ResponseTo edges: chain of %d in %.3f s"
+                  % (items, edges, length, seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
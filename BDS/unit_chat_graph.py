@@ -0,0 +1,103 @@
+"""
+Tests for the chat log ingestion and queries
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import chat_graph
+
+LOGS = {
+    "chat_create_team_chat.csv": "1,10,100,2016-05-01 10:00:00\n"
+                                 "2,20,200,2016-05-01 11:00:00\n",
+    "chat_item_team_chat.csv": "1,100,1000,2016-05-01T10:01:00.000Z\n"
+                               "2,100,1001,2016-05-01T10:02:00.000Z\r\n"
+                               "1,100,1002,2016-05-01T10:03:00.000Z\n"
+                               "3,200,1003,2016-05-01T11:01:00.000Z\n"
+                               "1,999,1004,2016-05-01T11:02:00.000Z",
+    "chat_respond_team_chat.csv": "1001,1000,2016-05-01 10:02:00\n"
+                                  "1002,1001,2016-05-01 10:03:00\n"
+                                  "1004,1003,2016-05-01 11:02:00\n",
+}
+
+
+class ChatLogTest(unittest.TestCase):
+    """Parsing and the queries of courcera_w4_load.cql"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name, text in LOGS.items():
+            with open(os.path.join(self.directory, name), "w") as log_file:
+                log_file.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_parse(self):
+        """Small chunks parse like one chunk, missing files are empty"""
+        whole = chat_graph.load_chat_logs(self.directory)
+        chunked = chat_graph.load_chat_logs(self.directory, chunk_bytes=7)
+        for name in chat_graph.CHAT_TABLES:
+            for column, values in whole.table(name).items():
+                self.assertTrue(np.array_equal(values,
+                                               chunked.table(name)[column]))
+        self.assertEqual(whole.num_rows("item"), 5)
+        self.assertEqual(whole.num_rows("join"), 0)
+        self.assertEqual(whole.num_rows(), 10)
+        self.assertEqual(whole.table("item")["time"][1],
+                         np.datetime64("2016-05-01T10:02:00"))
+
+    def test_queries(self):
+        """Top chatters, top teams and the longest chain"""
+        log = chat_graph.load_chat_logs(self.directory)
+        self.assertEqual(log.top_chatters(2), [(1, 3), (2, 1)])
+        self.assertEqual(log.top_teams(), [(10, 3), (20, 1)])
+        self.assertEqual(log.longest_response_chain(),
+                         ([1002, 1001, 1000], [1, 2, 1]))
+        self.assertEqual(log.item_authors([1002, 1001, 5]), [1, 2, None])
+        self.assertEqual(list(log.items_by_session().rows(100)), [0, 1, 2])
+        self.assertEqual(len(log.items_by_user().rows(42)), 0)
+
+    def test_longest_path(self):
+        """Longest path in DAGs with shared parents, cycles are rejected"""
+        self.assertEqual(chat_graph.longest_path([], []), [])
+        sources = np.array([5, 4, 3, 9, 8, 6, 7])
+        targets = np.array([4, 3, 2, 2, 9, 5, 3])
+        self.assertEqual(chat_graph.longest_path(sources, targets),
+                         [6, 5, 4, 3, 2])
+        self.assertRaises(ValueError, chat_graph.longest_path,
+                          np.array([1, 2]), np.array([2, 1]))
+
+    def test_longest_path_random(self):
+        """Matches a memoized depth-first search on random DAGs"""
+        rng = np.random.default_rng(3)
+        for _ in range(20):
+            sources = rng.integers(1, 60, 80)
+            targets = (sources - rng.integers(1, 6, 80)).clip(0)
+            children = {}
+            for source, target in zip(sources.tolist(), targets.tolist()):
+                children.setdefault(source, []).append(target)
+            memo = {}
+
+            def depth(node):
+                """Edges on the longest path from node"""
+                if node not in memo:
+                    memo[node] = max([depth(child) + 1
+                                      for child in children.get(node, [])] or [0])
+                return memo[node]
+            path = chat_graph.longest_path(sources, targets)
+            self.assertEqual(len(path) - 1, max(depth(node) for node in children))
+            for source, target in zip(path, path[1:]):
+                self.assertIn(target, children[source])
+
+    def test_synthetic(self):
+        """Synthetic logs load with the requested number of items"""
+        chat_graph.write_synthetic_logs(self.directory, 500, seed=1)
+        log = chat_graph.load_chat_logs(self.directory)
+        self.assertEqual(log.num_rows("item"), 500)
+        self.assertEqual(sum(count for _, count in log.top_teams(10 ** 6)), 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
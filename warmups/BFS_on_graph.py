@@ -1,25 +1,26 @@
 """
 Breath first search of a graph
 """
+from collections import deque
 
 
 class Queue():
     """Data structure queue"""
 
     def __init__(self):
-        self.queue = []
+        self.queue = deque()
 
     def __len__(self):
         return len(self.queue)
 
     def __str__(self):
-        return str(self.queue)
+        return str(list(self.queue))
 
     def enque(self, value):
         self.queue.append(value)
 
     def dequeue(self):
-        return self.queue.pop(0)
+        return self.queue.popleft()
 
 
 def calc_distance(graph, node):
@@ -34,7 +35,6 @@ def calc_distance(graph, node):
     neighbours.enque(node)
     distance[node] = 0
     while len(neighbours) != 0:
-        print neighbours
         current_node = neighbours.dequeue()
         for neighbour in graph[current_node]:
             if distance[neighbour] == float("inf"):